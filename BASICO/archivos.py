@@ -0,0 +1,170 @@
+import os, sys, time, mmap, codecs, tempfile
+
+def leerLineas(path, encoding='utf-8', buffer=1 << 20):
+    """
+    Lee un archivo de texto línea por línea como generador. Usa el open()
+    nativo con un buffer grande, por lo que la memoria usada no depende del
+    tamaño del archivo.
+
+    PARÁMETROS:
+    path     : ruta del archivo
+    encoding : codificación del texto
+    buffer   : tamaño del buffer de lectura en bytes
+
+    RETORNOS:
+    generador de líneas (str, incluyendo el salto de línea)
+    """
+    with open(path, 'r', encoding=encoding, buffering=buffer) as f:
+        yield from f
+
+def leerBloques(path, n=10000, encoding='utf-8', buffer=1 << 20):
+    """
+    Igual que leerLineas pero retorna listas de hasta 'n' líneas, para
+    procesar el archivo por bloques.
+    """
+    bloque = []
+    for linea in leerLineas(path, encoding=encoding, buffer=buffer):
+        bloque.append(linea)
+        if len(bloque) == n:
+            yield bloque
+            bloque = []
+    if bloque:
+        yield bloque
+
+def buscarMmap(path, patron, inicio=0):
+    """
+    Busca un patrón de bytes en el archivo mapeándolo en memoria (mmap). No
+    decodifica el texto, por lo que es mucho más rápido que leer línea por
+    línea cuando solo se necesita ubicar delimitadores o registros.
+
+    PARÁMETROS:
+    path   : ruta del archivo
+    patron : bytes o str a buscar (str se codifica en utf-8)
+    inicio : posición en bytes desde donde buscar
+
+    RETORNOS:
+    generador con las posiciones (en bytes) de cada ocurrencia
+    """
+    if isinstance(patron, str):
+        patron = patron.encode('utf-8')
+    if os.path.getsize(path) == 0:
+        return
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+        i = m.find(patron, inicio)
+        while i != -1:
+            yield i
+            i = m.find(patron, i + len(patron))
+
+def contarLineas(path, bloque=1 << 26):
+    """
+    Cuenta las líneas de un archivo usando mmap, recorriéndolo por bloques de 'bloque' bytes.
+    """
+    if os.path.getsize(path) == 0:
+        return 0
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+        n = sum(m[i:i + bloque].count(b'\n') for i in range(0, len(m), bloque))
+        if m[-1:] != b'\n':
+            n += 1
+    return n
+
+class EscritorLotes:
+    """
+    Escribe líneas acumulándolas en lotes y enviándolas al archivo con un
+    solo writelines por lote.
+
+    Uso:
+        with EscritorLotes('./results/out.txt') as out:
+            for linea in leerLineas('./data/test.txt'):
+                out.write(linea)
+    """
+
+    def __init__(self, path, encoding='utf-8', lote=10000, modo='w', buffer=1 << 20):
+        self.file = open(path, modo, encoding=encoding, buffering=buffer)
+        self.lote = lote
+        self.pendientes = []
+
+    def write(self, linea):
+        self.pendientes.append(linea)
+        if len(self.pendientes) >= self.lote:
+            self.flush()
+
+    def writelines(self, lineas):
+        for linea in lineas:
+            self.write(linea)
+
+    def flush(self):
+        if self.pendientes:
+            self.file.writelines(self.pendientes)
+            self.pendientes = []
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+def procesar(pathIn, pathOut, funcion=None, encoding='utf-8', lote=10000):
+    """
+    Lee pathIn línea por línea, aplica 'funcion' a cada línea (si retorna
+    None la línea se descarta) y escribe el resultado en pathOut por lotes.
+
+    RETORNOS:
+    número de líneas escritas
+    """
+    n = 0
+    with EscritorLotes(pathOut, encoding=encoding, lote=lote) as out:
+        for linea in leerLineas(pathIn, encoding=encoding):
+            if funcion is not None:
+                linea = funcion(linea)
+                if linea is None:
+                    continue
+            out.write(linea)
+            n += 1
+    return n
+
+def benchmark(mb=200, carpeta=None):
+    """
+    Compara la lectura/escritura con codecs.open (método anterior) contra
+    leerLineas/EscritorLotes y el conteo con mmap, sobre un archivo temporal de 'mb' megabytes.
+    """
+    carpeta = carpeta or tempfile.gettempdir()
+    pathIn = os.path.join(carpeta, 'bench_in.txt')
+    pathOut = os.path.join(carpeta, 'bench_out.txt')
+
+    linea = 'JPI Ingeniería e Innovación; 0.123456; -9.876543; Python\n'
+    n = int(mb*2**20/len(linea.encode('utf-8')))
+    with EscritorLotes(pathIn) as out:
+        for i in range(n):
+            out.write(linea)
+    print("Archivo de prueba: %i líneas, %6.1f MB" % (n, os.path.getsize(pathIn)/2**20))
+
+    inicio = time.time()
+    file1 = codecs.open(pathIn, "r", "utf-8")
+    file2 = codecs.open(pathOut, "w", "utf-8")
+    texto = file1.readline()
+    while texto:
+        file2.write(texto)
+        texto = file1.readline()
+    file1.close()
+    file2.close()
+    t_codecs = time.time() - inicio
+    print("codecs.open + readline   : %6.3f segundos" % t_codecs)
+
+    inicio = time.time()
+    procesar(pathIn, pathOut)
+    t_stream = time.time() - inicio
+    print("leerLineas + EscritorLotes: %6.3f segundos (x%4.1f)" % (t_stream, t_codecs/t_stream))
+
+    inicio = time.time()
+    nl = contarLineas(pathIn)
+    print("contarLineas (mmap)      : %6.3f segundos, %i líneas" % (time.time() - inicio, nl))
+
+    os.remove(pathIn)
+    os.remove(pathOut)
+
+if __name__ == '__main__':
+    benchmark(float(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -1,7 +1,7 @@
 import time
 import sys,os,codecs
 import matplotlib.pyplot as plt
-from numpy import zeros, identity, array, save, savetxt
+from numpy import zeros, identity, array, save, savetxt, arange, ma
 from numpy.linalg import inv
 
 # ################       Variables       ###############
@@ -39,24 +39,33 @@ from numpy.linalg import inv
 # [print(e) for e in B]
 # #
 # ############  Ejemplo con Try Except   ############
-lista=[]
-n=10
+# lista=[]
+# n=10
+# inicio = time.time()
+# while True and n>-10:
+#     # if n==0:
+#     #     print("Ojo n es igual a 0")
+#     #     break
+#     try:
+#         div=10/n
+#     except Exception as e:
+#         print(e)
+#         n=n-1
+#         continue
+#     # print("La división es: %7.5f"%div)
+#     lista.append([n,div])
+#     n=n-1
+#     # time.sleep(1)
+# print("Demoró: %6.3f segundos"%(time.time()-inicio))
+#
+# Versión vectorizada (evaluacion.py): 10/n para n = 10, 9, ..., -9 en una sola
+# operación; el punto singular n = 0 queda enmascarado en lugar de lanzar ZeroDivisionError
+from evaluacion import evaluarSeguro, comparar
 inicio = time.time()
-while True and n>-10:
-    # if n==0:
-    #     print("Ojo n es igual a 0")
-    #     break
-    try:
-        div=10/n
-    except Exception as e:
-        print(e)
-        n=n-1
-        continue
-    # print("La división es: %7.5f"%div)
-    lista.append([n,div])
-    n=n-1
-    # time.sleep(1)
+n = 10.0 - arange(20)
+M_vec = ma.column_stack((n, evaluarSeguro(lambda n: 10/n, n)))
 print("Demoró: %6.3f segundos"%(time.time()-inicio))
+# comparar()  # bucle vs vectorizado, de 10^3 a 10^8 elementos
 
 ############### Lectura de Archivos ###############
 print(__file__)
@@ -74,6 +83,13 @@ os.chdir(os.path.dirname(__file__))
 # file2.write(texto)
 # file2.write(texto2)
 # file2.close()
+# #
+# # Para archivos grandes (GB): lectura línea por línea con generador y escritura por lotes
+# from archivos import leerLineas, EscritorLotes, contarLineas
+# with EscritorLotes('./results/out.txt') as out:
+#     for linea in leerLineas('./data/test.txt'):
+#         out.write(linea)
+# print(contarLineas('./data/test.txt'))
 #
 ################      FUNCIONES       #################
 # def countSpaces(text='texto'):
@@ -124,25 +140,23 @@ os.chdir(os.path.dirname(__file__))
 # print(I5@Z)
 # print(inv(I5*2)@Z)
 ##
-# from random import seed
-# from random import random
+# from matrices import MatrizReticulo, MatrizDispersa, guardarMatriz, cargarMatriz
 # #
 # N=500
-# A=zeros((N,N),dtype='float32')
-# seed(1)
-# for i in range(N):
-#   for j in range(N):
-#     if i%5==0 and j%5==0:
-#       A[i,j]=random()
+# A=MatrizReticulo(N, paso=5, seed=1)  # A[::5,::5] = valores aleatorios, sin bucles
 # print(A[0,0])
-# save('./results/Matriz_Numpy.npy',A)
-# savetxt('./results/Matriz_Numpy.txt',A)
+# guardarMatriz('./results/Matriz_Numpy.npy',A)
+# # guardarMatriz('./results/Matriz_Numpy.txt',A,texto=True)  # lento para N grandes
+# A=cargarMatriz('./results/Matriz_Numpy.npy')  # mapeada en memoria
 # print(A)
+# #
+# S=MatrizDispersa(N, paso=5, seed=1)  # CSR: solo guarda los valores no nulos
+# guardarMatriz('./results/Matriz_Dispersa.npz',S)
+# print(S.nnz)
 
 # ##################      PLOTEO       ####################
-M=array(lista)
-x=M[:,0]
-y=M[:,1]
+x=M_vec[:,0]
+y=M_vec[:,1]  # la curva se corta en n = 0
 plt.figure(figsize=(8,4))
 plt.plot(x,y,'r--',lw=2,label='Curva Roja')
 plt.plot(x,y,'k',alpha=0.5,label='Curva Negra')
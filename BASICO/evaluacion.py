@@ -0,0 +1,98 @@
+import sys, time
+import numpy as np
+
+def dividirSeguro(a, b, relleno=np.nan):
+    """
+    División elemento a elemento a/b que no lanza ZeroDivisionError: donde
+    b == 0 el resultado es 'relleno'. Reemplaza el bucle con try/except por
+    una sola operación de numpy.
+
+    PARÁMETROS:
+    a, b    : arrays (o escalares) numerador y denominador
+    relleno : valor para los puntos singulares
+
+    RETORNOS:
+    c      : array con a/b
+    valido : array booleano, False en los puntos singulares
+    """
+    a, b = np.broadcast_arrays(np.asarray(a, dtype=float), np.asarray(b, dtype=float))
+    valido = b != 0
+    c = np.full(a.shape, relleno, dtype=float)
+    np.divide(a, b, out=c, where=valido)
+    return c, valido
+
+def evaluarSeguro(funcion, *args, enmascarar=True):
+    """
+    Evalúa una función vectorizada ignorando los avisos de división por cero
+    y operaciones inválidas (np.errstate). Los resultados no finitos (inf,
+    nan) se enmascaran, de modo que al graficar la curva se corta en las
+    singularidades en vez de dibujar saltos.
+
+    PARÁMETROS:
+    funcion    : función de numpy, p.e. lambda x: 10/x
+    args       : arrays de entrada
+    enmascarar : True para retornar un np.ma.MaskedArray
+
+    RETORNOS:
+    y : resultado (MaskedArray si enmascarar=True)
+    """
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        y = funcion(*args)
+    return np.ma.masked_invalid(y) if enmascarar else y
+
+def divisionBucle(n):
+    """
+    Versión original: 10/i para i = 10, 9, ..., 11-n con try/except por elemento.
+    Retorna la lista de [n, 10/n] sin el punto singular.
+    """
+    lista = []
+    i = 10
+    while i > 10 - n:
+        try:
+            div = 10/i
+        except ZeroDivisionError:
+            i = i - 1
+            continue
+        lista.append([i, div])
+        i = i - 1
+    return lista
+
+def divisionVector(n, bloque=10**7):
+    """
+    Versión vectorizada de divisionBucle. Se procesa por bloques de 'bloque'
+    elementos para que arrays de 10^8 elementos no dupliquen la memoria.
+    Retorna un array (m, 2) igual a array(divisionBucle(n)).
+    """
+    partes = []
+    for ini in range(0, n, bloque):
+        x = 10.0 - np.arange(ini, min(ini + bloque, n), dtype=float)
+        y, valido = dividirSeguro(10.0, x)
+        partes.append(np.column_stack((x[valido], y[valido])))
+    return np.concatenate(partes) if partes else np.zeros((0, 2))
+
+def comparar(tamanos=(10**3, 10**4, 10**5, 10**6, 10**7, 10**8), maxBucle=10**6):
+    """
+    Compara el tiempo (time.time()) y el rendimiento (elementos por segundo)
+    del bucle con try/except y de la versión vectorizada. El bucle solo se
+    mide hasta 'maxBucle' elementos; para tamaños mayores se muestra '-'.
+    """
+    print("%12s %12s %12s %14s %14s %8s" % ('N', 'bucle (s)', 'vector (s)', 'bucle (el/s)', 'vector (el/s)', 'x'))
+    for n in tamanos:
+        t_bucle = None
+        if n <= maxBucle:
+            inicio = time.time()
+            divisionBucle(n)
+            t_bucle = time.time() - inicio
+
+        inicio = time.time()
+        divisionVector(n)
+        t_vector = max(time.time() - inicio, 1e-9)
+
+        if t_bucle is None:
+            print("%12i %12s %12.4f %14s %14.3e %8s" % (n, '-', t_vector, '-', n/t_vector, '-'))
+        else:
+            t_bucle = max(t_bucle, 1e-9)
+            print("%12i %12.4f %12.4f %14.3e %14.3e %8.1f" % (n, t_bucle, t_vector, n/t_bucle, n/t_vector, t_bucle/t_vector))
+
+if __name__ == '__main__':
+    comparar(maxBucle=int(float(sys.argv[1])) if len(sys.argv) > 1 else 10**6)
@@ -0,0 +1,84 @@
+import os
+import numpy as np
+from scipy import sparse
+
+def MatrizReticulo(N, paso=5, seed=1, dtype='float32'):
+    """
+    Genera una matriz NxN con valores aleatorios en un retículo de 1 cada
+    'paso' filas y columnas (A[i,j] != 0 si i%paso==0 y j%paso==0), y ceros en el resto.
+    La asignación se hace de una sola vez con un slice con paso, sin bucles.
+
+    PARÁMETROS:
+    N     : tamaño de la matriz
+    paso  : separación del retículo
+    seed  : semilla del generador (np.random.default_rng)
+    dtype : tipo de dato
+
+    RETORNOS:
+    A : matriz densa (ndarray)
+    """
+    rng = np.random.default_rng(seed)
+    A = np.zeros((N, N), dtype=dtype)
+    m = len(range(0, N, paso))
+    A[::paso, ::paso] = rng.random((m, m)).astype(dtype, copy=False)
+    return A
+
+def MatrizDispersa(N, paso=5, seed=1, dtype='float32', formato='csr'):
+    """
+    Genera la misma matriz que MatrizReticulo (misma semilla, mismos valores)
+    pero en formato disperso. Solo se guardan los (N/paso)^2 valores no nulos,
+    por lo que sirve para N grandes donde la matriz densa no cabe en memoria.
+
+    PARÁMETROS:
+    N       : tamaño de la matriz
+    paso    : separación del retículo
+    seed    : semilla del generador (np.random.default_rng)
+    dtype   : tipo de dato
+    formato : 'csr' o 'coo'
+
+    RETORNOS:
+    A : matriz dispersa de scipy.sparse
+    """
+    rng = np.random.default_rng(seed)
+    idx = np.arange(0, N, paso)
+    m = len(idx)
+    valores = rng.random((m, m)).astype(dtype, copy=False)
+    filas = np.repeat(idx, m)
+    columnas = np.tile(idx, m)
+    A = sparse.coo_matrix((valores.ravel(), (filas, columnas)), shape=(N, N))
+    return A.tocsr() if formato == 'csr' else A
+
+def guardarMatriz(path, A, comprimir=False, texto=False):
+    """
+    Guarda una matriz en formato binario.
+
+    - Matriz dispersa : .npz (scipy.sparse.save_npz)
+    - Matriz densa    : .npy (numpy.save), que luego puede cargarse mapeada en memoria
+
+    El formato de texto (numpy.savetxt) solo se usa si se pide con texto=True,
+    porque para N grandes es lento y ocupa varias veces más que el binario.
+    """
+    if sparse.issparse(A):
+        sparse.save_npz(path, A, compressed=comprimir)
+    elif texto:
+        np.savetxt(path, A)
+    elif comprimir:
+        np.savez_compressed(path, A=A)
+    else:
+        np.save(path, A)
+
+def cargarMatriz(path, mmap=True):
+    """
+    Carga una matriz guardada con guardarMatriz. Los .npy se abren mapeados
+    en memoria (solo lectura) si mmap=True, de modo que solo se leen del
+    disco las partes que se usan.
+    """
+    ext = os.path.splitext(path)[1]
+    if ext == '.npy':
+        return np.load(path, mmap_mode='r' if mmap else None)
+    if ext == '.npz':
+        with np.load(path) as datos:
+            if 'A' in datos.files:
+                return datos['A']
+        return sparse.load_npz(path)
+    return np.loadtxt(path)
@@ -0,0 +1,488 @@
+import os, json
+import numpy as np
+import pandas as pd
+
+VERSION_CACHE = 2
+
+class Tabla:
+    """
+    Tabla columnar para el visor de distritos.
+
+    Cada columna se guarda como un array de numpy. Las columnas de texto se
+    guardan como códigos categóricos (int32) más su diccionario de categorías,
+    de modo que agrupar por departamento o provincia es una sola pasada con
+    np.bincount en lugar de un filtro por cada grupo.
+
+    Los resultados de las agregaciones se guardan en caché mientras la tabla
+    (el archivo cargado) exista.
+    """
+
+    def __init__(self, columnas, categorias=None):
+        """
+        PARÁMETROS:
+        columnas   : dict {nombre: array}. Para columnas categóricas el array contiene los códigos
+        categorias : dict {nombre: array de etiquetas} de las columnas categóricas
+        """
+        self.columnas = dict(columnas)
+        self.categorias = dict(categorias or {})
+        self.nombres = list(self.columnas)
+        self.n = len(next(iter(self.columnas.values()))) if self.columnas else 0
+        self._grupos = {}
+        self._agregados = {}
+        self._ordenes = {}
+        self._rangos = {}
+        self._indices = {}
+
+    @classmethod
+    def desdeDataFrame(cls, df):
+        """
+        Construye la tabla a partir de un DataFrame. Las columnas de texto se
+        codifican con pd.factorize (categorías ordenadas alfabéticamente).
+        """
+        columnas, categorias = {}, {}
+        for col in df.columns:
+            serie = df[col]
+            if pd.api.types.is_numeric_dtype(serie):
+                columnas[col] = serie.to_numpy()
+            else:
+                codigos, etiquetas = pd.factorize(serie, sort=True)
+                columnas[col] = codigos.astype(np.int32)
+                categorias[col] = np.asarray(etiquetas, dtype=str)
+        return cls(columnas, categorias)
+
+    def guardar(self, carpeta, meta=None):
+        """
+        Guarda la tabla en 'carpeta' como un .npy por columna (y un .cat.npy con
+        el diccionario de cada columna categórica) más un meta.json.
+        """
+        os.makedirs(carpeta, exist_ok=True)
+        for i, col in enumerate(self.nombres):
+            np.save(os.path.join(carpeta, '%d.npy' % i), self.columnas[col])
+            if col in self.categorias:
+                np.save(os.path.join(carpeta, '%d.cat.npy' % i), self.categorias[col])
+        meta = dict(meta or {})
+        meta['version'] = VERSION_CACHE
+        meta['columnas'] = self.nombres
+        meta['categoricas'] = [col for col in self.nombres if col in self.categorias]
+        with open(os.path.join(carpeta, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+
+    @classmethod
+    def cargar(cls, carpeta, mmap=True):
+        """
+        Carga una tabla guardada con 'guardar'. Con mmap=True las columnas se
+        mapean en memoria en modo solo lectura y no se copian a la RAM.
+        """
+        with open(os.path.join(carpeta, 'meta.json'), encoding='utf-8') as f:
+            meta = json.load(f)
+        modo = 'r' if mmap else None
+        columnas, categorias = {}, {}
+        for i, col in enumerate(meta['columnas']):
+            columnas[col] = np.load(os.path.join(carpeta, '%d.npy' % i), mmap_mode=modo)
+            if col in meta['categoricas']:
+                categorias[col] = np.load(os.path.join(carpeta, '%d.cat.npy' % i))
+        return cls(columnas, categorias)
+
+    def dataFrame(self):
+        """
+        Retorna la tabla como DataFrame (las columnas de texto como Categorical, sin decodificar).
+        """
+        datos = {}
+        for col in self.nombres:
+            if col in self.categorias:
+                datos[col] = pd.Categorical.from_codes(self.columnas[col], self.categorias[col])
+            else:
+                datos[col] = self.columnas[col]
+        return pd.DataFrame(datos)
+
+    def __len__(self):
+        return self.n
+
+    def esCategorica(self, col):
+        return col in self.categorias
+
+    def codigos(self, col):
+        """
+        Retorna (códigos, etiquetas) de una columna. Para columnas numéricas
+        los códigos se calculan una vez con np.unique y se guardan en caché.
+        """
+        if col in self.categorias:
+            return self.columnas[col], self.categorias[col]
+        if col not in self._grupos:
+            etiquetas, codigos = np.unique(self.columnas[col], return_inverse=True)
+            self._grupos[col] = (codigos.astype(np.int32), etiquetas)
+        return self._grupos[col]
+
+    def valores(self, col):
+        """
+        Retorna los valores de una columna (decodificados si es categórica).
+        """
+        if col in self.categorias:
+            codigos = self.columnas[col]
+            valores = self.categorias[col][np.clip(codigos, 0, None)]
+            return np.where(codigos < 0, '', valores)
+        return self.columnas[col]
+
+    def prepararOrden(self, cols=None):
+        """
+        Calcula una vez las permutaciones de orden estable (ascendente y
+        descendente) de cada columna (por defecto todas). Se llama al cargar
+        el archivo.
+        """
+        for col in (self.nombres if cols is None else cols):
+            self.orden(col, True)
+            self.orden(col, False)
+
+    def _claveOrden(self, col, ascendente):
+        # Clave numérica de orden: los vacíos (NaN o código -1) quedan siempre
+        # al final, como en sort_values(na_position='last'). El orden
+        # descendente se obtiene negando la clave, de modo que los empates
+        # conservan el orden original de las filas.
+        x = self.columnas[col]
+        if col in self.categorias:
+            # Las categorías están ordenadas alfabéticamente, así que basta ordenar los códigos
+            k = len(self.categorias[col])
+            return np.where(x < 0, k, x if ascendente else k - 1 - x)
+        if x.dtype == bool:
+            x = x.astype(np.int8)
+        return x if ascendente else -x
+
+    def orden(self, cols, ascendente=True):
+        """
+        Retorna el índice de filas ordenado por una o varias columnas.
+
+        La permutación de cada sentido se calcula una sola vez (argsort
+        estable o lexsort para varias columnas) y se guarda en caché.
+
+        PARÁMETROS:
+        cols       : nombre de columna o lista de columnas (la primera es la clave principal)
+        ascendente : True para orden ascendente, False para descendente
+
+        RETORNOS:
+        filas : array de índices de filas
+        """
+        if isinstance(cols, str):
+            cols = (cols,)
+        clave = (tuple(cols), bool(ascendente))
+        if clave not in self._ordenes:
+            if len(cols) == 1:
+                perm = np.argsort(self._claveOrden(cols[0], ascendente), kind='stable')
+            else:
+                perm = np.lexsort([self._claveOrden(col, ascendente) for col in reversed(cols)])
+            self._ordenes[clave] = perm
+        return self._ordenes[clave]
+
+    def ordenarFilas(self, filas, cols, ascendente=True):
+        """
+        Ordena un subconjunto de filas usando la permutación precalculada de
+        'cols'. Los subconjuntos pequeños se ordenan por su rango en la
+        permutación; los amplios se extraen de la permutación con una máscara.
+        """
+        if filas is None:
+            return self.orden(cols, ascendente)
+        if isinstance(cols, str):
+            cols = (cols,)
+        clave = (tuple(cols), bool(ascendente))
+        if len(filas) > self.n//16:
+            # Subconjunto amplio: se recorre la permutación completa y se
+            # conservan las filas marcadas, O(n) sin volver a ordenar
+            perm = self.orden(*clave)
+            marcadas = np.zeros(self.n, dtype=bool)
+            marcadas[filas] = True
+            return perm[marcadas[perm]]
+        if clave not in self._rangos:
+            perm = self.orden(*clave)
+            rango = np.empty(self.n, dtype=np.int64)
+            rango[perm] = np.arange(self.n)
+            self._rangos[clave] = rango
+        filas = filas[np.argsort(self._rangos[clave][filas], kind='stable')]
+        return filas
+
+    def indice(self, col):
+        """
+        Índice categórico de una columna: (perm, inicio) tal que las filas del
+        código c son perm[inicio[c]:inicio[c+1]]. Se calcula una vez por columna.
+        """
+        if col not in self._indices:
+            codigos, etiquetas = self.codigos(col)
+            perm = np.argsort(codigos, kind='stable')
+            conteo = np.bincount(codigos[codigos >= 0], minlength=len(etiquetas))
+            inicio = np.zeros(len(etiquetas) + 1, dtype=np.int64)
+            np.cumsum(conteo, out=inicio[1:])
+            inicio += np.count_nonzero(codigos < 0) # los vacíos (-1) quedan al inicio de perm
+            self._indices[col] = (perm, inicio)
+        return self._indices[col]
+
+    def filasDe(self, col, etiqueta):
+        """
+        Retorna las filas donde 'col' es igual a 'etiqueta' (búsqueda binaria en el diccionario).
+        """
+        perm, inicio = self.indice(col)
+        etiquetas = self.codigos(col)[1]
+        c = np.searchsorted(etiquetas, etiqueta)
+        if c < len(etiquetas) and etiquetas[c] == etiqueta:
+            return np.sort(perm[inicio[c]:inicio[c+1]])
+        return np.zeros(0, dtype=np.int64)
+
+    def filasPrefijo(self, col, prefijo):
+        """
+        Retorna las filas cuyo texto en 'col' empieza con 'prefijo'. Como el
+        diccionario está ordenado, las etiquetas con el prefijo forman un rango
+        contiguo de códigos y sus filas un tramo contiguo de perm.
+        """
+        perm, inicio = self.indice(col)
+        etiquetas = self.categorias[col]
+        a = np.searchsorted(etiquetas, prefijo, side='left')
+        b = np.searchsorted(etiquetas, prefijo + '\U0010ffff', side='left')
+        return np.sort(perm[inicio[a]:inicio[b]])
+
+    def consulta(self, igual=None, prefijo=None, rango=None):
+        """
+        Filtra la tabla. Primero se usan los índices categóricos para obtener
+        las filas candidatas y luego los rangos numéricos se evalúan solo
+        sobre esas filas.
+
+        PARÁMETROS:
+        igual   : dict {col: etiqueta}, p.e. {'NOMBDEP': 'LIMA'}
+        prefijo : dict {col: texto}, p.e. {'NOMBDIST': 'SAN '}
+        rango   : dict {col: (mínimo, máximo)}, None para no acotar, p.e. {'SHAPE_AREA': (0.1, None)}
+
+        RETORNOS:
+        filas : array ordenado de índices de filas, o None si no hay filtros
+        """
+        filas = None
+        for col, etiqueta in (igual or {}).items():
+            f = self.filasDe(col, etiqueta)
+            filas = f if filas is None else np.intersect1d(filas, f, assume_unique=True)
+        for col, texto in (prefijo or {}).items():
+            f = self.filasPrefijo(col, texto)
+            filas = f if filas is None else np.intersect1d(filas, f, assume_unique=True)
+        for col, (vmin, vmax) in (rango or {}).items():
+            x = self.columnas[col] if filas is None else self.columnas[col][filas]
+            mascara = np.ones(len(x), dtype=bool)
+            if vmin is not None:
+                mascara &= x > vmin
+            if vmax is not None:
+                mascara &= x < vmax
+            filas = np.flatnonzero(mascara) if filas is None else filas[mascara]
+        return filas
+
+    def top(self, n, metrica, col=None, filas=None, mayores=True):
+        """
+        Retorna los n mayores (o menores) valores de 'metrica' usando
+        np.argpartition, sin ordenar toda la tabla.
+
+        PARÁMETROS:
+        n       : número de resultados
+        metrica : columna numérica
+        col     : si se indica, se agrega 'metrica' por esta columna y se ordenan los grupos
+        filas   : subconjunto de filas (resultado de 'consulta'), None para toda la tabla
+        mayores : True para los mayores, False para los menores
+
+        RETORNOS:
+        claves  : filas (col=None) o etiquetas de los grupos
+        valores : valores de la métrica, ordenados
+        """
+        if col is None:
+            claves = np.arange(self.n) if filas is None else filas
+            valores = np.asarray(self.columnas[metrica], dtype=float)[claves]
+        elif filas is None:
+            claves, valores = self.agrupar(col, metrica)
+        else:
+            codigos, claves = self.codigos(col)
+            codigos = codigos[filas]
+            validos = codigos >= 0
+            valores = np.bincount(codigos[validos], weights=np.asarray(self.columnas[metrica], dtype=float)[filas][validos],
+                                  minlength=len(claves))
+            presentes = np.bincount(codigos[validos], minlength=len(claves)) > 0
+            claves, valores = claves[presentes], valores[presentes]
+
+        k = min(n, len(valores))
+        if k == 0:
+            return claves[:0], valores[:0]
+        signo = -1.0 if mayores else 1.0
+        idx = np.argpartition(signo*valores, k - 1)[:k]
+        idx = idx[np.argsort(signo*valores[idx], kind='stable')]
+        return claves[idx], valores[idx]
+
+    def texto(self, fila, col):
+        """
+        Retorna el texto de una celda. Se usa para dibujar solo las filas visibles.
+        """
+        v = self.columnas[col][fila]
+        if col in self.categorias:
+            return self.categorias[col][v] if v >= 0 else ''
+        if isinstance(v, np.floating):
+            return '' if np.isnan(v) else '%.6f' % v
+        return str(v)
+
+    def agrupar(self, col, metrica, funcion='sum'):
+        """
+        Agrega la columna 'metrica' por los grupos de 'col' en una sola pasada.
+
+        PARÁMETROS:
+        col     : columna de agrupación ('NOMBDEP', 'NOMBPROV', ...)
+        metrica : columna numérica a agregar ('SHAPE_AREA', ...)
+        funcion : 'sum', 'count', 'mean', 'min' o 'max'
+
+        RETORNOS:
+        etiquetas : array con el nombre de cada grupo
+        valores   : array con el valor agregado de cada grupo
+        """
+        clave = (col, metrica, funcion)
+        if clave in self._agregados:
+            return self._agregados[clave]
+
+        codigos, etiquetas = self.codigos(col)
+        validos = codigos >= 0
+        completos = validos.all()
+        if not completos:
+            codigos = codigos[validos]
+        k = len(etiquetas)
+
+        if funcion == 'count':
+            valores = np.bincount(codigos, minlength=k)
+        else:
+            x = np.asarray(self.columnas[metrica], dtype=float)
+            if not completos:
+                x = x[validos]
+            if funcion == 'sum':
+                valores = np.bincount(codigos, weights=x, minlength=k)
+            elif funcion == 'mean':
+                conteo = np.bincount(codigos, minlength=k)
+                valores = np.bincount(codigos, weights=x, minlength=k)/np.maximum(conteo, 1)
+            elif funcion == 'min':
+                valores = np.full(k, np.inf)
+                np.minimum.at(valores, codigos, x)
+            elif funcion == 'max':
+                valores = np.full(k, -np.inf)
+                np.maximum.at(valores, codigos, x)
+            else:
+                raise ValueError("Función de agregación no soportada: %s" % funcion)
+
+        self._agregados[clave] = (etiquetas, valores)
+        return etiquetas, valores
+
+def leerExcelStreaming(path, hoja, cols, bloque=50000):
+    """
+    Lee una hoja de Excel fila por fila (openpyxl en modo read_only) y la
+    convierte directamente a una Tabla, sin pasar por un DataFrame completo.
+    Permite abrir hojas que no caben en memoria con pd.read_excel.
+
+    PARÁMETROS:
+    path   : ruta del archivo .xlsx
+    hoja   : nombre de la hoja
+    cols   : columnas a leer
+    bloque : número de filas que se acumulan antes de pasarlas a un array
+    """
+    from openpyxl import load_workbook
+
+    libro = load_workbook(path, read_only=True, data_only=True)
+    try:
+        filas = libro[hoja].iter_rows(values_only=True)
+        cabecera = next(filas)
+        indices = [(i, nombre) for i, nombre in enumerate(cabecera) if nombre in cols]
+
+        bloques = {nombre: [] for i, nombre in indices}
+        dicc = {nombre: {} for i, nombre in indices}   # etiqueta -> código (orden de aparición)
+        texto = {}
+        buffer = {nombre: [] for i, nombre in indices}
+
+        def etiqueta(v):
+            return str(int(v)) if isinstance(v, float) and v.is_integer() else str(v)
+
+        def codificar(nombre, datos):
+            d = dicc[nombre]
+            return np.array([-1 if v is None else d.setdefault(etiqueta(v), len(d)) for v in datos], dtype=np.int32)
+
+        def vaciar():
+            for i, nombre in indices:
+                datos = buffer[nombre]
+                # La columna es de texto si algún valor del bloque lo es (columnas mixtas);
+                # los bloques anteriores leídos como números se pasan a códigos
+                if not texto.get(nombre) and any(isinstance(v, str) for v in datos):
+                    bloques[nombre] = [codificar(nombre, [None if np.isnan(x) else x for x in b.tolist()])
+                                       for b in bloques[nombre]]
+                    texto[nombre] = True
+                if texto.get(nombre):
+                    bloques[nombre].append(codificar(nombre, datos))
+                else:
+                    bloques[nombre].append(np.array([np.nan if v is None else v for v in datos], dtype=float))
+                buffer[nombre] = []
+
+        for fila in filas:
+            for i, nombre in indices:
+                buffer[nombre].append(fila[i] if i < len(fila) else None)
+            if len(buffer[indices[0][1]]) >= bloque:
+                vaciar()
+        for i, nombre in indices:
+            texto.setdefault(nombre, False)
+        vaciar()
+    finally:
+        libro.close()
+
+    columnas, categorias = {}, {}
+    for i, nombre in indices:
+        datos = np.concatenate(bloques[nombre])
+        if texto[nombre]:
+            # Se reordena el diccionario alfabéticamente como en pd.factorize(sort=True)
+            etiquetas = np.array(list(dicc[nombre]), dtype=str)
+            orden = np.argsort(etiquetas, kind='stable')
+            remapeo = np.empty(len(orden), dtype=np.int32)
+            remapeo[orden] = np.arange(len(orden), dtype=np.int32)
+            datos = np.where(datos < 0, -1, remapeo[np.clip(datos, 0, None)]).astype(np.int32)
+            categorias[nombre] = etiquetas[orden]
+        elif len(datos) and np.isfinite(datos).all() and (datos == np.round(datos)).all() and np.abs(datos).max() < 2**63:
+            # Columnas enteras (IDs, códigos) como int64, igual que pd.read_excel
+            datos = datos.astype(np.int64)
+        columnas[nombre] = datos
+    return Tabla(columnas, categorias)
+
+def leerExcel(path, hoja, cols, carpetaCache=None, streaming=None, limiteStreaming=50*2**20):
+    """
+    Lee una hoja de Excel usando una caché columnar en disco.
+
+    La primera vez la hoja se convierte a un .npy por columna en 'carpetaCache'
+    (por defecto .cache/<archivo>_<hoja> junto al .xlsx). Las siguientes
+    aperturas cargan la caché mapeada en memoria mientras el tamaño y la fecha
+    de modificación del archivo no cambien.
+
+    PARÁMETROS:
+    path            : ruta del archivo .xlsx
+    hoja            : nombre de la hoja
+    cols            : columnas a leer
+    carpetaCache    : carpeta de la caché
+    streaming       : True para leer la hoja fila por fila (solo lectura), False para pd.read_excel,
+                      None para decidir según el tamaño del archivo
+    limiteStreaming : tamaño en bytes a partir del cual se usa el modo streaming
+
+    RETORNOS:
+    tabla : objeto Tabla
+    """
+    if carpetaCache is None:
+        nombre = os.path.splitext(os.path.basename(path))[0]
+        carpetaCache = os.path.join(os.path.dirname(os.path.abspath(path)), '.cache', '%s_%s' % (nombre, hoja))
+
+    info = os.stat(path)
+    clave = {'mtime': info.st_mtime_ns, 'size': info.st_size, 'hoja': hoja, 'cols': sorted(cols)}
+
+    try:
+        with open(os.path.join(carpetaCache, 'meta.json'), encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta.get('version') == VERSION_CACHE and all(meta.get(k) == v for k, v in clave.items()):
+            return Tabla.cargar(carpetaCache)
+    except (OSError, ValueError):
+        pass
+
+    if streaming is None:
+        streaming = info.st_size > limiteStreaming
+    if streaming:
+        tabla = leerExcelStreaming(path, hoja, cols)
+    else:
+        tabla = Tabla.desdeDataFrame(pd.read_excel(path, sheet_name=hoja, usecols=cols))
+
+    try:
+        tabla.guardar(carpetaCache, clave)
+    except OSError as e:
+        print("No se pudo guardar la caché en %s: %s" % (carpetaCache, e))
+    return tabla
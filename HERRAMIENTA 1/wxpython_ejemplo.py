@@ -2,6 +2,34 @@ import wx, os
 import pandas as pd
 from wx.core import Icon
 import matplotlib.pyplot as plt
+from tabla import Tabla, leerExcel
+
+class TablaVirtual(wx.ListCtrl):
+    """
+    Lista en modo LC_VIRTUAL: wx solo pide el texto de las filas visibles,
+    que se lee directamente de los arrays de la Tabla.
+    """
+
+    def __init__(self, parent):
+        wx.ListCtrl.__init__(self, parent, style=wx.LC_REPORT|wx.LC_VIRTUAL|wx.LC_HRULES|wx.LC_VRULES)
+        self.tabla = None
+        self.filas = None # índice de las filas a mostrar (None: orden original)
+
+    def setTabla(self, tabla, filas=None):
+        self.tabla = tabla
+        self.ClearAll()
+        for i, col in enumerate(tabla.nombres):
+            self.InsertColumn(i, col, format=wx.LIST_FORMAT_CENTER, width=150)
+        self.setFilas(filas)
+
+    def setFilas(self, filas):
+        self.filas = filas
+        self.SetItemCount(len(self.tabla) if filas is None else len(filas))
+        self.Refresh()
+
+    def OnGetItemText(self, item, col):
+        fila = item if self.filas is None else self.filas[item]
+        return self.tabla.texto(fila, self.tabla.nombres[col])
 
 class MyPanel(wx.Panel):
 
@@ -9,9 +37,13 @@ class MyPanel(wx.Panel):
         wx.Panel.__init__(self, parent)
         ## Global Variables
         self.sortAsc = None
+        self.sortCols = ['SHAPE_AREA']
+        self.tabla = None
+        self.filas = None # filas del filtro actual (None: todas)
 
-        self.my_text = wx.TextCtrl(self, style=wx.TE_MULTILINE)
-        self.my_text.SetFont(wx.Font(10, family = wx.DEFAULT, style = wx.NORMAL, weight = wx.BOLD, faceName = 'Consolas'))
+        self.my_list = TablaVirtual(self)
+        self.my_list.SetFont(wx.Font(10, family = wx.DEFAULT, style = wx.NORMAL, weight = wx.BOLD, faceName = 'Consolas'))
+        self.my_list.Bind(wx.EVT_LIST_COL_CLICK, self.onColClick)
 
         btn1 = wx.Button(self, label='Open Excel File')
         btn1.Bind(wx.EVT_BUTTON, self.onOpen)
@@ -22,15 +54,39 @@ class MyPanel(wx.Panel):
         btn3 = wx.Button(self, label='Graph',size=(70, 30))
         btn3.Bind(wx.EVT_BUTTON, self.charts)
 
+        btn4 = wx.Button(self, label='Top 20 Prov.',size=(90, 30))
+        btn4.Bind(wx.EVT_BUTTON, self.topProv)
+
+        ## Consultas
+        self.search = wx.SearchCtrl(self, size=(200, -1))
+        self.search.SetDescriptiveText('Distrito...')
+        self.search.Bind(wx.EVT_TEXT, self.query)
+
+        self.depChoice = wx.Choice(self, choices=['(Todos)'])
+        self.depChoice.SetSelection(0)
+        self.depChoice.Bind(wx.EVT_CHOICE, self.query)
+
+        self.areaMin = wx.TextCtrl(self, size=(80, -1))
+        self.areaMin.Bind(wx.EVT_TEXT, self.query)
+
         sizer = wx.BoxSizer(wx.VERTICAL)
 
         hbox = wx.BoxSizer(wx.HORIZONTAL)
 
-        sizer.Add(self.my_text, 1, wx.ALL|wx.EXPAND)
+        qbox = wx.BoxSizer(wx.HORIZONTAL)
+        qbox.Add(self.search, flag=wx.LEFT|wx.ALIGN_CENTER_VERTICAL, border=5)
+        qbox.Add(wx.StaticText(self, label='Departamento:'), flag=wx.LEFT|wx.ALIGN_CENTER_VERTICAL, border=10)
+        qbox.Add(self.depChoice, flag=wx.LEFT|wx.ALIGN_CENTER_VERTICAL, border=5)
+        qbox.Add(wx.StaticText(self, label='Área >'), flag=wx.LEFT|wx.ALIGN_CENTER_VERTICAL, border=10)
+        qbox.Add(self.areaMin, flag=wx.LEFT|wx.ALIGN_CENTER_VERTICAL, border=5)
+
+        sizer.Add(qbox, 0, wx.ALL|wx.EXPAND, 5)
+        sizer.Add(self.my_list, 1, wx.ALL|wx.EXPAND)
         sizer.Add(btn1, 0, wx.ALL|wx.CENTER, 5)
 
         hbox.Add(btn2, flag=wx.LEFT,border=5)
         hbox.Add(btn3, flag=wx.LEFT,border=5)
+        hbox.Add(btn4, flag=wx.LEFT,border=5)
 
         sizer.Add(hbox, flag=wx.CENTER, border=5)
         sizer.Add((-1, 5))
@@ -51,20 +107,24 @@ class MyPanel(wx.Panel):
         if os.path.exists(path):
             my_sheet = 'BAS_LIM_DISTRITOS' # change it to your sheet name
             cols={'ID','NOMBDIST','NOMBPROV','NOMBDEP',"SHAPE_AREA"}
-            self.df = pd.read_excel(path, sheet_name = my_sheet, usecols=cols)
+            self.tabla = leerExcel(path, my_sheet, cols) # caché columnar en disco, agregaciones en caché por archivo
+            self.tabla.prepararOrden() # permutaciones de orden precalculadas
+            for col in ('NOMBDEP', 'NOMBPROV', 'NOMBDIST'):
+                self.tabla.indice(col) # índices categóricos para las consultas
+            self.sortAsc = None
+            self.sortCols = ['SHAPE_AREA']
+            self.filas = None
             #
-            self.my_text.WriteText(self.df[:30].to_string(index=False,col_space=20,max_colwidth=15,justify='center')+'\n')#,col_space=30,max_colwidth=25
+            self.depChoice.SetItems(['(Todos)'] + list(self.tabla.categorias['NOMBDEP']))
+            self.depChoice.SetSelection(0)
+            self.my_list.setTabla(self.tabla)
     
     def sorter(self, event):
         ##
-        try:
-            self.df.head()
-        except:
+        if self.tabla is None:
             print("No se ha cargado el archivo Excel")
             return
         ##
-        self.my_text.Clear()
-        #
         if self.sortAsc != None:
             if self.sortAsc == True:
                 self.sortAsc = False
@@ -72,25 +132,69 @@ class MyPanel(wx.Panel):
                 self.sortAsc = True
         else:
             self.sortAsc = True
-        df = self.df.sort_values('SHAPE_AREA',ascending=self.sortAsc)
-        self.my_text.WriteText(df[:30].to_string(index=False,col_space=20,max_colwidth=15,justify='center')+'\n')
+        self.showRows()
+
+    def showRows(self):
+        # Muestra las filas del filtro actual en el orden actual, a través de los índices precalculados
+        if self.my_list.tabla is not self.tabla:
+            self.my_list.setTabla(self.tabla)
+        if self.sortAsc is None:
+            self.my_list.setFilas(self.filas)
+        else:
+            self.my_list.setFilas(self.tabla.ordenarFilas(self.filas, self.sortCols, ascendente=self.sortAsc))
+
+    def onColClick(self, event):
+        # Click: ordena por la columna; Shift+Click: la agrega como criterio secundario
+        if self.my_list.tabla is not self.tabla:
+            return
+        col = self.tabla.nombres[event.GetColumn()]
+        if wx.GetKeyState(wx.WXK_SHIFT) and col not in self.sortCols:
+            self.sortCols.append(col)
+            if self.sortAsc is None:
+                self.sortAsc = True
+            self.showRows()
+            return
+        if self.sortCols != [col]:
+            self.sortCols = [col]
+            self.sortAsc = None
+        self.sorter(event)
+
+    def query(self, event):
+        # Filtro por prefijo del distrito, departamento y área mínima (índices categóricos)
+        if self.tabla is None:
+            return
+        igual, prefijo, rango = {}, {}, {}
+        texto = self.search.GetValue().strip().upper()
+        if texto:
+            prefijo['NOMBDIST'] = texto
+        if self.depChoice.GetSelection() > 0:
+            igual['NOMBDEP'] = self.depChoice.GetStringSelection()
+        try:
+            rango['SHAPE_AREA'] = (float(self.areaMin.GetValue()), None)
+        except ValueError:
+            pass
+        self.filas = self.tabla.consulta(igual, prefijo, rango)
+        self.showRows()
+
+    def topProv(self, event):
+        ##
+        if self.tabla is None:
+            print("No se ha cargado el archivo Excel")
+            return
+        ##
+        provs, areas = self.tabla.top(20, 'SHAPE_AREA', col='NOMBPROV', filas=self.filas)
+        top = pd.DataFrame({'NOMBPROV': provs, 'SHAPE_AREA': areas})
+        self.my_list.setTabla(Tabla.desdeDataFrame(top))
 
     def charts(self, event):
         ##
-        try:
-            self.df.head()
-        except:
+        if self.tabla is None:
             print("No se ha cargado el archivo Excel")
             return
         ##
-        areas = []
-        depas = []
-        for depa in  self.df['NOMBDEP'].unique():
-            temp=self.df.loc[self.df['NOMBDEP'] == depa]
-            areas.append(sum(temp["SHAPE_AREA"]))
-            depas.append(depa)
-
-        df_dep = pd.DataFrame(list(zip(depas,areas)),columns =['DEPA', 'AREA'])
+        depas, areas = self.tabla.agrupar('NOMBDEP', 'SHAPE_AREA')
+
+        df_dep = pd.DataFrame({'DEPA': depas, 'AREA': areas})
         df_dep = df_dep.sort_values('AREA')
 
         fig1, ax1 = plt.subplots()
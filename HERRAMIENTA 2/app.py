@@ -1,115 +1,35 @@
-from PyQt5.QtWidgets import *
-from PyQt5.QtCore import *
-from PyQt5.QtGui import *
+from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QAction, QFileDialog, QMessageBox,
+        QGridLayout, QHBoxLayout, QVBoxLayout, QGroupBox, QLabel, QPushButton, QLineEdit, QComboBox,
+        QTableView, QAbstractScrollArea, QSpacerItem, QSizePolicy)
+from PyQt5.QtCore import Qt, QFile, QFileInfo, QSettings, QTextStream, QTimer, QAbstractTableModel
+from PyQt5.QtGui import QIcon, QKeySequence, QPixmap
 
-import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_qt5agg import FigureCanvas, NavigationToolbar2QT
-from matplotlib.figure import Figure
-import matplotlib.animation as animation
-from scipy import integrate
-from scipy.interpolate import LSQUnivariateSpline
 from copy import copy
-from math import ceil, atan, sin, cos, sqrt, e
-
-################################### funciones ###################################
-
-def BaseLineCorrection(at, dt=0.01, type='polynomial', order=2, dspline=1000):
-    """
-    Realiza una corrección por Línea Base a un array de aceleraciones
-
-    PARÁMETROS:
-    at      : narray de aceleraciones 
-    dt      : delta de tiempo en seguntos. para itk=0.01s
-    type    : método de ajuste ('polynomial', 'spline')
-    order   : orden del polinomio de aproximación para la línea base
-    dspline : en caso de ser el método spline, define cada cuantos puntos se debe hacer el ajuste
-
-    RETORNOS:
-    at  : señal de aceleraciones corregida
-    """
-    # vt = integrate.cumtrapz(at, dx=dt, initial=0.0)
-    x = np.arange(len(at))
-    
-    if type=='Polinomial':
-        fit_at = np.polyval(np.polyfit(x, at, deg=order), x)
-        
-    if type =='Spline':
-        splknots = np.arange(dspline / 2.0, len(at) - dspline / 2.0 + 2, dspline)
-        spl = LSQUnivariateSpline(x=x, y=at, t=splknots, k=order)
-        fit_at = spl(x)
-
-    return at - fit_at
-
-def GL(f, fl, n):
-    """
-    Hace un low cut al array de frecuencias
-
-    inputs:
-        f   : array de frecuencias
-        fl  : low cut frecuency
-        n   : orden de corte
-    output:
-        GH  : Ganancia de frecuencias recortada (array)
-	    GL = ( (f/fl)**(2*n)/(1 + (f/fl)**(2*n)) )**0.5
-    """
-    return ( (f/fl)**(2*n)/(1 + (f/fl)**(2*n)))**0.5
-
-def GH(f, fh, n):
-    """
-    Hace un high cut al array de frecuencias
-
-    input:
-        f   : array de frecuencias
-        fh  : high cut frecuency
-        n   : orden de corte
-    output:
-        GH  : Ganancia de frecuencias recortada (array)
-	    GH = ( 1/(1 + (f/fh)**(2*n)) )**0.5
-    """
-    return ( 1/(1 + (f/fh)**(2*n)) )**0.5
-
-def GB(f, fl, fh, n):
-    """
-    Hace un Butterworth al array de frecuencias
-
-    inputs:
-        f   : array de frecuencias
-        fl  : low cut frecuency
-        fh  : high cut frecuency
-        n   : orden de corte
-    output:
-        GB  : Ganancia de frecuencias recortada (array)
-    """
-    return GL(f, fl, n)*GH(f, fh, n)
-
-def Butterworth_Bandpass(signal, dt, fl, fh, n):
-    """
-    Hace un Butterworth Bandpass a las frecuencias de la señal
-
-    inputs:                                         examples:
-        signal      : señal (array)                         | array de aceleraciones
-        dt          : delta de tiempo de la señal           | para itk = 0.01 seg
-        fl          : low cut frecuency                     | fl = 0.10 Hz
-        fh          : high cut frecuency                    | hf = 40.0 Hz
-        n           : orden de corte                        | n = 15
-    output:
-        filter      : señal filtrada (array)
-    """
-    FFT = np.fft.rfft(signal)
-    f = np.fft.rfftfreq(len(signal), d = dt)
-    FFT_filtered = GL(f, fl, n)*FFT*GH(f, fh, n)
-
-    return np.fft.irfft(FFT_filtered)
+from math import ceil
 
-##################################################################################
+from funciones import BaseLineCorrection, Butterworth_Bandpass
+from espectros import suavizar
+from vgl import VGL
+from intensidad import medidasCache
+from remuestreo import prepararRegistro, frecuenciaMaxima
+from historial import Historial
+from instrumentacion import registro, etapa
+import hilos
+
+# pandas, scipy, matplotlib.animation y el backend Qt de matplotlib se
+# importan dentro de las vistas que los usan, para que la ventana abra rápido.
 
 class MainWindow(QMainWindow):
     def __init__(self):
         super(MainWindow, self).__init__()
 
         self.curFile = ''
+        self.version = 0 # cambia con cada registro leído (clave del caché de intensidades)
+        self.liveTimer = None # adquisición en tiempo real (viewLive)
+        self.fh = None # último pasa banda y frecuencias del último modelo: frecuencia de remuestreo
+        self.Ωmodelo = None
+        self.estacion = None
         self.setCurrentFile('')
         self.createActions()
         self.createMenus()
@@ -135,9 +55,12 @@ class MainWindow(QMainWindow):
                     "No se puedo leer el Archivo %s:\n%s." % (fileName, file.errorString()))
             return
 
-        self.df = pd.read_csv(fileName, sep = ';', names = ["Time", "X", "Y", "Z"])
-        n = self.df.shape[0]
-        self.df.insert(0, 'N° Row', [i+1 for i in range(n)])
+        with etapa('loadFile', archivo=self.strippedName(fileName)):
+            import pandas as pd
+            self.df = pd.read_csv(fileName, sep = ';', names = ["Time", "X", "Y", "Z"])
+            n = self.df.shape[0]
+            self.df.insert(0, 'N° Row', np.arange(1, n+1))
+            self.version += 1
 
         inf = QTextStream(file)
         self.setCurrentFile(fileName)
@@ -146,9 +69,77 @@ class MainWindow(QMainWindow):
         self.baseLineAct.setEnabled(False)
         self.passBandAct.setEnabled(False)
         self.simuladAct.setEnabled(False)
+        self.undoAct.setEnabled(False)
+        self.redoAct.setEnabled(False)
+        self.exportAct.setEnabled(False)
+        self.mdof = None
 
         self.viewLoad()
 
+    def applyStep(self):
+        # Agrega al historial el último paso aplicado en la vista de correcciones
+        if self.pendiente is not None:
+            nombre, funcion, parametros = self.pendiente
+            self.historial.aplicar(nombre, funcion, datos=np.array(self.acc_corr), **parametros)
+            self.pendiente = None
+        self.acc = list(self.historial.datos())
+        self.acc_corr = copy(self.acc)
+        self.updateHistory()
+
+    def undo(self):
+        self.historial.deshacer()
+        self.showHistory("Deshacer")
+
+    def redo(self):
+        self.historial.rehacer()
+        self.showHistory("Rehacer")
+
+    def showHistory(self, accion):
+        self.acc = list(self.historial.datos())
+        self.acc_corr = copy(self.acc)
+        self.pendiente = None
+        self.updateHistory()
+        self.statusBar().showMessage("%s: %s" % (accion, self.historial.actual.descripcion()), 3000)
+        self.centralwidget.deleteLater()
+        self.viewStart()
+
+    def updateHistory(self):
+        self.undoAct.setEnabled(self.historial.puedeDeshacer())
+        self.redoAct.setEnabled(self.historial.puedeRehacer())
+
+    def exportResults(self):
+        fileName, filtr = QFileDialog.getSaveFileName(self, "Exportar resultados", "./resultados.h5", "HDF5 (*.h5);;Zarr (*.zarr)")
+        if not fileName:
+            return
+        from exportar import exportarRegistro, exportarSimulacion
+        nombre = QFileInfo(self.curFile).baseName() or 'registro'
+        try:
+            with etapa('exportar', archivo=self.strippedName(fileName)):
+                exportarRegistro(fileName, nombre, np.array(self.acc), self.dt, t0=float(self.t[0]),
+                                 original=self.df[['X', 'Y', 'Z']].to_numpy().T, tOriginal=self.df['Time'].to_numpy(),
+                                 pasos=[p.descripcion() for p in self.historial.pasos[1:self.historial.posicion+1]],
+                                 archivo=self.strippedName(self.curFile))
+                if getattr(self, 'mdof', None) is not None and hasattr(self.mdof, 'u'):
+                    exportarSimulacion(fileName, nombre, self.mdof, self.dt, at=self.at)
+        except (ImportError, OSError, ValueError) as e:
+            QMessageBox.warning(self, "Aplicacion", "No se pudo exportar %s:\n%s" % (fileName, e))
+            return
+        self.statusBar().showMessage("Resultados exportados a %s" % self.strippedName(fileName), 2000)
+
+    def exportTimes(self):
+        fileName, filtr = QFileDialog.getSaveFileName(self, "Exportar tiempos", "./tiempos.csv", "CSV (*.csv);;JSON (*.json)")
+        if fileName:
+            registro.exportar(fileName)
+            self.statusBar().showMessage("Tiempos exportados a %s" % self.strippedName(fileName), 2000)
+
+    def showStage(self, r):
+        # Muestra en la barra de estado el tiempo y la memoria de la última etapa principal
+        if r['nivel'] == 0 and r['etapa'] not in ('cuadro', 'tiempo real'): # no las de cada cuadro
+            msg = "%s: %.3f s | CPU %.3f s" % (r['etapa'], r['pared'], r['cpu'])
+            if registro.memoria:
+                msg += " | pico %.1f MB" % r['pico']
+            self.statusBar().showMessage(msg, 5000)
+
     def about(self):
         QMessageBox.about(self, "Acerca de la aplicacion",
                 "La <b>Aplicacion</b> es un ejemplo de como crear un MainWindow")
@@ -163,6 +154,14 @@ class MainWindow(QMainWindow):
                 "Salir", self, shortcut="Ctrl+Q",
                 statusTip="Salir de la aplicacion", triggered=self.close)
 
+        self.exportAct = QAction("Exportar resultados...", self,
+                statusTip="Guarda el registro corregido y la simulacion en HDF5 o Zarr",
+                triggered=self.exportResults)
+
+        self.timesAct = QAction("Exportar tiempos...", self,
+                statusTip="Exporta los tiempos y la memoria de cada etapa (CSV o JSON)",
+                triggered=self.exportTimes)
+
         self.aboutAct = QAction("&Acerca de la aplicacion", self,
                 statusTip="Muestra una descripcion acerca de la aplicacion",
                 triggered=self.about)
@@ -179,19 +178,38 @@ class MainWindow(QMainWindow):
                 self, shortcut = 'Ctrl+L', statusTip = "Simulacion lineal de un MDOF",
                 triggered = self.viewSimula)        
 
+        self.liveAct = QAction("Tiempo real", self,
+                statusTip = "Adquisicion en tiempo real desde un archivo o socket",
+                triggered = self.viewLive)
+
+        self.undoAct = QAction("Deshacer", self, shortcut=QKeySequence.Undo,
+                statusTip = "Deshace la ultima correccion", triggered = self.undo)
+
+        self.redoAct = QAction("Rehacer", self, shortcut=QKeySequence.Redo,
+                statusTip = "Rehace la correccion deshecha", triggered = self.redo)
+
         self.baseLineAct.setEnabled(False)
         self.passBandAct.setEnabled(False)
         self.simuladAct.setEnabled(False)
+        self.undoAct.setEnabled(False)
+        self.redoAct.setEnabled(False)
+        self.exportAct.setEnabled(False)
 
     def createMenus(self):
         self.fileMenu = self.menuBar().addMenu("Archivo")
         self.fileMenu.addAction(self.openAct)
+        self.fileMenu.addAction(self.liveAct)
+        self.fileMenu.addAction(self.exportAct)
+        self.fileMenu.addAction(self.timesAct)
         self.fileMenu.addSeparator()
         self.fileMenu.addAction(self.exitAct)
 
         self.correctMenu = self.menuBar().addMenu("Correciones")
         self.correctMenu.addAction(self.passBandAct)
         self.correctMenu.addAction(self.baseLineAct)
+        self.correctMenu.addSeparator()
+        self.correctMenu.addAction(self.undoAct)
+        self.correctMenu.addAction(self.redoAct)
 
         self.simulaMenu = self.menuBar().addMenu("Simulacion")
         self.simulaMenu.addAction(self.simuladAct)
@@ -213,6 +231,7 @@ class MainWindow(QMainWindow):
 
     def createStatusBar(self):
         self.statusBar().showMessage("Listo")
+        registro.observadores.append(self.showStage)
 
     def readSettings(self):
         w_logo = QIcon('./images/logo.png')
@@ -247,7 +266,18 @@ class MainWindow(QMainWindow):
         return QFileInfo(fullFileName).fileName()
 
 ##################################### Vistas #####################################
+    def stopLive(self):
+        # Detiene la adquisición en tiempo real; se llama al reemplazar la vista central
+        if self.liveTimer is not None:
+            self.liveTimer.stop()
+            self.liveTimer.deleteLater()
+            self.liveTimer = None
+        if self.estacion is not None:
+            self.estacion.productor.cerrar()
+            self.estacion = None
+
     def viewStart(self):
+        self.stopLive()
         self.centralwidget = QWidget(self)
         layout = QGridLayout(self.centralwidget)
         picture = QPixmap("./images/seismograph.png")
@@ -258,16 +288,35 @@ class MainWindow(QMainWindow):
         self.setCentralWidget(self.centralwidget)
 
     def viewLoad(self):
+        from matplotlib.backends.backend_qt5agg import FigureCanvas, NavigationToolbar2QT
+        from matplotlib.figure import Figure
+        self.stopLive()
 
         def okButton():
-            self.t = np.array(self.df['Time'])
-            self.dt = self.t[1] - self.t[0]
-            self.acc = [np.array(self.df['X']), np.array(self.df['Y']), np.array(self.df['Z'])]
+            # Frecuencia máxima de interés (pasa banda / estructura); vacío para no remuestrear
+            texto = self.lineEdit_fmax.text().strip()
+            try:
+                fmax = float(texto) if texto else None
+                with etapa('remuestreo', fmax=fmax):
+                    self.t, acc, self.dt, info = prepararRegistro(self.df['Time'].to_numpy(), self.df[['X', 'Y', 'Z']].to_numpy().T, fmax)
+            except ValueError as e:
+                QMessageBox.warning(self, "Aplicacion", "No se pudo preparar el registro:\n%s" % e)
+                return
+            self.historial = Historial(acc)
+            self.acc = list(self.historial.datos())
             self.acc_corr = copy(self.acc)
+            self.pendiente = None
+            self.updateHistory()
+            if info['regularizado'] or info['reduccion'] > 1:
+                self.statusBar().showMessage("Registro remuestreado de %.1f Hz a %.1f Hz%s" % (info['fs'], info['fsFinal'],
+                        " (marcas de tiempo irregulares corregidas)" if info['regularizado'] else ""), 10000)
+            else:
+                self.statusBar().showMessage("Registro a %.1f Hz (sin remuestrear)" % info['fs'], 5000)
 
             self.baseLineAct.setEnabled(True)
             self.passBandAct.setEnabled(True)
             self.simuladAct.setEnabled(True)
+            self.exportAct.setEnabled(True)
 
             self.centralwidget.deleteLater()
             self.viewStart()
@@ -278,16 +327,20 @@ class MainWindow(QMainWindow):
 
         def genGraphs():
 
-            sig = [np.array(self.df['X']), np.array(self.df['Y']), np.array(self.df['Z'])]
+            sig = self.df[['X', 'Y', 'Z']].to_numpy().T
             t = np.array(self.df['Time'])
-            max_lim = max([ np.max(np.abs(sig[i])) for i in range(3)] )
+            im = medidasCache((self.curFile, self.version), sig, t[1] - t[0])
+            max_lim = np.max(im['pga'])
             w = 0.5
             colors = ['b', 'g', 'k']
             direct = ['X', 'Y', 'Z']
 
-            fig, axs = plt.subplots(3)
+            fig = Figure()
+            axs = fig.subplots(3)
             for i in range(3):
-                axs[i].plot(t, sig[i], colors[i],  lw = w , label= 'pico: ' + str(round(np.max(np.abs(sig[i])), 2)) + ' cm/s^2')
+                axs[i].plot(t, sig[i], colors[i],  lw = w , label= 'PGA: %.2f cm/s^2 | PGV: %.2f cm/s | PGD: %.2f cm | Ia: %.2f cm/s | CAV: %.1f cm/s | D5-95: %.2f s'
+                            % (im['pga'][i], im['pgv'][i], im['pgd'][i], im['arias'][i], im['cav'][i], im['d595'][i]))
+                axs[i].axvspan(im['t5'][i] + t[0], im['t95'][i] + t[0], color=colors[i], alpha=0.05)
                 axs[i].xaxis.set_tick_params(labelsize=6)
                 axs[i].yaxis.set_tick_params(labelsize=6)
                 axs[i].set_xlabel(xlabel='$Tiempo (s)$', fontsize= 'small')
@@ -298,7 +351,7 @@ class MainWindow(QMainWindow):
                 axs[i].set_ylim(-max_lim*1.05 , max_lim*1.05)
                 axs[i].grid(True, color='k', linestyle='-', linewidth=0.4, which='both', alpha = 0.2)
 
-            plt.subplots_adjust(left=0.085, bottom=0.085, right=0.98, top=0.97, wspace=0.2, hspace=0.15)
+            fig.subplots_adjust(left=0.085, bottom=0.085, right=0.98, top=0.97, wspace=0.2, hspace=0.15)
 
             self.figwindow = QMainWindow()
             canvasWidget = QWidget(self.figwindow)
@@ -330,6 +383,19 @@ class MainWindow(QMainWindow):
         self.horizontalSpacer = QSpacerItem(61, 20, QSizePolicy.Expanding, QSizePolicy.Minimum)
         self.gb2_HLyt.addItem(self.horizontalSpacer)
 
+        # Por defecto se propone max(fh del último pasa banda, mayor frecuencia del último
+        # modelo); sin ninguno de los dos el registro se procesa a su frecuencia original
+        fmax = frecuenciaMaxima(self.fh, self.Ωmodelo)
+        self.label_fmax = QLabel('Frec. max (Hz):', self.groupBox_2)
+        self.label_fmax.setToolTip("Se diezma el registro a la menor frecuencia de muestreo >= 2.5 veces este valor.\n"
+                                   "Se calcula del pasa banda (fh) y del modelo estructural; vacío para no remuestrear")
+        self.gb2_HLyt.addWidget(self.label_fmax)
+        self.lineEdit_fmax = QLineEdit('%.1f' % fmax if fmax else '', self.groupBox_2)
+        self.lineEdit_fmax.setPlaceholderText('original')
+        self.lineEdit_fmax.setAlignment(Qt.AlignCenter)
+        self.lineEdit_fmax.setMaximumWidth(60)
+        self.gb2_HLyt.addWidget(self.lineEdit_fmax)
+
         self.pushButton = QPushButton('OK', self.groupBox_2)
         self.pushButton.setShortcut("Return")
         self.pushButton.clicked.connect(okButton)
@@ -362,6 +428,11 @@ class MainWindow(QMainWindow):
         self.setCentralWidget(self.centralwidget)
 
     def viewBaseLine(self):
+        from matplotlib.backends.backend_qt5agg import FigureCanvas, NavigationToolbar2QT
+        from matplotlib.figure import Figure
+        from scipy import integrate
+        self.stopLive()
+
         def changeComboBox():
             combotex = self.comboBox.currentText()
 
@@ -374,8 +445,9 @@ class MainWindow(QMainWindow):
 
         def genGraphs():
 
-            self.vel_corr = [ integrate.cumtrapz(self.acc_corr[i], dx=self.dt, initial=0.0) for i in range(3)]
-            self.dsp_corr = [ integrate.cumtrapz(self.vel_corr[i], dx=self.dt, initial=0.0) for i in range(3)]
+            with etapa('cumtrapz'):
+                self.vel_corr = [ integrate.cumtrapz(self.acc_corr[i], dx=self.dt, initial=0.0) for i in range(3)]
+                self.dsp_corr = [ integrate.cumtrapz(self.vel_corr[i], dx=self.dt, initial=0.0) for i in range(3)]
 
             max_acc = max([ np.max(np.abs(self.acc_corr[i])) for i in range(3)] )
             max_vel = max([ np.max(np.abs(self.vel_corr[i])) for i in range(3)] )
@@ -421,9 +493,10 @@ class MainWindow(QMainWindow):
                 self.d[i].set_ylim(-max_dsp*1.05 , max_dsp*1.05)
                 self.d[i].grid(True, color='k', linestyle='-', linewidth=0.4, which='both', alpha = 0.2)
             
-            for i in range(3):
-                self.figs[i].subplots_adjust(left=0.15, bottom=0.085, right=0.97, top=0.97)
-                self.canvs[i].draw()   
+            with etapa('dibujo'):
+                for i in range(3):
+                    self.figs[i].subplots_adjust(left=0.15, bottom=0.085, right=0.97, top=0.97)
+                    self.canvs[i].draw()
 
         def apliButton():
             for i in range(3):
@@ -435,16 +508,19 @@ class MainWindow(QMainWindow):
             order = int(self.lineEdit_1.text())
             spline = int(self.lineEdit_2.text())
  
-            self.acc_corr = [ BaseLineCorrection(self.acc[i], dt=self.dt, type=kind, order=order, dspline=spline)  for i in range(3)]
+            parametros = dict(dt=self.dt, type=kind, order=order, dspline=spline)
+            self.acc_corr = list(BaseLineCorrection(np.array(self.acc), **parametros))
+            self.pendiente = ('Linea Base', BaseLineCorrection, parametros)
             genGraphs()
 
         def okButton():
-            self.acc = copy(self.acc_corr)
+            self.applyStep()
             self.centralwidget.deleteLater()
             self.viewStart()
 
         def cancelButton():
             self.acc_corr = copy(self.acc)
+            self.pendiente = None
             self.centralwidget.deleteLater()
             self.viewStart()
 
@@ -582,6 +658,10 @@ class MainWindow(QMainWindow):
         self.comboBox.textActivated.connect(changeComboBox)
 
     def viewPassBand(self):
+        from matplotlib.backends.backend_qt5agg import FigureCanvas, NavigationToolbar2QT
+        from matplotlib.figure import Figure
+        self.stopLive()
+
         def apliButton():
             
             for i in range(3):
@@ -592,26 +672,32 @@ class MainWindow(QMainWindow):
             fl = float(self.lineEdit_2.text())
             fh = float(self.lineEdit_3.text())
 
-            self.acc_corr = [ Butterworth_Bandpass(self.acc[i], self.dt, fl, fh, n) for i in range(3)]
+            parametros = dict(dt=self.dt, fl=fl, fh=fh, n=n)
+            self.fh = fh
+            self.acc_corr = list(Butterworth_Bandpass(np.array(self.acc), **parametros))
+            self.pendiente = ('Pasa Banda', Butterworth_Bandpass, parametros)
             genGraphs(vlines=True)
 
         def okButton():
-            self.acc = copy(self.acc_corr)
+            self.applyStep()
             self.centralwidget.deleteLater()
             self.viewStart()
 
         def cancelButton():
             self.acc_corr = copy(self.acc)
+            self.pendiente = None
             self.centralwidget.deleteLater()
             self.viewStart()
 
         def genGraphs(vlines=False):
 
-            self.fou = [np.fft.rfft(self.acc_corr[i]) for i in range(3)]
-            self.fre = np.fft.rfftfreq(len(self.t), d = self.dt)
+            # Espectros suavizados (Konno-Ohmachi) en una grilla logarítmica de 300 frecuencias
+            amp = np.abs(hilos.rfft(np.array(self.acc_corr), axis=1))/self.t[-1]
+            self.fre, self.fou = suavizar(amp, self.dt, N=len(self.t))
+            pico_fou = np.max(amp, axis=1)
 
             max_acc = max([ np.max(np.abs(self.acc_corr[i])) for i in range(3)] )
-            max_fou = max([ np.max(np.abs(self.fou[i])/self.t[-1]) for i in range(3)] )
+            max_fou = np.max(self.fou)
 
             colors = ['b', 'g', 'k']
             direct = ['X', 'Y', 'Z']
@@ -620,7 +706,8 @@ class MainWindow(QMainWindow):
             ftsize = 'xx-small'
 
             for i in range(3):
-                self.f.plot(self.fre, np.abs(self.fou[i])/self.t[-1], colors[i], lw = w , label= 'pico: ' + str(round(np.max(np.abs(self.fou[i])/self.t[-1]), 2)) + ' cm/s')
+                self.f.plot(self.fre, self.fou[i], colors[i], lw = w , label= 'pico: ' + str(round(pico_fou[i], 2)) + ' cm/s')
+            self.f.set_xscale('log')
             self.f.set_xlabel(xlabel='$Frecuencia (Hz)$', fontsize= ftsize)
             self.f.set_ylabel(ylabel='Amplitus de Fourier %s ($cm/s$)' %direct[i], fontsize=ftsize)
             self.f.xaxis.set_tick_params(labelsize=lbsize)
@@ -636,7 +723,8 @@ class MainWindow(QMainWindow):
 
 
             self.figs[0].subplots_adjust(left=0.1, bottom=0.085, right=0.97, top=0.97)
-            self.canvs[0].draw()  
+            with etapa('dibujo'):
+                self.canvs[0].draw()
 
             for i in range(3):
                 self.a[i].plot(self.t, self.acc_corr[i], colors[i], lw = w , label= 'pico: ' + str(round(np.max(np.abs(self.acc_corr[i])), 2)) + ' cm/s^2')
@@ -651,7 +739,8 @@ class MainWindow(QMainWindow):
                 self.a[i].grid(True, color='k', linestyle='-', linewidth=0.4, which='both', alpha = 0.2)
 
             self.figs[1].subplots_adjust(left=0.1, bottom=0.085, right=0.97, top=0.97)
-            self.canvs[1].draw()  
+            with etapa('dibujo'):
+                self.canvs[1].draw()
 
 
         self.figs = [ Figure() for i in range(2) ]
@@ -771,8 +860,20 @@ class MainWindow(QMainWindow):
         self.setCentralWidget(self.centralwidget)
 
     def viewSimula(self):
+        from matplotlib.backends.backend_qt5agg import FigureCanvas, NavigationToolbar2QT
+        from matplotlib.figure import Figure
+        import matplotlib.animation as animation
+        from matplotlib.collections import LineCollection
+        from scipy import integrate
 
-        def mdof(n, direct='X', m=10000, k=2000000):
+        class Animacion(animation.FuncAnimation):
+            # Cada cuadro (actualización de los datos y dibujo con blit) se mide como la etapa 'cuadro'
+            def _draw_next_frame(self, framedata, blit):
+                with etapa('cuadro'):
+                    super()._draw_next_frame(framedata, blit)
+        self.stopLive()
+
+        def mdof(n, direct='X', m=10000, k=2000000, solver='Newmark'):
 
 
             if direct == 'X':
@@ -785,45 +886,44 @@ class MainWindow(QMainWindow):
             mm = self.mdof.MatrizMasa([m for i in range(n)])
             kk = self.mdof.MatrizRigidez([k for i in range(n)])
             self.mdof.Modos(500)
+            self.Ωmodelo = self.mdof.Ω
 
             I = np.ones((len(mm[0]),1))
             p = -mm@I*self.at
-            self.mdof.Newmark(n, p , self.dt)
+            if solver == 'Frecuencia':
+                self.mdof.Frecuencia(n, p , self.dt)
+            elif solver == 'Rayleigh':
+                self.mdof.MatrizRayleigh(0.05)
+                self.mdof.NewmarkFisico(p, self.dt)
+            else:
+                self.mdof.Newmark(n, p , self.dt)
+
+        def portico(n, xx, h):
+            """
+            Geometría del pórtico de n pisos como 3n segmentos (col. izquierda,
+            col. derecha y techo de cada piso). Retorna los índices del nivel
+            (0 = base) de cada extremo, su abscisa sin deformar, su altura y el
+            ancho de línea de cada segmento.
+            """
+            piso = np.arange(1, n+1)
+            nivel = np.concatenate([np.stack((piso-1, piso), axis=1)]*2 + [np.stack((piso, piso), axis=1)])
+            x0 = np.concatenate([np.full((n, 2), -xx), np.full((n, 2), xx), np.tile([-xx, xx], (n, 1))])
+            return nivel, x0, nivel*h, np.repeat([5, 5, 8], n)
 
         def animate(step, factor):
-            self.alt = 0.0
-            self.h = float(self.lineEdit_4.text())
-            for i in range(self.n_floor):
-                j = (self.n_floor - 1) - i
-                self.line_acc[i].set_xdata(self.t[:step])
-                self.line_acc[i].set_ydata(self.mdof.upp[j][:step])
-                self.line_vel[i].set_xdata(self.t[:step])
-                self.line_vel[i].set_ydata(self.mdof.up[j][:step])
-                self.line_dsp[i].set_xdata(self.t[:step])
-                self.line_dsp[i].set_ydata(self.mdof.u[j][:step])
-
-            self.line_acc[-1].set_xdata(self.t[:step])
-            self.line_acc[-1].set_ydata(self.at[:step])
-            self.line_vel[-1].set_xdata(self.t[:step])
-            self.line_vel[-1].set_ydata(self.upt[:step])
-            self.line_dsp[-1].set_xdata(self.t[:step])
-            self.line_dsp[-1].set_ydata(self.ut[:step])
-
+            # Historias: vistas de los arrays ya ordenados (sin copiar)
+            for i in range(self.n_floor+1):
+                self.line_acc[i].set_data(self.t[:step], self.hist_acc[i][:step])
+                self.line_vel[i].set_data(self.t[:step], self.hist_vel[i][:step])
+                self.line_dsp[i].set_data(self.t[:step], self.hist_dsp[i][:step])
+
+            # Pórtico: una sola expresión vectorizada sobre las posiciones precalculadas;
+            # la amplificación se lee en cada cuadro para poder cambiarla durante la animación
             amp = float(self.lineEdit_5.text())
-                
-            self.line_lc[0].set_data([-self.xx, -self.xx + amp*self.mdof.u[0][step]], [self.yy[0][step], self.yy[1][step]])
-            self.line_rc[0].set_data([ self.xx,  self.xx + amp*self.mdof.u[0][step]], [self.yy[0][step], self.yy[1][step]])
-            self.line_fl[0].set_data([-self.xx + amp*self.mdof.u[0][step], self.xx + amp*self.mdof.u[0][step]], [self.yy[1][step], self.yy[1][step]])
-
-            for i in range(1, self.n_floor):
-                self.alt += self.h
-                self.line_lc[i].set_data([-self.xx + amp*self.mdof.u[i-1][step], -self.xx + amp*self.mdof.u[i][step]], [self.yy[i][step], self.yy[i+1][step]])
-                self.line_rc[i].set_data([ self.xx + amp*self.mdof.u[i-1][step],  self.xx + amp*self.mdof.u[i][step]], [self.yy[i][step], self.yy[i+1][step]])
-                self.line_fl[i].set_data([-self.xx + amp*self.mdof.u[i][step], self.xx + amp*self.mdof.u[i][step]], [self.yy[i+1][step], self.yy[i+1][step]])
+            self.segs[:, :, 0] = self.seg_x0 + amp*self.udef[step][self.seg_nivel]
+            self.frame.set_segments(self.segs)
 
-            r = self.line_acc + self.line_vel + self.line_dsp + self.line_lc + self.line_rc + self.line_fl
-
-            return r
+            return self.line_acc + self.line_vel + self.line_dsp + [self.frame]
         
         def genGraphs(play=False):
             w = 0.5
@@ -838,8 +938,9 @@ class MainWindow(QMainWindow):
             self.ax_vel = []
             self.ax_acc = []
 
-            self.upt = integrate.cumtrapz(self.at, dx=self.dt, initial=0.0)
-            self.ut = integrate.cumtrapz(self.upt, dx=self.dt, initial=0.0)
+            with etapa('cumtrapz'):
+                self.upt = integrate.cumtrapz(self.at, dx=self.dt, initial=0.0)
+                self.ut = integrate.cumtrapz(self.upt, dx=self.dt, initial=0.0)
             self.acc_limit = max([ self.acc_limit, np.max(np.abs(self.at))])
             self.vel_limit = max([ self.vel_limit, np.max(np.abs(self.upt))])
             self.dsp_limit = max([ self.dsp_limit, np.max(np.abs(self.ut))])
@@ -928,13 +1029,12 @@ class MainWindow(QMainWindow):
 
             self.xx = 50*float(self.lineEdit_3.text())
             self.h = float(self.lineEdit_4.text())
-            self.alt = 0.0
+            self.alt = self.n_floor*self.h
             offset = 200.0
-            for i in range(self.n_floor):
-                self.alt += self.h
-                self.bld.plot([-self.xx, -self.xx], [self.alt-self.h, self.alt], 'k', lw=5, alpha=alpha) # col izquierda
-                self.bld.plot([self.xx, self.xx], [self.alt-self.h, self.alt], 'k', lw=5, alpha=alpha) # col derecha
-                self.bld.plot([-self.xx, self.xx], [self.alt, self.alt], 'k', lw=8, alpha=alpha) # techo
+            self.seg_nivel, self.seg_x0, seg_y, seg_lw = portico(self.n_floor, self.xx, self.h)
+            # Pórtico sin deformar: columnas y techos de todos los pisos en una sola colección
+            self.segs = np.stack((self.seg_x0, seg_y), axis=2)
+            self.bld.add_collection(LineCollection(self.segs.copy(), colors='k', linewidths=seg_lw, alpha=alpha))
             self.bld.xaxis.set_tick_params(labelsize=6)
             self.bld.yaxis.set_tick_params(labelsize=6)
             self.bld.set_xlabel(xlabel='$cm$', fontsize= 'xx-small')
@@ -947,16 +1047,17 @@ class MainWindow(QMainWindow):
                 self.line_acc = []
                 self.line_vel = []
                 self.line_dsp = []
-                self.line_lc = []
-                self.line_rc = []
-                self.line_fl = []
 
-                self.alt = 0.0
-                self.yy = []
+                # Historias en el orden de los ejes (pisos de arriba hacia abajo y terreno)
+                self.hist_acc = list(self.mdof.upp[::-1]) + [self.at]
+                self.hist_vel = list(self.mdof.up[::-1]) + [self.upt]
+                self.hist_dsp = list(self.mdof.u[::-1]) + [self.ut]
 
-                self.lc, = self.bld.plot([], [],'k-',lw=5)
-                self.rc, = self.bld.plot([], [],'k-',lw=5)
-                self.fl, = self.bld.plot([], [],'k-',lw=8)
+                # Desplazamiento de cada nivel (base = 0) para todos los pasos: (N, n_floor+1)
+                self.udef = np.zeros((len(self.t), self.n_floor+1))
+                self.udef[:, 1:] = self.mdof.u.T
+                self.frame = LineCollection(self.segs.copy(), colors='k', linewidths=seg_lw)
+                self.bld.add_collection(self.frame)
 
                 for i in range(self.n_floor+1):
                     a, = self.ax_acc[i].plot([], [], colors[0], lw=w)
@@ -965,23 +1066,27 @@ class MainWindow(QMainWindow):
                     self.line_vel.append(v)
                     d, = self.ax_dsp[i].plot([], [], colors[2], lw=w)
                     self.line_dsp.append(d)
-                    lc, = self.bld.plot([], [],'k-',lw=5)
-                    self.line_lc.append(lc)
-                    rc, = self.bld.plot([], [],'k-',lw=5)
-                    self.line_rc.append(rc)
-                    fl, = self.bld.plot([], [],'k-',lw=8)
-                    self.line_fl.append(fl)
-                    self.yy.append(np.array([self.alt for i in range(len(self.t))]))
-                    self.alt += self.h
-                    
+
                 factor = 1000
-                ani = animation.FuncAnimation(self.fig, animate, frames=len(self.t), fargs=(factor,), interval=0.1, blit=True)
+                ani = Animacion(self.fig, animate, frames=len(self.t), fargs=(factor,), interval=0.1, blit=True)
 
             self.fig.subplots_adjust(left=0.035, bottom=0.07, right=0.985, top=0.95,  hspace=0.0, wspace=0.15)
-            self.canvs.draw()
+            with etapa('dibujo'):
+                self.canvs.draw()
             
         def playButton():
 
+            # Se resuelve antes de borrar la figura: si el solver falla se conserva la anterior
+            try:
+                n_floor = int(self.comboBox_2.currentText())
+                m = 1000*float(self.lineEdit_1.text())
+                k = 1000*float(self.lineEdit_2.text())
+                mdof(n_floor, direct=self.comboBox_1.currentText(), m=m, k=k, solver=self.comboBox_3.currentText())
+            except ValueError as e:
+                QMessageBox.warning(self, "Aplicacion", "No se pudo resolver el modelo:\n%s" % e)
+                return
+            self.n_floor = n_floor
+
             for i in range(len(self.ax_acc)):
                  self.ax_acc[i].remove
                  self.ax_vel[i].remove
@@ -989,17 +1094,22 @@ class MainWindow(QMainWindow):
 
             self.fig.clf()
 
-            self.n_floor = int(self.comboBox_2.currentText())
-            m = 1000*float(self.lineEdit_1.text())
-            k = 1000*float(self.lineEdit_2.text())
-            
-            mdof(self.n_floor, direct=self.comboBox_1.currentText(), m=m, k=k)
-
             self.gs = self.fig.add_gridspec(self.n_floor+1, 4)
 
             genGraphs(play=True)
 
         def resetButton():
+            # Se resuelve antes de borrar la figura: si el solver falla se conserva la anterior
+            try:
+                n_floor = int(self.comboBox_2.currentText())
+                m = 1000*float(self.lineEdit_1.text())
+                k = 1000*float(self.lineEdit_2.text())
+                mdof(n_floor, direct=self.comboBox_1.currentText(), m=m, k=k, solver=self.comboBox_3.currentText())
+            except ValueError as e:
+                QMessageBox.warning(self, "Aplicacion", "No se pudo resolver el modelo:\n%s" % e)
+                return
+            self.n_floor = n_floor
+
             for i in range(len(self.ax_acc)):
                  self.ax_acc[i].remove
                  self.ax_vel[i].remove
@@ -1007,12 +1117,6 @@ class MainWindow(QMainWindow):
 
             self.fig.clf()
 
-            self.n_floor = int(self.comboBox_2.currentText())
-            m = 1000*float(self.lineEdit_1.text())
-            k = 1000*float(self.lineEdit_2.text())
-            
-            mdof(self.n_floor, direct=self.comboBox_1.currentText(), m=m, k=k)
-
             self.gs = self.fig.add_gridspec(self.n_floor+1, 4)
 
             genGraphs(play=False)
@@ -1069,6 +1173,18 @@ class MainWindow(QMainWindow):
             self.comboBox_2.addItem("%d" %(i))
         self.comboBox_2.setCurrentText('4')
         self.gb_2_HLyt.addWidget(self.comboBox_2)
+
+        self.label_8 = QLabel('Solucion:', self.groupBox_2)
+        self.label_8.setAlignment(Qt.AlignRight|Qt.AlignTrailing|Qt.AlignVCenter)
+        self.gb_2_HLyt.addWidget(self.label_8)
+
+        self.comboBox_3 = QComboBox(self.groupBox_2)
+        self.comboBox_3.addItem("Newmark")
+        self.comboBox_3.addItem("Frecuencia")
+        self.comboBox_3.addItem("Rayleigh")
+        self.comboBox_3.setToolTip("Frecuencia: funciones de transferencia modales con FFT, conviene para registros largos\n"
+                                   "Rayleigh: Newmark en coordenadas fisicas con amortiguamiento de Rayleigh (5% en los modos 1 y 2)")
+        self.gb_2_HLyt.addWidget(self.comboBox_3)
         
         self.horizontalSpacer_2 = QSpacerItem(40, 20, QSizePolicy.Expanding, QSizePolicy.Minimum)
         self.gb_2_HLyt.addItem(self.horizontalSpacer_2)
@@ -1154,6 +1270,133 @@ class MainWindow(QMainWindow):
 
         genGraphs()
 
+    def viewLive(self):
+        from matplotlib.backends.backend_qt5agg import FigureCanvas, NavigationToolbar2QT
+        from matplotlib.figure import Figure
+        from tiempo_real import Estacion, abrirProductor
+        self.stopLive()
+
+        def startButton():
+            stopButton()
+            try:
+                dt = float(self.lineEdit_2.text())
+                self.estacion = Estacion(abrirProductor(self.lineEdit_1.text()), dt,
+                        ventana=float(self.lineEdit_3.text()), fl=float(self.lineEdit_4.text()), fh=float(self.lineEdit_5.text()))
+            except (OSError, ValueError) as e:
+                QMessageBox.warning(self, "Aplicacion", "No se pudo iniciar la adquisicion:\n%s" % e)
+                return
+            self.liveTimer.start(100) # 10 actualizaciones por segundo
+
+        def stopButton():
+            self.liveTimer.stop()
+            if self.estacion is not None:
+                self.estacion.productor.cerrar()
+                self.estacion = None
+
+        def closeButton():
+            stopButton()
+            self.centralwidget.deleteLater()
+            self.viewStart()
+
+        def update():
+            # Cada actualización (muestras nuevas, filtro, detector y dibujo) se mide como una etapa
+            with etapa('tiempo real'):
+                # Solo se procesan las muestras nuevas; los buffers tienen tamaño fijo
+                if self.estacion.actualizar() == 0:
+                    return
+                t = self.estacion.tiempo.ultimos()[0]
+                acc = self.estacion.acc.ultimos()
+                razon = self.estacion.razon.ultimos()[0]
+                pga = self.estacion.pgaMovil()
+                lim = max(np.max(pga), 1e-6)*1.05
+                t1 = max(t[-1], t[0] + self.estacion.dt)
+
+                for i in range(3):
+                    self.live_lines[i].set_data(t, acc[i])
+                    self.live_lines[i].set_label('PGA %s: %.2f cm/s^2' % (direct[i], pga[i]))
+                    self.a[i].set_xlim(t[0], t1)
+                    self.a[i].set_ylim(-lim, lim)
+                    self.a[i].legend(loc='upper right', frameon=True, fontsize='xx-small', handlelength=2.0)
+                self.live_lines[3].set_data(t, razon)
+                self.a[3].set_xlim(t[0], t1)
+                self.a[3].set_ylim(0, max(np.max(razon), self.estacion.detector.encendido)*1.1)
+
+                estado = 'EVENTO' if self.estacion.detector.activo else 'sin evento'
+                self.label_6.setText('PGA: %.2f cm/s^2 | %s' % (self.estacion.pga, estado))
+                self.canvs.draw()
+
+        colors = ['b', 'g', 'k', 'r']
+        direct = ['X', 'Y', 'Z']
+        self.liveTimer = QTimer(self)
+        self.liveTimer.timeout.connect(update)
+
+        self.fig = Figure()
+        self.canvs = FigureCanvas(self.fig)
+        self.a = self.fig.subplots(4, sharex=True)
+        self.live_lines = []
+        for i in range(4):
+            line, = self.a[i].plot([], [], colors[i], lw=0.5)
+            self.live_lines.append(line)
+            self.a[i].xaxis.set_tick_params(labelsize=6)
+            self.a[i].yaxis.set_tick_params(labelsize=6)
+            self.a[i].grid(True, color='k', linestyle='-', linewidth=0.4, which='both', alpha = 0.2)
+            if i < 3:
+                self.a[i].set_ylabel(ylabel='Aceleración en %s ($cm/s^2$)' %direct[i], fontsize='xx-small')
+        self.a[3].set_ylabel(ylabel='STA/LTA', fontsize='xx-small')
+        self.a[3].set_xlabel(xlabel='$Tiempo (s)$', fontsize='xx-small')
+        self.fig.subplots_adjust(left=0.06, bottom=0.07, right=0.98, top=0.97, hspace=0.1)
+
+        self.centralwidget = QWidget(self)
+        self.verticalLayout = QVBoxLayout(self.centralwidget)
+
+        self.groupBox = QGroupBox('Tiempo real', self.centralwidget)
+        self.groupBox.setAlignment(Qt.AlignCenter)
+        self.gb_1_HLyt = QHBoxLayout(self.groupBox)
+        w = QMainWindow()
+        wWidget = QWidget()
+        wLayout = QHBoxLayout(wWidget)
+        wLayout.addWidget(self.canvs)
+        w.addToolBar(Qt.BottomToolBarArea, NavigationToolbar2QT(self.canvs, self))
+        w.setCentralWidget(wWidget)
+        self.gb_1_HLyt.addWidget(w)
+        self.verticalLayout.addWidget(self.groupBox)
+
+        self.groupBox_2 = QGroupBox('Opciones', self.centralwidget)
+        self.gb_2_HLyt = QHBoxLayout(self.groupBox_2)
+
+        campos = [('Fuente:', '/tmp/estacion.csv'), ('dt (s):', '0.01'), ('Ventana (s):', '60'),
+                  ('Low Cut (Hz)', '0.1'), ('High Cut (Hz)', '20')]
+        for i, (texto, valor) in enumerate(campos):
+            label = QLabel(texto, self.groupBox_2)
+            label.setAlignment(Qt.AlignRight|Qt.AlignTrailing|Qt.AlignVCenter)
+            self.gb_2_HLyt.addWidget(label)
+            lineEdit = QLineEdit(valor, self.groupBox_2)
+            lineEdit.setAlignment(Qt.AlignCenter)
+            self.gb_2_HLyt.addWidget(lineEdit)
+            setattr(self, 'label_%d' % (i+1), label)
+            setattr(self, 'lineEdit_%d' % (i+1), lineEdit)
+        self.lineEdit_1.setToolTip("Archivo que se va escribiendo, o 'unix:/ruta' para un socket UNIX")
+
+        self.label_6 = QLabel('', self.groupBox_2)
+        self.gb_2_HLyt.addWidget(self.label_6)
+
+        self.pushButton_1 = QPushButton('Iniciar', self.groupBox_2)
+        self.pushButton_1.clicked.connect(startButton)
+        self.gb_2_HLyt.addWidget(self.pushButton_1)
+
+        self.pushButton_2 = QPushButton('Detener', self.groupBox_2)
+        self.pushButton_2.clicked.connect(stopButton)
+        self.gb_2_HLyt.addWidget(self.pushButton_2)
+
+        self.pushButton_3 = QPushButton('Salir', self.groupBox_2)
+        self.pushButton_3.clicked.connect(closeButton)
+        self.gb_2_HLyt.addWidget(self.pushButton_3)
+
+        self.verticalLayout.addWidget(self.groupBox_2)
+        self.verticalLayout.setStretch(0, 10)
+
+        self.setCentralWidget(self.centralwidget)
+
 ##################################################################################
 
 class pandasModel(QAbstractTableModel):
@@ -1179,214 +1422,6 @@ class pandasModel(QAbstractTableModel):
             return self._data.columns[col]
         return None
 
-class VGL:
-
-	def __init__(self):
-		"""
-		"""
-		pass
-
-	def MatrizRigidez(self, args):
-		"""
-                Construye la matriz de rigideces pasando por parámetro una tupla con
-		los valores de las rigideces.
-		"""
-		n = len(args)
-		self.n = n
-		self.k = np.zeros((n,n))
-
-		self.k[0][0] = args[0] + args[1]
-		self.k[0][1] = -args[1]
-
-		for i in range(1,n-1):
-			self.k[i][i-1] = -args[i]
-			self.k[i][i] = args[i] + args[i+1]
-			self.k[i][i+1] = -args[i+1]
-
-		self.k[n-1][n-2] = -args[n-1]
-		self.k[n-1][n-1] = args[n-1]
-
-		return self.k
-
-	def MatrizMasa(self, args):
-		"""
-		Construye la matriz de masas pasando por parámetro una tupla con
-		los valores de las masas.
-		"""
-		n = len(args)
-		self.n = n
-		self.m = np.zeros((n,n))
-
-		for i in range(n):
-			self.m[i][i] = args[i]
-
-		return self.m
-
-	def Modos(self, iteraciones):
-
-		# Comvirtiendo a la forma clásica
-		r = np.zeros((self.n, self.n))
-
-		for i in range(self.n):
-			r[i][i] = self.m[i][i]**(-0.5)
-
-		A = r@self.k@r
-
-		jacobi = Jacobi(A, iteraciones)
-		self.T = 2*np.pi*jacobi.Ω.diagonal()**(-1)
-		self.Ω = jacobi.Ω
-		self.Φ = jacobi.Φ
-
-		# Normalizando los modos
-		for i in range(self.n):
-			self.Φ[:,i:i+1] = self.Φ[:,i:i+1]/(self.Φ[:,i:i+1].T@self.m@self.Φ[:,i:i+1])**0.5
-		
-		
-		# Ordenando de mayor a menor periodo del modo (Burbuja)
-		G = copy(self.Φ.T)
-		for i in range(self.n-1):
-			for j in range(i+1,self.n):
-				if self.T[i] < self.T[j]:
-					temp1, temp2, temp3  = self.T[i], self.Ω[i][i], copy(G[i])
-					self.T[i], self.Ω[i][i], G[i] = self.T[j], self.Ω[j][j], copy(G[j])
-					self.T[j], self.Ω[j][j], G[j] = temp1, temp2, temp3
-		self.Φ = G.T
-
-		# Factores de participación estática
-		self.Γ = np.zeros(self.n)
-		I = np.ones((self.n,1))
-		for i in range(self.n):
-			x = self.Φ[:,i:i+1].T@self.m@I/(self.Φ[:,i:i+1].T@self.m@self.Φ[:,i:i+1])
-			self.Γ[i] = x[0][0]
-
-	def Newmark(self , J , p , Δt , ζ = 0.05 , β = 1/4 , γ = 1/2):
-		"""
-		Resuelve el sistema de ecuaciones diferenciales de un sistema VGL de forma matricial a traves del método de Newmark
-		El sistema de ecuaciones tiene ma forma:
-				m*upp + c*up + k*u = p(t)  Para exitaciones sísmicas p(t) = -m*I*at(t)
-		Dónde:
-		m : matriz de masas
-		k : matriz de rigideces
-		c : matriz de coeficientes de fricción
-		u : respuesta de desplazamientos de cada nivel relativo a la base.
-		at(t): acelelacion del terreno 
-
-		El sistema se transforma a coordenadas nodales según Chopra de la siguiente manera:
-				M*qpp + C*qp + K*q = P(t)
-		Dónde:
-		M = ΦT*m*Φ
-		C = ΦT*c*Φ
-		K = ΦT*k*Φ
-		P(t) = ΦT*p(t)
-		Φ : Matriz modal
-
-		Luego las respuestas del sistema original es:
-				u(t) = Φ*q(t)
-				upp(t) = Φ*qpp(t)
-
-		Parámetros:
-		J : Cantidad de modos a participar
-		p : Para exitaciones sísmicas -m*I*at(t)
-		Δt : Paso de tiempo de la aceleracion del terreno at(t) o de p(t)
-		ζ : Fracción de amortiguamiendo modal, se considera que es igual para todos los modos
-		γ : parametro de presición, generalmente 1/2
-        β : razón de la variacion de la aceleración, generalmente entre 1/4 y 1/6
-            Para β=1/6 se le llama el método de la aceleración lineal y para
-            β=1/4, método de la aceleración de promedio constante.
-        	El método es convergente si Δt/Tn < (1/π√2)[1/√(γ −2β)] donde Tn es el perido del modo n.
-		"""
-
-		# print(J, p, Δt)
-		# print(type(J), type(p),type(Δt))
-		m = self.m
-		k = self.k
-		Φ = self.Φ[:,0:J]
-		Ω = self.Ω[0:J,0:J]
-
-		M = Φ.T@m@Φ
-		K = Φ.T@k@Φ
-		C = 2*ζ*M@Ω
-		
-		n = len(M[0])
-		m = len(p[0])
-
-		# 1.1) Se considera que el sistema parte del reposo
-		q = np.zeros((n,m))
-		qp = np.zeros((n,m))
-		# 1.2) # P[0] = Φ.T@p[0]
-		P0 = Φ.T@p[:,0:1]
-		# 1.3) Se Resuelve M@qpp[0] = P[0] - C@qp[0]- K@q[0], M = I --->qpp0
-		qpp = np.zeros((n,m))
-		qpp[:,0:1] = P0 - C@qp[:,0:1] - K@q[:,0:1]
-		# 1.4) Δt = dt
-		# 1.5)
-		a1 = M/(β*Δt**2) + γ*C/(β*Δt)
-		a2 = M/(β*Δt) + (γ/β - 1)*C
-		a3 = (1/(2*β) - 1)*M + Δt*(γ/(2*β) - 1)*C
-		# 1.6)
-		Kp = K + a1
-		# 2.0)
-		for i in range(m-1):
-			# 2.1) P[i+1] = Φ.T@p[i+1] + a1*q[i] + a2*qp[i] + a3*qpp[i]
-			Ppi_1 = Φ.T@p[:,i+1:i+2] + a1@q[:,i:i+1] + a2@qp[:,i:i+1] + a3@qpp[:,i:i+1]
-			# 2.2) Se resuelve Kp@q[i+1] = Pp[i+1] --> q[i+1]
-			for j in range(n):
-				q[:,i+1:i+2][j] =  Ppi_1[j][0]/Kp[j][j]
-			# 2.3) qp[i+1] = (γ/(β*Δt))*(q[i+1] - q[i]) + (1 - γ/β)*qp[i] + Δt*(1 - γ/(2*β))*qpp[i]
-			qp[:,i+1:i+2] =  (γ/(β*Δt))*(q[:,i+1:i+2] - q[:,i:i+1]) + (1 - γ/β)*qp[:,i:i+1] + Δt*(1 - γ/(2*β))*qpp[:,i:i+1]
-			# 2.4) qpp[i+1] = (q[i+1] - q[i])/(β*self.Δt**2) - qp[i]/(β*Δt) - ( 1/(2*β) - 1 )*qpp[i]
-			qpp[:,i+1:i+2] = (q[:,i+1:i+2] - q[:,i:i+1])/(β*Δt**2) - qp[:,i:i+1]/(β*Δt) - ( 1/(2*β) - 1 )*qpp[:,i:i+1]
-
-		self.u = Φ@q
-		self.up = Φ@qp
-		self.upp = Φ@qpp
-
-class Jacobi:
-
-	def __init__(self, A, n):
-		# número de ciclos
-		self.t = len(A[0])
-		self.Ak = copy(A)
-		self.s = 0
-		self.Pk = np.eye(self.t)
-		self.produc_Pk = self.Pk
-
-		for i in range(n):
-			self.un_ciclo()
-
-		self.Ω = np.eye(self.t)
-
-		for i in range(self.t):
-			self.Ω[i][i] =  self.Ak[i][i]**0.5
-		self.Φ = self.produc_Pk
-
-	def P(self, Ak, i, j):
-		P = np.eye(self.t)
-		self.teta = self.θ(Ak[i][i], Ak[j][j], Ak[i][j])
-		P[i][i] = cos(self.teta)
-		P[j][j] = cos(self.teta)
-		P[i][j] = -sin(self.teta)
-		P[j][i] = sin(self.teta)
-
-		return P
-
-	def θ(self, aii, ajj, aij):
-		if aii != ajj :
-			return 0.5*atan( 2*aij/(aii - ajj) )
-		else:
-			return np.pi/4
-
-	def un_ciclo(self):
-
-		for i in range(self.t-1):
-			for j in range(i+1,self.t):
-
-				self.s +=1
-				self.Pk = self.P(self.Ak, i, j)
-				self.Ak = self.Pk.T@self.Ak@self.Pk
-
-				self.produc_Pk = self.produc_Pk@self.Pk
-
 if __name__ == '__main__':
     import sys
 
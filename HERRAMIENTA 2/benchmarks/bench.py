@@ -0,0 +1,305 @@
+"""
+Benchmarks de los kernels numéricos de la aplicación.
+
+Uso (desde la carpeta HERRAMIENTA 2):
+
+    python benchmarks/bench.py                      # corre todo y muestra la tabla
+    python benchmarks/bench.py --rapido             # tamaños reducidos
+    python benchmarks/bench.py -o resultados.json   # guarda los resultados
+    python benchmarks/bench.py --guardar-base       # guarda los resultados como línea base
+    python benchmarks/bench.py --comparar           # compara contra la línea base
+    python benchmarks/bench.py -k Newmark           # solo los casos que contienen 'Newmark'
+
+Los casos 'kernels.*' se miden con los dos backends de kernels.py (numpy y
+numba; los de numba se omiten si no está instalado) para ver la aceleración.
+
+Jacobi y los modos llegan a 500 GDL en la corrida completa. 'VGL.Modos(500)'
+(500 ciclos) se mide solo hasta 10 GDL; los tamaños grandes van en
+'VGL.Modos(10)'. Con el backend numpy cada ciclo de Jacobi a 500 GDL toma
+varios segundos, por lo que esos casos se miden con una sola repetición.
+
+Los resultados son un JSON con los metadatos de la máquina y, por cada caso
+('nombre/tamaño'), el tiempo mínimo y medio en segundos. Con --comparar el
+programa termina con código 1 si algún caso es más lento que la línea base
+en más de --tolerancia (por defecto 25 %).
+"""
+import os, sys, time, json, argparse, platform, tempfile, functools
+import numpy as np
+
+CARPETA = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, CARPETA)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from instrumentacion import registro
+from funciones import BaseLineCorrection, Butterworth_Bandpass
+from vgl import VGL, Jacobi
+import kernels
+from sinteticos import registroSintetico, guardarCSV
+
+BASE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+DT = 0.01
+
+CASOS = []
+
+def caso(nombre, tamanos, rapido):
+    """
+    Registra un caso. 'preparar(n)' arma los datos y retorna la función a medir.
+    """
+    def decorador(preparar):
+        CASOS.append((nombre, tamanos, rapido, preparar))
+        return preparar
+    return decorador
+
+@functools.lru_cache(maxsize=4)
+def registroN(n):
+    return registroSintetico(n, dt=DT)
+
+def edificio(n):
+    """
+    VGL de n pisos iguales con sus modos calculados con scipy.linalg.eigh (no
+    con Jacobi, que para cientos de GDL tardaría demasiado).
+    """
+    from scipy.linalg import eigh
+    v = VGL()
+    v.MatrizMasa([10000.0]*n)
+    v.MatrizRigidez([2000000.0]*n)
+    w, Φ = eigh(v.k, v.m)
+    v.Ω = np.diag(np.sqrt(w))
+    v.Φ = Φ
+    v.T = 2*np.pi/np.sqrt(w)
+    return v
+
+REGISTROS = [10**3, 10**4, 10**5, 10**6, 10**7]
+REGISTROS_RAPIDO = [10**3, 10**5]
+GDL = [2, 5, 10, 50, 100, 500]
+GDL_RAPIDO = [2, 10, 50]
+
+@caso('BaseLineCorrection[Polinomial]', REGISTROS, REGISTROS_RAPIDO)
+def _(n):
+    t, acc = registroN(n)
+    return lambda: BaseLineCorrection(acc[0], dt=DT, type='Polinomial', order=2)
+
+@caso('BaseLineCorrection[Polinomial, 3 canales]', REGISTROS, REGISTROS_RAPIDO)
+def _(n):
+    t, acc = registroN(n)
+    return lambda: BaseLineCorrection(acc, dt=DT, type='Polinomial', order=2)
+
+@caso('BaseLineCorrection[Spline]', REGISTROS, REGISTROS_RAPIDO)
+def _(n):
+    t, acc = registroN(n)
+    return lambda: BaseLineCorrection(acc[0], dt=DT, type='Spline', order=3, dspline=1000)
+
+@caso('Butterworth_Bandpass', REGISTROS, REGISTROS_RAPIDO)
+def _(n):
+    t, acc = registroN(n)
+    return lambda: Butterworth_Bandpass(acc[0], DT, 0.1, 20.0, 5)
+
+@caso('Butterworth_Bandpass[3 canales]', REGISTROS, REGISTROS_RAPIDO)
+def _(n):
+    t, acc = registroN(n)
+    return lambda: Butterworth_Bandpass(acc, DT, 0.1, 20.0, 5)
+
+@caso('VGL.MatrizRigidez', GDL, GDL_RAPIDO)
+def _(n):
+    v = VGL()
+    k = [2000000.0]*n
+    return lambda: v.MatrizRigidez(k)
+
+@caso('VGL.Modos(500)', [2, 4, 10], [2, 4])
+def _(n):
+    v = VGL()
+    v.MatrizMasa([10000.0]*n)
+    v.MatrizRigidez([2000000.0]*n)
+    return lambda: v.Modos(500, cache=None)
+
+@caso('VGL.Modos(500)[caché]', [2, 4, 10], [2, 4])
+def _(n):
+    v = VGL()
+    v.MatrizMasa([10000.0]*n)
+    v.MatrizRigidez([2000000.0]*n)
+    return lambda: v.Modos(500)
+
+@caso('VGL.Modos(10)', [20, 50, 100, 500], [20])
+def _(n):
+    v = VGL()
+    v.MatrizMasa([10000.0]*n)
+    v.MatrizRigidez([2000000.0]*n)
+    return lambda: v.Modos(10, cache=None)
+
+@caso('Jacobi(10)', [2, 5, 10, 20, 50, 100, 500], [2, 5, 10])
+def _(n):
+    v = edificio(n)
+    A = v.k/10000.0
+    return lambda: Jacobi(A, 10)
+
+@caso('VGL.Newmark[N=2000]', GDL, GDL_RAPIDO)
+def _(n):
+    v = edificio(n)
+    t, acc = registroN(2000)
+    p = -v.m@np.ones((n, 1))*acc[0]
+    return lambda: v.Newmark(n, p, DT)
+
+def conBackend(nombre, funcion):
+    """
+    Fija el backend de kernels antes de cada llamada. Con 'numba' sin numba
+    instalado lanza ImportError y el caso se omite.
+    """
+    kernels.usar(nombre)
+    def medir():
+        kernels.usar(nombre)
+        return funcion()
+    return medir
+
+for _backend in ('numpy', 'numba'):
+
+    @caso('kernels.newmarkModal[N=2000, %s]' % _backend, GDL, GDL_RAPIDO)
+    def _(n, backend=_backend):
+        v = edificio(n)
+        t, acc = registroN(2000)
+        p = -v.m@np.ones((n, 1))*acc[0]
+        return conBackend(backend, lambda: v.Newmark(n, p, DT))
+
+    @caso('kernels.jacobiCiclos(10)[%s]' % _backend, [2, 5, 10, 20, 50, 100, 500], [2, 5, 10])
+    def _(n, backend=_backend):
+        A = edificio(n).k/10000.0
+        return conBackend(backend, lambda: Jacobi(A, 10))
+
+    @caso('kernels.espectroRespuesta[100 periodos, %s]' % _backend, [10**3, 10**4, 10**5], [10**3, 10**4])
+    def _(n, backend=_backend):
+        t, acc = registroN(n)
+        T = np.geomspace(0.02, 5.0, 100)
+        return conBackend(backend, lambda: kernels.espectroRespuesta(acc[0], DT, T))
+
+@caso('VGL.Frecuencia[10 pisos]', REGISTROS, REGISTROS_RAPIDO)
+def _(n):
+    v = edificio(10)
+    t, acc = registroN(n)
+    p = -v.m@np.ones((10, 1))*acc[0]
+    return lambda: v.Frecuencia(10, p, DT)
+
+@caso('VGL.Newmark[10 pisos]', REGISTROS[:-1], REGISTROS_RAPIDO)
+def _(n):
+    v = edificio(10)
+    t, acc = registroN(n)
+    p = -v.m@np.ones((10, 1))*acc[0]
+    return lambda: v.Newmark(10, p, DT)
+
+@caso('VGL.NewmarkFisico[Rayleigh, N=2000]', GDL + [2000], GDL_RAPIDO + [500])
+def _(n):
+    v = VGL()
+    v.MatrizMasa([10000.0]*n)
+    v.MatrizRigidez([2000000.0]*n)
+    v.MatrizRayleigh(0.05)
+    t, acc = registroN(2000)
+    p = -v.m@np.ones((n, 1))*acc[0]
+    return lambda: v.NewmarkFisico(p, DT)
+
+@caso('read_csv', [10**3, 10**4, 10**5, 10**6], [10**3, 10**5])
+def _(n):
+    import pandas as pd
+    t, acc = registroN(n)
+    path = os.path.join(tempfile.gettempdir(), 'dhip_bench_%d.csv' % n)
+    if not os.path.exists(path):
+        guardarCSV(path, t, acc)
+    return lambda: pd.read_csv(path, sep=';', names=["Time", "X", "Y", "Z"])
+
+@caso('pandasModel.data[10000 celdas]', [10**3, 10**5, 10**6], [10**3, 10**5])
+def _(n):
+    import pandas as pd
+    from PyQt5.QtCore import Qt
+    from app import pandasModel
+    t, acc = registroN(n)
+    df = pd.DataFrame({'N° Row': np.arange(1, n+1), 'Time': t, 'X': acc[0], 'Y': acc[1], 'Z': acc[2]})
+    model = pandasModel(df.round({'X':4, 'Y':4, 'Z':4}))
+    rng = np.random.default_rng(0)
+    indices = [model.index(int(i), int(j)) for i, j in zip(rng.integers(0, n, 10000), rng.integers(0, 5, 10000))]
+    def leer():
+        for index in indices:
+            model.data(index, Qt.DisplayRole)
+    return leer
+
+def medir(funcion, repeticiones=5, presupuesto=2.0):
+    """
+    Ejecuta 'funcion' una vez para calentar y luego hasta 'repeticiones'
+    veces o hasta gastar 'presupuesto' segundos. Retorna (mínimo, media, n).
+    """
+    funcion()
+    tiempos = []
+    inicio = time.perf_counter()
+    while len(tiempos) < repeticiones and (not tiempos or time.perf_counter() - inicio < presupuesto):
+        t0 = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - t0)
+    return min(tiempos), sum(tiempos)/len(tiempos), len(tiempos)
+
+def correr(rapido=False, filtro=None, repeticiones=5, presupuesto=2.0):
+    registro.activo = False # sin instrumentación durante las mediciones
+    resultados = {}
+    for nombre, tamanos, tamanosRapido, preparar in CASOS:
+        if filtro and filtro not in nombre:
+            continue
+        for n in (tamanosRapido if rapido else tamanos):
+            clave = '%s/%d' % (nombre, n)
+            try:
+                funcion = preparar(n)
+            except ImportError as e:
+                print("%-45s omitido (%s)" % (clave, e))
+                continue
+            t_min, t_med, r = medir(funcion, repeticiones, presupuesto)
+            resultados[clave] = {'caso': nombre, 'n': n, 'min': t_min, 'media': t_med, 'repeticiones': r}
+            print("%-45s %12.6f s %12.6f s" % (clave, t_min, t_med))
+    registro.activo = True
+    kernels.usar('auto')
+    return {'meta': metadatos(), 'resultados': resultados}
+
+def metadatos():
+    import scipy
+    return {'fecha': time.strftime('%Y-%m-%d %H:%M:%S'), 'python': platform.python_version(),
+            'numpy': np.__version__, 'scipy': scipy.__version__, 'plataforma': platform.platform(),
+            'procesador': platform.processor(), 'cpus': os.cpu_count()}
+
+def comparar(actual, base, tolerancia=0.25):
+    """
+    Compara los tiempos mínimos contra la línea base. Retorna la lista de
+    casos con regresión (más lentos que base*(1 + tolerancia)).
+    """
+    regresiones = []
+    print("%-45s %12s %12s %8s" % ('caso', 'base (s)', 'actual (s)', 'razón'))
+    for clave, r in actual['resultados'].items():
+        if clave not in base['resultados']:
+            continue
+        t_base = base['resultados'][clave]['min']
+        razon = r['min']/t_base
+        marca = ''
+        if razon > 1 + tolerancia:
+            marca = '  <-- regresión'
+            regresiones.append(clave)
+        print("%-45s %12.6f %12.6f %8.2f%s" % (clave, t_base, r['min'], razon, marca))
+    return regresiones
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmarks de los kernels numéricos')
+    parser.add_argument('--rapido', action='store_true', help='tamaños reducidos')
+    parser.add_argument('-k', dest='filtro', default=None, help='solo los casos que contienen este texto')
+    parser.add_argument('-o', '--salida', default=None, help='archivo JSON de resultados')
+    parser.add_argument('--base', default=BASE, help='archivo JSON de la línea base')
+    parser.add_argument('--guardar-base', action='store_true', help='guarda los resultados como línea base')
+    parser.add_argument('--comparar', action='store_true', help='compara contra la línea base')
+    parser.add_argument('--tolerancia', type=float, default=0.25, help='regresión permitida (0.25 = 25 %%)')
+    parser.add_argument('--repeticiones', type=int, default=5)
+    args = parser.parse_args()
+
+    resultados = correr(args.rapido, args.filtro, args.repeticiones)
+
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            json.dump(resultados, f, indent=1)
+    if args.guardar_base:
+        with open(args.base, 'w', encoding='utf-8') as f:
+            json.dump(resultados, f, indent=1)
+        print("Línea base guardada en %s" % args.base)
+    if args.comparar:
+        with open(args.base, encoding='utf-8') as f:
+            base = json.load(f)
+        if comparar(resultados, base, args.tolerancia):
+            sys.exit(1)
@@ -0,0 +1,55 @@
+"""
+Reporte de tiempos de importación (arranque en frío) de la aplicación.
+
+Cada caso se importa en un proceso nuevo de Python, se repite varias veces
+y se reporta el menor tiempo. Uso (desde la carpeta HERRAMIENTA 2):
+
+    python benchmarks/importacion.py [repeticiones]
+
+Para ver el detalle por módulo: python -X importtime -c "import app"
+"""
+import os, sys, subprocess
+
+CARPETA = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CASOS = [
+    ('nucleo (funciones, vgl)', 'import funciones, vgl'),
+    ('app.py', 'import app'),
+    ('importaciones anteriores de app.py',
+        'from PyQt5.QtWidgets import *; from PyQt5.QtCore import *; from PyQt5.QtGui import *; '
+        'import pandas, numpy, matplotlib.pyplot; '
+        'from matplotlib.backends.backend_qt5agg import FigureCanvas, NavigationToolbar2QT; '
+        'import matplotlib.animation; from scipy import integrate; from scipy.interpolate import LSQUnivariateSpline'),
+]
+
+CODIGO = "import time; t = time.perf_counter(); %s; print(time.perf_counter() - t)"
+
+def tiempoImportacion(sentencia, repeticiones=5):
+    """
+    Retorna el menor tiempo (s) de ejecutar 'sentencia' en un proceso nuevo, o None si falla.
+    """
+    tiempos = []
+    for i in range(repeticiones):
+        r = subprocess.run([sys.executable, '-c', CODIGO % sentencia], cwd=CARPETA,
+                           capture_output=True, text=True)
+        if r.returncode != 0:
+            return None
+        tiempos.append(float(r.stdout.strip().splitlines()[-1]))
+    return min(tiempos)
+
+def reporte(repeticiones=5):
+    resultados = {}
+    for nombre, sentencia in CASOS:
+        t = tiempoImportacion(sentencia, repeticiones)
+        resultados[nombre] = t
+        if t is None:
+            print("%-38s : no disponible (falta algún módulo)" % nombre)
+        else:
+            print("%-38s : %8.1f ms" % (nombre, 1e3*t))
+    antes, ahora = resultados[CASOS[2][0]], resultados[CASOS[1][0]]
+    if antes and ahora:
+        print("Reducción del arranque: %8.1f ms (x%.1f)" % (1e3*(antes - ahora), antes/ahora))
+    return resultados
+
+if __name__ == '__main__':
+    reporte(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
@@ -0,0 +1,58 @@
+"""
+Acelerogramas sintéticos para los benchmarks: ruido blanco filtrado en una
+banda de frecuencias y modulado por una envolvente tipo Saragoni-Hart, en
+las tres direcciones X, Y, Z.
+"""
+import os, sys
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from funciones import GB
+
+def envolvente(t, tp=None, eps=0.2, eta=0.05):
+    """
+    Envolvente de Saragoni-Hart normalizada a 1 en su máximo.
+
+    PARÁMETROS:
+    t   : array de tiempos
+    tp  : duración total del movimiento (por defecto t[-1])
+    eps : fracción de tp en la que ocurre el máximo
+    eta : valor de la envolvente en t = tp
+    """
+    tp = tp or t[-1]
+    b = -eps*np.log(eta)/(1 + eps*(np.log(eps) - 1))
+    c = b/eps
+    a = (np.e/eps)**b
+    x = np.clip(t/tp, 0, None)
+    return a*x**b*np.exp(-c*x)
+
+def registroSintetico(n, dt=0.01, fl=0.2, fh=15.0, orden=4, pga=(250.0, 200.0, 120.0), seed=0):
+    """
+    Genera un registro sintético de n muestras.
+
+    PARÁMETROS:
+    n     : número de muestras
+    dt    : paso de tiempo (s)
+    fl    : frecuencia de corte inferior del ruido (Hz)
+    fh    : frecuencia de corte superior del ruido (Hz)
+    orden : orden del filtro Butterworth usado para dar forma al espectro
+    pga   : aceleración máxima de cada componente (cm/s2)
+    seed  : semilla del generador
+
+    RETORNOS:
+    t   : array de tiempos (n,)
+    acc : array de aceleraciones (3, n)
+    """
+    rng = np.random.default_rng(seed)
+    t = np.arange(n)*dt
+    ruido = rng.standard_normal((3, n))
+    f = np.fft.rfftfreq(n, d=dt)
+    acc = np.fft.irfft(np.fft.rfft(ruido, axis=1)*GB(f, fl, fh, orden), n=n, axis=1)*envolvente(t)
+    acc *= (np.asarray(pga)/np.max(np.abs(acc), axis=1))[:, None]
+    return t, acc
+
+def guardarCSV(path, t, acc):
+    """
+    Guarda un registro con el formato que lee la aplicación: Time;X;Y;Z sin cabecera.
+    """
+    np.savetxt(path, np.column_stack((t, acc.T)), delimiter=';', fmt='%.6f')
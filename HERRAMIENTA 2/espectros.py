@@ -0,0 +1,143 @@
+"""
+Suavizado de espectros de amplitud de Fourier sobre una grilla de
+frecuencias logarítmica (Konno-Ohmachi o Parzen) y cociente espectral H/V.
+
+El suavizado se escribe como un producto matriz dispersa por vector:
+
+    A_s(fc) = W @ |FFT(f)|
+
+donde cada fila de W contiene los pesos de la ventana centrada en fc,
+normalizados para sumar 1. W depende solo de (N, dt) y de los parámetros de
+la ventana, por lo que se calcula una vez y se guarda en caché; suavizar los
+tres canales de un registro (o muchos registros de igual longitud) es un
+solo producto disperso.
+"""
+from functools import lru_cache
+import numpy as np
+import hilos
+
+def frecuenciasLog(fmin, fmax, npuntos=300):
+    """
+    Grilla de 'npuntos' frecuencias espaciadas logarítmicamente entre fmin y fmax.
+    """
+    return np.geomspace(fmin, fmax, npuntos)
+
+def ventanaKonnoOhmachi(f, fc, b=40.0):
+    """
+    Ventana de Konno-Ohmachi: [sin(b·log10(f/fc)) / (b·log10(f/fc))]^4
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x = b*np.log10(f/fc)
+        w = (np.sin(x)/x)**4
+    w[x == 0] = 1.0
+    w[~np.isfinite(x)] = 0.0
+    return w
+
+def ventanaParzen(f, fc, bw=0.5):
+    """
+    Ventana de Parzen de ancho de banda 'bw' (Hz): [sin(π·u·Δf/2) / (π·u·Δf/2)]^4, u = 280/(151·bw)
+    """
+    u = 280.0/(151.0*bw)
+    x = np.pi*u*(f - fc)/2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        w = (np.sin(x)/x)**4
+    w[x == 0] = 1.0
+    return w
+
+@lru_cache(maxsize=32)
+def matrizSuavizado(N, dt, metodo='konno-ohmachi', b=40.0, fmin=None, fmax=None, npuntos=300, lobulos=4):
+    """
+    Matriz dispersa de suavizado para espectros de una señal de N muestras con paso dt.
+
+    PARÁMETROS:
+    N       : número de muestras de la señal (el espectro tiene N//2 + 1 frecuencias)
+    dt      : paso de tiempo (s)
+    metodo  : 'konno-ohmachi' o 'parzen'
+    b       : coeficiente de ancho de banda (Konno-Ohmachi) o ancho de banda en Hz (Parzen)
+    fmin    : menor frecuencia de la grilla (por defecto la primera frecuencia no nula)
+    fmax    : mayor frecuencia de la grilla (por defecto la de Nyquist)
+    npuntos : número de frecuencias de la grilla logarítmica
+    lobulos : la ventana se trunca después de este número de lóbulos a cada lado
+
+    RETORNOS:
+    fc : frecuencias centrales (npuntos,)
+    W  : matriz CSR (npuntos, N//2 + 1), cada fila suma 1
+    """
+    from scipy import sparse
+
+    f = np.fft.rfftfreq(N, d=dt)
+    fmin = fmin or f[1]
+    fmax = fmax or f[-1]
+    fc = frecuenciasLog(fmin, fmax, npuntos)
+
+    # Límites de cada ventana: |b·log10(f/fc)| <= lobulos·π (KO) o |π·u·Δf/2| <= lobulos·π (Parzen)
+    if metodo == 'konno-ohmachi':
+        r = 10**(lobulos*np.pi/b)
+        lo, hi = fc/r, fc*r
+    elif metodo == 'parzen':
+        u = 280.0/(151.0*b)
+        d = 2*lobulos/u
+        lo, hi = fc - d, fc + d
+    else:
+        raise ValueError("Método de suavizado no soportado: %s" % metodo)
+    i0 = np.searchsorted(f, lo, side='left')
+    i1 = np.searchsorted(f, hi, side='right')
+    largo = i1 - i0
+
+    # Índices (fila, columna) de todos los pesos no nulos, sin bucles
+    filas = np.repeat(np.arange(npuntos), largo)
+    columnas = np.arange(largo.sum()) - np.repeat(np.cumsum(largo) - largo, largo) + np.repeat(i0, largo)
+    if metodo == 'konno-ohmachi':
+        pesos = ventanaKonnoOhmachi(f[columnas], fc[filas], b)
+    else:
+        pesos = ventanaParzen(f[columnas], fc[filas], b)
+
+    suma = np.bincount(filas, weights=pesos, minlength=npuntos)
+    pesos /= np.where(suma > 0, suma, 1.0)[filas]
+    W = sparse.csr_matrix((pesos, (filas, columnas)), shape=(npuntos, len(f)))
+    return fc, W
+
+def suavizar(amplitud, dt, N=None, metodo='konno-ohmachi', b=40.0, fmin=None, fmax=None, npuntos=300):
+    """
+    Suaviza uno o varios espectros de amplitud y los remuestrea en la grilla logarítmica.
+
+    PARÁMETROS:
+    amplitud : array (N//2 + 1,) o (canales, N//2 + 1) con |FFT|
+    dt       : paso de tiempo de la señal (s)
+    N        : número de muestras de la señal (por defecto 2*(nfrec - 1))
+    demás    : ver matrizSuavizado
+
+    RETORNOS:
+    fc : frecuencias centrales
+    As : espectros suavizados, misma forma que 'amplitud' con npuntos frecuencias
+    """
+    amplitud = np.asarray(amplitud)
+    nf = amplitud.shape[-1]
+    N = N or 2*(nf - 1)
+    fc, W = matrizSuavizado(N, float(dt), metodo, b, fmin, fmax, npuntos)
+    As = W @ amplitud.reshape(-1, nf).T
+    return fc, As.T.reshape(amplitud.shape[:-1] + (npuntos,))
+
+def espectroSuavizado(signal, dt, **kwargs):
+    """
+    |FFT| de una o varias señales (eje -1) suavizado en la grilla logarítmica.
+    """
+    signal = np.asarray(signal)
+    return suavizar(np.abs(hilos.rfft(signal, axis=-1)), dt, N=signal.shape[-1], **kwargs)
+
+def cocienteHV(acc, dt, **kwargs):
+    """
+    Cociente espectral H/V con espectros suavizados.
+
+    PARÁMETROS:
+    acc : array (3, N) con las componentes X, Y (horizontales) y Z (vertical)
+    dt  : paso de tiempo (s)
+
+    RETORNOS:
+    fc : frecuencias centrales
+    hv : sqrt((X² + Y²)/2)/Z
+    """
+    fc, A = espectroSuavizado(acc, dt, **kwargs)
+    H = np.sqrt((A[0]**2 + A[1]**2)/2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return fc, H/A[2]
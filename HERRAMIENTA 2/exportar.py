@@ -0,0 +1,231 @@
+"""
+Exportación de registros procesados y resultados de simulación a almacenes
+HDF5 (h5py) o Zarr, con bloques (chunks) comprimidos y metadatos.
+
+Estructura de un almacén:
+
+    /<nombre>/acc              (3, N)   aceleraciones corregidas       attrs: dt, t0, pasos
+    /<nombre>/original         (3, M)   aceleraciones tal como se leyeron  attrs: dt, t0
+    /<nombre>/tiempo_original  (M,)     tiempos leídos (antes de regularizar o remuestrear)
+    /<nombre>/simulacion/u     (n, N)   desplazamientos por piso        attrs: dt, n_floor, T
+    /<nombre>/simulacion/up    (n, N)   velocidades
+    /<nombre>/simulacion/upp   (n, N)   aceleraciones
+    /<nombre>/simulacion/m, k  (n, n)
+
+Los arrays (filas, N) se guardan en bloques de una fila y BLOQUE muestras, de
+modo que leer un piso o una ventana de tiempo solo descomprime los bloques
+necesarios (ver Almacen.leer y Almacen.ventana). La última dimensión es
+ampliable: Almacen.agregar añade muestras a un array existente, p.e. desde
+procesos que procesan un catálogo por partes.
+
+h5py y zarr son opcionales; solo se importa el que corresponde a la extensión
+del archivo (.h5/.hdf5 o .zarr).
+"""
+import os, json
+from contextlib import contextmanager
+import numpy as np
+
+BLOQUE = 2**16 # muestras por bloque
+
+def formato(path):
+    ext = os.path.splitext(path.rstrip('/\\'))[1].lower()
+    if ext in ('.h5', '.hdf5', '.hdf'):
+        return 'hdf5'
+    if ext == '.zarr':
+        return 'zarr'
+    raise ValueError("Formato no soportado: %s (use .h5 o .zarr)" % path)
+
+@contextmanager
+def _bloqueo(path):
+    # Serializa las escrituras de varios procesos sobre el mismo archivo HDF5.
+    # El archivo .lock se borra al liberar; quien esperaba sobre un .lock ya
+    # borrado lo detecta (otro inodo) y vuelve a intentar con el nuevo.
+    try:
+        import fcntl
+    except ImportError:
+        yield
+        return
+    candado = path + '.lock'
+    while True:
+        f = open(candado, 'w')
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            if os.stat(candado).st_ino == os.fstat(f.fileno()).st_ino:
+                break
+        except FileNotFoundError:
+            pass
+        f.close()
+    try:
+        yield
+    finally:
+        try:
+            os.remove(candado)
+        except OSError:
+            pass
+        fcntl.flock(f, fcntl.LOCK_UN)
+        f.close()
+
+class Almacen:
+
+    def __init__(self, path, modo='a'):
+        """
+        PARÁMETROS:
+        path : archivo .h5/.hdf5 o carpeta .zarr
+        modo : 'r' lectura, 'a' lectura/escritura (crea si no existe), 'w' sobrescribe
+        """
+        self.path = path
+        self.formato = formato(path)
+        self._bloqueo = None
+        if self.formato == 'hdf5':
+            import h5py
+            if modo != 'r':
+                self._bloqueo = _bloqueo(path)
+                self._bloqueo.__enter__()
+            try:
+                self._raiz = h5py.File(path, modo)
+            except Exception:
+                # Sin archivo abierto no hay 'cerrar': se libera el bloqueo aquí
+                self._liberar()
+                raise
+        else:
+            import zarr
+            self._raiz = zarr.open_group(path, mode=modo)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.cerrar()
+
+    def cerrar(self):
+        try:
+            if self.formato == 'hdf5':
+                self._raiz.close()
+        finally:
+            self._liberar()
+
+    def _liberar(self):
+        # Libera el bloqueo y borra el archivo .lock
+        if self._bloqueo is not None:
+            self._bloqueo.__exit__(None, None, None)
+            self._bloqueo = None
+
+    def _grupo(self, ruta):
+        grupo = self._raiz
+        for nombre in ruta.strip('/').split('/'):
+            if nombre:
+                grupo = grupo.require_group(nombre)
+        return grupo
+
+    def __contains__(self, ruta):
+        return ruta.strip('/') in self._raiz
+
+    def escribir(self, ruta, datos, **atributos):
+        """
+        Escribe 'datos' en 'ruta' (reemplaza si existe) con sus atributos.
+        Los arrays de 2 dimensiones se guardan por bloques de (1, BLOQUE).
+        """
+        datos = np.asarray(datos)
+        padre, nombre = os.path.split(ruta.strip('/'))
+        grupo = self._grupo(padre)
+        if nombre in grupo:
+            del grupo[nombre]
+
+        chunks = (1,)*(datos.ndim - 1) + (max(min(datos.shape[-1], BLOQUE), 1),) if datos.ndim else None
+        if self.formato == 'hdf5':
+            maxshape = datos.shape[:-1] + (None,) if datos.ndim else None
+            arr = grupo.create_dataset(nombre, data=datos, chunks=chunks, maxshape=maxshape,
+                                       compression='gzip', compression_opts=4, shuffle=True)
+        else:
+            crear = getattr(grupo, 'create_array', None) or grupo.create_dataset
+            arr = crear(nombre, shape=datos.shape, chunks=chunks, dtype=datos.dtype)
+            arr[...] = datos
+        self.atributos(ruta, **atributos)
+        return arr
+
+    def agregar(self, ruta, datos, **atributos):
+        """
+        Agrega muestras al final (última dimensión) del array 'ruta'; lo crea si no existe.
+        """
+        datos = np.asarray(datos)
+        if ruta not in self:
+            return self.escribir(ruta, datos, **atributos)
+        arr = self._raiz[ruta.strip('/')]
+        n = arr.shape[-1]
+        arr.resize(arr.shape[:-1] + (n + datos.shape[-1],))
+        arr[..., n:] = datos
+        self.atributos(ruta, **atributos)
+        return arr
+
+    def atributos(self, ruta, **atributos):
+        """
+        Actualiza y retorna los atributos de 'ruta'. Los valores que no son
+        escalares ni texto se guardan como JSON.
+        """
+        attrs = self._raiz[ruta.strip('/')].attrs if ruta.strip('/') else self._raiz.attrs
+        for clave, valor in atributos.items():
+            if isinstance(valor, np.generic):
+                valor = valor.item()
+            if not isinstance(valor, (int, float, str, bool)):
+                valor = json.dumps(np.asarray(valor).tolist() if isinstance(valor, np.ndarray) else valor)
+            attrs[clave] = valor
+        return dict(attrs)
+
+    def leer(self, ruta, filas=slice(None), desde=None, hasta=None):
+        """
+        Lectura parcial de un array (filas, N): solo las filas y las muestras [desde, hasta).
+        """
+        arr = self._raiz[ruta.strip('/')]
+        if arr.ndim == 1:
+            return np.asarray(arr[desde:hasta])
+        return np.asarray(arr[filas, desde:hasta])
+
+    def ventana(self, ruta, t0, t1, filas=slice(None)):
+        """
+        Lectura parcial por tiempo, usando los atributos 'dt' y 't0' del array.
+        """
+        attrs = self._raiz[ruta.strip('/')].attrs
+        dt = float(attrs['dt'])
+        inicio = float(attrs.get('t0', 0.0))
+        return self.leer(ruta, filas, int(np.floor((t0 - inicio)/dt)), int(np.ceil((t1 - inicio)/dt)) + 1)
+
+def exportarRegistro(path, nombre, acc, dt, t0=0.0, original=None, tOriginal=None, pasos=(), **meta):
+    """
+    Exporta un registro procesado.
+
+    PARÁMETROS:
+    path      : archivo .h5 o carpeta .zarr (se agrega si ya existe)
+    nombre    : grupo del registro (p.e. el nombre del archivo leído)
+    acc       : aceleraciones corregidas (3, N)
+    dt        : paso de tiempo (s)
+    original  : aceleraciones tal como se leyeron (3, M), opcional
+    tOriginal : tiempos leídos (M,); por defecto se asume el paso dt y el inicio t0
+    pasos     : descripción de los pasos aplicados (p.e. del historial)
+    meta      : otros atributos (archivo de origen, unidades, ...)
+    """
+    with Almacen(path) as a:
+        a.escribir('%s/acc' % nombre, acc, dt=dt, t0=t0, pasos=list(pasos), unidades='cm/s2')
+        if original is not None:
+            if tOriginal is None:
+                a.escribir('%s/original' % nombre, original, dt=dt, t0=t0, unidades='cm/s2')
+            else:
+                tOriginal = np.asarray(tOriginal, dtype=float)
+                dtOriginal = float(np.median(np.diff(tOriginal))) if len(tOriginal) > 1 else dt
+                a.escribir('%s/original' % nombre, original, dt=dtOriginal, t0=float(tOriginal[0]), unidades='cm/s2')
+                a.escribir('%s/tiempo_original' % nombre, tOriginal, unidades='s')
+        a.atributos(nombre, **meta)
+
+def exportarSimulacion(path, nombre, vgl, dt, at=None, **meta):
+    """
+    Exporta las respuestas u/up/upp de un VGL resuelto con Newmark, con sus
+    matrices de masa y rigidez y los periodos.
+    """
+    ruta = '%s/simulacion' % nombre
+    with Almacen(path) as a:
+        for clave in ('u', 'up', 'upp'):
+            a.escribir('%s/%s' % (ruta, clave), getattr(vgl, clave), dt=dt)
+        a.escribir(ruta + '/m', vgl.m)
+        a.escribir(ruta + '/k', vgl.k)
+        if at is not None:
+            a.escribir(ruta + '/at', at, dt=dt)
+        a.atributos(ruta, dt=dt, n_floor=int(vgl.n), T=np.asarray(vgl.T), **meta)
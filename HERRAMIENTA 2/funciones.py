@@ -0,0 +1,141 @@
+from collections import OrderedDict
+import numpy as np
+from instrumentacion import medir
+import hilos
+
+_factorizaciones = OrderedDict() # N -> (Q, R) de la base de Legendre de mayor orden pedido
+
+def factorizacionLegendre(N, order, maximo=4):
+    """
+    Factorización QR de la matriz de Vandermonde-Legendre de N puntos en [-1, 1]
+    hasta el grado 'order'. Las columnas de Q de un grado menor son las primeras
+    de la factorización de un grado mayor, por lo que se guarda solo la de mayor
+    grado pedido para cada N (se conservan las 'maximo' longitudes más recientes).
+
+    RETORNOS:
+    Q : array (N, order+1) de columnas ortonormales
+    R : array (order+1, order+1) triangular superior
+    """
+    if N in _factorizaciones and _factorizaciones[N][1].shape[0] > order:
+        _factorizaciones.move_to_end(N)
+    else:
+        V = np.polynomial.legendre.legvander(np.linspace(-1.0, 1.0, N), order)
+        _factorizaciones[N] = np.linalg.qr(V)
+        while len(_factorizaciones) > maximo:
+            _factorizaciones.popitem(last=False)
+    Q, R = _factorizaciones[N]
+    return Q[:, :order+1], R[:order+1, :order+1]
+
+def ajustePolinomial(y, order):
+    """
+    Ajuste por mínimos cuadrados de un polinomio de grado 'order' a una o
+    varias señales de igual longitud (eje -1), con una sola multiplicación
+    matricial sobre la base de Legendre ortonormalizada.
+
+    PARÁMETROS:
+    y     : array (N,) o (señales, N)
+    order : grado del polinomio
+
+    RETORNOS:
+    ajuste : array de la misma forma que 'y'
+    coef   : coeficientes de Legendre en [-1, 1], (order+1,) o (señales, order+1)
+    """
+    y = np.asarray(y, dtype=float)
+    Q, R = factorizacionLegendre(y.shape[-1], order)
+    proy = y @ Q
+    coef = np.linalg.solve(R, proy.T).T
+    return proy @ Q.T, coef
+
+@medir()
+def BaseLineCorrection(at, dt=0.01, type='polynomial', order=2, dspline=1000):
+    """
+    Realiza una corrección por Línea Base a un array de aceleraciones
+
+    PARÁMETROS:
+    at      : narray de aceleraciones (N,) o varios canales de igual longitud (canales, N)
+    dt      : delta de tiempo en seguntos. para itk=0.01s
+    type    : método de ajuste ('polynomial', 'spline')
+    order   : orden del polinomio de aproximación para la línea base
+    dspline : en caso de ser el método spline, define cada cuantos puntos se debe hacer el ajuste
+
+    RETORNOS:
+    at  : señal de aceleraciones corregida
+    """
+    # vt = integrate.cumtrapz(at, dx=dt, initial=0.0)
+    at = np.asarray(at)
+    x = np.arange(at.shape[-1])
+    
+    if type=='Polinomial':
+        # Base de Legendre en [-1, 1] en lugar de polyfit sobre el índice de muestra
+        # (Vandermonde mal condicionado para registros largos); la factorización se reutiliza
+        fit_at = ajustePolinomial(at, order)[0]
+        
+    if type =='Spline':
+        from scipy.interpolate import LSQUnivariateSpline
+        splknots = np.arange(dspline / 2.0, at.shape[-1] - dspline / 2.0 + 2, dspline)
+        fit_at = np.array([LSQUnivariateSpline(x=x, y=y, t=splknots, k=order)(x) for y in np.atleast_2d(at)]).reshape(at.shape)
+
+    return at - fit_at
+
+def GL(f, fl, n):
+    """
+    Hace un low cut al array de frecuencias
+
+    inputs:
+        f   : array de frecuencias
+        fl  : low cut frecuency
+        n   : orden de corte
+    output:
+        GH  : Ganancia de frecuencias recortada (array)
+	    GL = ( (f/fl)**(2*n)/(1 + (f/fl)**(2*n)) )**0.5
+    """
+    return ( (f/fl)**(2*n)/(1 + (f/fl)**(2*n)))**0.5
+
+def GH(f, fh, n):
+    """
+    Hace un high cut al array de frecuencias
+
+    input:
+        f   : array de frecuencias
+        fh  : high cut frecuency
+        n   : orden de corte
+    output:
+        GH  : Ganancia de frecuencias recortada (array)
+	    GH = ( 1/(1 + (f/fh)**(2*n)) )**0.5
+    """
+    return ( 1/(1 + (f/fh)**(2*n)) )**0.5
+
+def GB(f, fl, fh, n):
+    """
+    Hace un Butterworth al array de frecuencias
+
+    inputs:
+        f   : array de frecuencias
+        fl  : low cut frecuency
+        fh  : high cut frecuency
+        n   : orden de corte
+    output:
+        GB  : Ganancia de frecuencias recortada (array)
+    """
+    return GL(f, fl, n)*GH(f, fh, n)
+
+@medir()
+def Butterworth_Bandpass(signal, dt, fl, fh, n):
+    """
+    Hace un Butterworth Bandpass a las frecuencias de la señal
+
+    inputs:                                         examples:
+        signal      : señal (array), o varias en filas      | array de aceleraciones
+        dt          : delta de tiempo de la señal           | para itk = 0.01 seg
+        fl          : low cut frecuency                     | fl = 0.10 Hz
+        fh          : high cut frecuency                    | hf = 40.0 Hz
+        n           : orden de corte                        | n = 15
+    output:
+        filter      : señal filtrada (array)
+    """
+    N = np.shape(signal)[-1]
+    FFT = hilos.rfft(signal) # todas las filas en una sola FFT multihilo
+    f = hilos.rfftfreq(N, d = dt)
+    FFT_filtered = GL(f, fl, n)*FFT*GH(f, fh, n)
+
+    return hilos.irfft(FFT_filtered, n = N)
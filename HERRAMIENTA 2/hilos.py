@@ -0,0 +1,97 @@
+"""
+Número de hilos de los cálculos numéricos y transformadas de Fourier.
+
+Las FFT de la aplicación (filtro pasa banda, espectros) usan scipy.fft con
+'workers' hilos sobre arrays (canales, N): una sola llamada transforma todos
+los canales y scipy reparte las filas entre los hilos.
+
+El número de hilos es global:
+
+    DHIP_HILOS=<n>     variable de entorno (por defecto todos los CPU disponibles)
+    configurar(n)      lo cambia en tiempo de ejecución
+    with limitar(n):   lo limita dentro de un bloque, también para BLAS/OpenMP
+                       si threadpoolctl está instalado
+
+Dentro de un grupo de procesos cada proceso debe usar cpus/procesos hilos para
+no sobresuscribir la máquina (ver repartir e iniciarProceso).
+"""
+import os
+from contextlib import contextmanager
+import numpy as np
+
+def cpus():
+    """
+    CPU disponibles para este proceso.
+    """
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+def _inicial():
+    valor = os.environ.get('DHIP_HILOS', '')
+    return int(valor) if valor.strip() else cpus()
+
+_hilos = _inicial()
+
+def hilos():
+    return _hilos
+
+def configurar(n=None):
+    """
+    Fija el número de hilos (None o <= 0: todos los CPU disponibles). Retorna el anterior.
+    """
+    global _hilos
+    anterior = _hilos
+    _hilos = n if n and n > 0 else cpus()
+    return anterior
+
+@contextmanager
+def limitar(n):
+    """
+    Limita a 'n' hilos las FFT y, si threadpoolctl está instalado, BLAS/OpenMP.
+    """
+    anterior = configurar(n)
+    try:
+        try:
+            from threadpoolctl import threadpool_limits
+        except ImportError:
+            yield
+        else:
+            with threadpool_limits(limits=hilos()):
+                yield
+    finally:
+        configurar(anterior)
+
+def repartir(procesos):
+    """
+    Hilos por proceso para un grupo de 'procesos' procesos.
+    """
+    return max(cpus()//max(procesos, 1), 1)
+
+def iniciarProceso(n):
+    """
+    Inicializador de los procesos de un grupo (ProcessPoolExecutor(initializer=...)):
+    fija 'n' hilos para las FFT y para BLAS/OpenMP.
+    """
+    configurar(n)
+    for variable in ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS'):
+        os.environ[variable] = str(n)
+    try:
+        from threadpoolctl import threadpool_limits
+        threadpool_limits(limits=n)
+    except ImportError:
+        pass
+
+def rfft(x, n=None, axis=-1):
+    """
+    scipy.fft.rfft con los hilos configurados; x puede ser (N,) o (canales, N).
+    """
+    from scipy import fft
+    return fft.rfft(x, n=n, axis=axis, workers=_hilos)
+
+def irfft(X, n=None, axis=-1):
+    from scipy import fft
+    return fft.irfft(X, n=n, axis=axis, workers=_hilos)
+
+def rfftfreq(n, d=1.0):
+    return np.fft.rfftfreq(n, d=d)
@@ -0,0 +1,118 @@
+"""
+Historial de pasos de procesamiento con deshacer/rehacer.
+
+Cada paso guarda la función que lo produjo, sus parámetros y una referencia
+al paso padre. El resultado de cada paso es un array de solo lectura que se
+puede descartar cuando el historial supera su presupuesto de memoria y se
+recalcula a partir del padre cuando se vuelve a necesitar:
+
+    Registro -> Linea Base (Polinomial, 2) -> Pasa Banda (0.1-20 Hz) -> ...
+
+El registro original (la raíz) y el paso actual nunca se descartan, por lo
+que deshacer y rehacer siempre son posibles aunque haya que recalcular.
+"""
+import numpy as np
+
+PRESUPUESTO = 256*2**20 # bytes
+
+class Paso:
+
+    def __init__(self, nombre, funcion=None, parametros=None, padre=None, datos=None):
+        self.nombre = nombre
+        self.funcion = funcion
+        self.parametros = parametros or {}
+        self.padre = padre
+        self._datos = None
+        if datos is not None:
+            self.guardar(datos)
+
+    def guardar(self, datos):
+        datos = np.array(datos, dtype=float)
+        datos.setflags(write=False)
+        self._datos = datos
+
+    @property
+    def enMemoria(self):
+        return self._datos is not None
+
+    @property
+    def tamano(self):
+        return self._datos.nbytes if self._datos is not None else 0
+
+    def datos(self):
+        """
+        Resultado del paso; si fue descartado se recalcula desde el padre más
+        cercano que siga en memoria.
+        """
+        if self._datos is None:
+            self.guardar(self.funcion(self.padre.datos(), **self.parametros))
+        return self._datos
+
+    def descripcion(self):
+        texto = ', '.join('%s=%s' % (k, v) for k, v in self.parametros.items() if k != 'dt')
+        return '%s (%s)' % (self.nombre, texto) if texto else self.nombre
+
+class Historial:
+
+    def __init__(self, datos, nombre='Registro', presupuesto=PRESUPUESTO):
+        """
+        PARÁMETROS:
+        datos       : array del registro original (canales, N)
+        nombre      : nombre del paso raíz
+        presupuesto : memoria máxima (bytes) de los resultados guardados
+        """
+        self.presupuesto = presupuesto
+        self.pasos = [Paso(nombre, datos=datos)]
+        self.posicion = 0
+
+    @property
+    def actual(self):
+        return self.pasos[self.posicion]
+
+    def datos(self):
+        return self.actual.datos()
+
+    def aplicar(self, nombre, funcion, datos=None, **parametros):
+        """
+        Agrega un paso 'funcion(datos del paso actual, **parametros)' y lo
+        deja como actual. Si ya se calculó el resultado se pasa en 'datos'
+        para no repetir el cálculo. Los pasos deshechos se pierden.
+        """
+        paso = Paso(nombre, funcion, parametros, self.actual)
+        paso.guardar(funcion(self.datos(), **parametros) if datos is None else datos)
+        del self.pasos[self.posicion+1:]
+        self.pasos.append(paso)
+        self.posicion += 1
+        self._podar()
+        return paso
+
+    def puedeDeshacer(self):
+        return self.posicion > 0
+
+    def puedeRehacer(self):
+        return self.posicion < len(self.pasos) - 1
+
+    def deshacer(self):
+        if self.puedeDeshacer():
+            self.posicion -= 1
+            self._podar()
+        return self.actual
+
+    def rehacer(self):
+        if self.puedeRehacer():
+            self.posicion += 1
+            self.datos()
+            self._podar()
+        return self.actual
+
+    def memoria(self):
+        return sum(paso.tamano for paso in self.pasos)
+
+    def _podar(self):
+        # Descarta primero los resultados más lejanos al paso actual
+        lejanos = sorted(range(1, len(self.pasos)), key=lambda i: -abs(i - self.posicion))
+        for i in lejanos:
+            if self.memoria() <= self.presupuesto:
+                break
+            if i != self.posicion:
+                self.pasos[i]._datos = None
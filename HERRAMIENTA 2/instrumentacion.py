@@ -0,0 +1,150 @@
+"""
+Instrumentación de las etapas del procesamiento.
+
+Cada etapa (lectura, corrección por línea base, filtrado, integración,
+análisis modal, Newmark, dibujo) se mide con el context manager 'etapa'
+o el decorador 'medir', que registran:
+
+    pared : tiempo real (s), time.perf_counter
+    cpu   : tiempo de CPU del proceso (s), time.process_time
+    pico  : memoria pico asignada durante la etapa (MB), tracemalloc
+
+Uso:
+    from instrumentacion import registro, etapa, medir
+
+    with etapa('loadFile', archivo=fileName):
+        ...
+
+    @medir()
+    def BaseLineCorrection(...):
+        ...
+
+    registro.exportar('tiempos.csv')
+
+La medición de memoria con tracemalloc hace varias veces más lento el código
+medido (el dibujo de matplotlib, p.e.), por eso está desactivada por defecto;
+se activa con la variable de entorno DHIP_TRACEMALLOC=1 o con
+registro.memoria = True. Sin ella la columna 'pico' queda en 0.
+
+Cada cuadro de la animación de la simulación (etapa 'cuadro', datos y dibujo
+con blit) y cada actualización de la vista en tiempo real (etapa 'tiempo
+real', incluido el dibujo) también se miden, por lo que solo se guardan las
+últimas 'maximo' etapas; el resumen por nombre se acumula durante toda la sesión.
+"""
+import os, time, json, csv, functools, tracemalloc
+from collections import deque
+from contextlib import contextmanager
+
+MAXIMO = 10000 # etapas guardadas en detalle
+
+class Registro:
+
+    def __init__(self, memoria=False, activo=True, maximo=MAXIMO):
+        self.memoria = memoria
+        self.activo = activo
+        self.etapas = deque(maxlen=maximo)
+        self._resumen = {}
+        self.observadores = [] # funciones llamadas con el dict de cada etapa terminada
+        self._pila = []
+        self._inicioTracemalloc = False
+
+    @contextmanager
+    def etapa(self, nombre, **info):
+        """
+        Mide el bloque 'with' como una etapa de nombre 'nombre'. Los argumentos
+        adicionales se guardan con el resultado (p.e. tipo de filtro, N° de pisos).
+        """
+        if not self.activo:
+            yield
+            return
+
+        memoria = self.memoria
+        if memoria:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._inicioTracemalloc = True
+            actual, pico = tracemalloc.get_traced_memory()
+            if self._pila:
+                # se guarda el pico del padre antes de reiniciarlo para esta etapa
+                self._pila[-1]['pico'] = max(self._pila[-1]['pico'], pico)
+            tracemalloc.reset_peak()
+        else:
+            actual = 0
+        marco = {'actual': actual, 'pico': 0}
+        self._pila.append(marco)
+
+        t0 = time.perf_counter()
+        c0 = time.process_time()
+        try:
+            yield
+        finally:
+            pared = time.perf_counter() - t0
+            cpu = time.process_time() - c0
+            self._pila.pop()
+            pico = 0.0
+            if memoria and tracemalloc.is_tracing():
+                absoluto = max(tracemalloc.get_traced_memory()[1], marco['pico'])
+                pico = (absoluto - marco['actual'])/2**20
+                if self._pila:
+                    self._pila[-1]['pico'] = max(self._pila[-1]['pico'], absoluto)
+                elif self._inicioTracemalloc:
+                    tracemalloc.stop()
+                    self._inicioTracemalloc = False
+
+            resultado = {'etapa': nombre, 'nivel': len(self._pila), 'inicio': time.time() - pared,
+                         'pared': pared, 'cpu': cpu, 'pico': pico}
+            resultado.update(info)
+            self.etapas.append(resultado)
+            t = self._resumen.setdefault(nombre, {'etapa': nombre, 'n': 0, 'pared': 0.0, 'cpu': 0.0, 'pico': 0.0})
+            t['n'] += 1
+            t['pared'] += pared
+            t['cpu'] += cpu
+            t['pico'] = max(t['pico'], pico)
+            for funcion in self.observadores:
+                funcion(resultado)
+
+    def medir(self, nombre=None):
+        """
+        Decorador que mide cada llamada a la función como una etapa.
+        """
+        def decorador(funcion):
+            etiqueta = nombre or funcion.__qualname__
+            @functools.wraps(funcion)
+            def envoltura(*args, **kwargs):
+                with self.etapa(etiqueta):
+                    return funcion(*args, **kwargs)
+            return envoltura
+        return decorador
+
+    def resumen(self):
+        """
+        Etapas agrupadas por nombre: número de llamadas, tiempos totales y
+        pico máximo desde el inicio (o desde 'limpiar'), incluidas las que ya
+        salieron del detalle.
+        """
+        return [dict(t) for t in self._resumen.values()]
+
+    def exportar(self, path, resumen=False):
+        """
+        Exporta las etapas registradas a JSON o CSV según la extensión de 'path'.
+        """
+        filas = self.resumen() if resumen else list(self.etapas)
+        if os.path.splitext(path)[1].lower() == '.json':
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(filas, f, indent=1, ensure_ascii=False)
+        else:
+            columnas = []
+            for r in filas:
+                columnas += [c for c in r if c not in columnas]
+            with open(path, 'w', encoding='utf-8', newline='') as f:
+                w = csv.DictWriter(f, fieldnames=columnas)
+                w.writeheader()
+                w.writerows(filas)
+
+    def limpiar(self):
+        self.etapas.clear()
+        self._resumen = {}
+
+registro = Registro(memoria=os.environ.get('DHIP_TRACEMALLOC', '0') == '1')
+etapa = registro.etapa
+medir = registro.medir
@@ -0,0 +1,109 @@
+"""
+Medidas de intensidad de un registro de aceleraciones:
+
+    PGA, PGV, PGD : valores máximos absolutos de aceleración, velocidad y desplazamiento
+    Arias         : Ia = π/(2g)·∫a² dt
+    CAV           : velocidad absoluta acumulada, ∫|a| dt
+    D5-95         : duración significativa, tiempo entre el 5 % y el 95 % de Ia
+
+Todas se obtienen de una sola pasada acumulativa (cumsum a lo largo del eje
+del tiempo) sobre un array (canales, N), sin bucles por canal. Las unidades
+son las del registro: con aceleraciones en cm/s² y g = 981, Ia queda en cm/s
+y CAV en cm/s.
+"""
+from collections import OrderedDict
+import numpy as np
+
+G = 981.0 # cm/s²
+
+def acumulada(y, dt):
+    """
+    Integral acumulada por la regla del trapecio a lo largo del último eje,
+    empezando en 0 (misma longitud que 'y').
+    """
+    z = np.zeros_like(y)
+    np.cumsum((y[..., 1:] + y[..., :-1])*(dt/2), axis=-1, out=z[..., 1:])
+    return z
+
+def _cruce(husid, nivel):
+    """
+    Índice de la primera muestra en la que cada fila de 'husid' (creciente) alcanza 'nivel'.
+    """
+    return np.argmax(husid >= nivel, axis=-1)
+
+def medidas(acc, dt, g=G, inferior=0.05, superior=0.95):
+    """
+    Medidas de intensidad de uno o varios canales.
+
+    PARÁMETROS:
+    acc      : array (N,) o (canales, N) de aceleraciones
+    dt       : paso de tiempo (s)
+    g        : aceleración de la gravedad en las unidades del registro
+    inferior : fracción de Ia para el inicio de la duración significativa
+    superior : fracción de Ia para el fin de la duración significativa
+
+    RETORNOS:
+    dict de arrays (canales,) con: pga, pgv, pgd, arias, cav, d595, t5, t95
+    """
+    acc = np.atleast_2d(np.asarray(acc, dtype=float))
+    vel = acumulada(acc, dt)
+    dsp = acumulada(vel, dt)
+    husid = acumulada(acc**2, dt)
+    arias = husid[:, -1]*np.pi/(2*g)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        husid /= husid[:, -1:]
+    t5 = _cruce(husid, inferior)*dt
+    t95 = _cruce(husid, superior)*dt
+
+    return {'pga': np.max(np.abs(acc), axis=1), 'pgv': np.max(np.abs(vel), axis=1),
+            'pgd': np.max(np.abs(dsp), axis=1), 'arias': arias,
+            'cav': np.sum(np.abs(acc), axis=1)*dt,
+            'd595': t95 - t5, 't5': t5, 't95': t95}
+
+_cache = OrderedDict()
+
+def medidasCache(clave, acc, dt, maximo=16, **kwargs):
+    """
+    Igual que 'medidas', pero guarda el resultado con 'clave' (p.e. nombre
+    del archivo y versión del registro). Una nueva versión del registro debe
+    usar una clave nueva; se conservan las 'maximo' claves más recientes.
+    """
+    clave = (clave, float(dt), tuple(sorted(kwargs.items())))
+    if clave in _cache:
+        _cache.move_to_end(clave)
+        return _cache[clave]
+    resultado = medidas(acc, dt, **kwargs)
+    _cache[clave] = resultado
+    while len(_cache) > maximo:
+        _cache.popitem(last=False)
+    return resultado
+
+def catalogo(registros, dt, **kwargs):
+    """
+    Medidas de intensidad de un catálogo de registros. Los registros de igual
+    longitud y paso de tiempo se apilan y se procesan en una sola llamada.
+
+    PARÁMETROS:
+    registros : lista de arrays (canales, N) (pueden tener distinto N y número de canales)
+    dt        : paso de tiempo común o lista con el paso de cada registro
+
+    RETORNOS:
+    lista de dicts, uno por registro, en el mismo orden que 'registros'
+    """
+    registros = [np.atleast_2d(np.asarray(r, dtype=float)) for r in registros]
+    dts = np.broadcast_to(np.asarray(dt, dtype=float), (len(registros),))
+
+    grupos = {}
+    for i, (r, d) in enumerate(zip(registros, dts)):
+        grupos.setdefault((r.shape[1], d), []).append(i)
+
+    resultados = [None]*len(registros)
+    for (n, d), indices in grupos.items():
+        pila = np.concatenate([registros[i] for i in indices])
+        m = medidas(pila, d, **kwargs)
+        canales = np.array([registros[i].shape[0] for i in indices])
+        fin = np.cumsum(canales)
+        for i, b, e in zip(indices, fin - canales, fin):
+            resultados[i] = {k: v[b:e] for k, v in m.items()}
+    return resultados
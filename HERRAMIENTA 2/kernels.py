@@ -0,0 +1,457 @@
+"""
+Kernels numéricos con dos implementaciones:
+
+    numba : bucles explícitos compilados con numba.njit (si numba está instalado)
+    numpy : los mismos algoritmos con operaciones vectoriales de NumPy
+
+El backend se elige la primera vez que se llama a un kernel: numba si se
+puede importar, numpy si no. La variable de entorno DHIP_KERNELS=numba|numpy
+fuerza uno de los dos (con 'numba' y sin numba instalado se lanza
+ImportError), y usar('numpy') lo cambia en tiempo de ejecución.
+
+    newmarkModal       : integración de Newmark en coordenadas modales (VGL.Newmark)
+    jacobiCiclos       : ciclos de rotaciones de Jacobi (Jacobi.un_ciclo)
+    espectroRespuesta  : espectro de respuesta de osciladores de 1 GDL
+
+'python kernels.py' verifica el backend numpy contra la formulación directa
+y, si numba está instalado, ambos backends entre sí (ver verificar).
+"""
+import os, time, functools
+from math import atan, sin, cos, pi
+import numpy as np
+
+_backend = None
+_compilados = {}
+
+def _detectar():
+    preferido = os.environ.get('DHIP_KERNELS', 'auto').lower()
+    if preferido == 'numpy':
+        return 'numpy'
+    try:
+        import numba
+        return 'numba'
+    except ImportError:
+        if preferido == 'numba':
+            raise ImportError("DHIP_KERNELS=numba pero numba no está instalado")
+        return 'numpy'
+
+def backend():
+    """
+    Backend en uso ('numba' o 'numpy').
+    """
+    global _backend
+    if _backend is None:
+        _backend = _detectar()
+    return _backend
+
+def usar(nombre):
+    """
+    Cambia el backend ('numba', 'numpy' o 'auto'). Retorna el anterior.
+    """
+    global _backend
+    anterior = _backend
+    if nombre == 'auto':
+        _backend = _detectar()
+    elif nombre == 'numba':
+        import numba
+        _backend = 'numba'
+    elif nombre == 'numpy':
+        _backend = 'numpy'
+    else:
+        raise ValueError("Backend no soportado: %s" % nombre)
+    return anterior
+
+def _compilado(funcion):
+    # Compila 'funcion' con numba la primera vez que se usa (cache en disco de numba)
+    if funcion not in _compilados:
+        import numba
+        _compilados[funcion] = numba.njit(cache=True)(funcion)
+    return _compilados[funcion]
+
+def _despachar(bucle, vectorial, *args):
+    if backend() == 'numba':
+        return _compilado(bucle)(*args)
+    return vectorial(*args)
+
+##################################################################################
+# Newmark en coordenadas modales
+
+def _newmarkBucle(P, a1, a2, a3, kp, dt, beta, gamma):
+    n, m = P.shape
+    q = np.zeros((n, m))
+    qp = np.zeros((n, m))
+    qpp = np.zeros((n, m))
+    c1 = gamma/(beta*dt)
+    c2 = 1 - gamma/beta
+    c3 = dt*(1 - gamma/(2*beta))
+    c4 = 1/(beta*dt**2)
+    c5 = 1/(beta*dt)
+    c6 = 1/(2*beta) - 1
+    for j in range(n):
+        qpp[j, 0] = P[j, 0]
+    for i in range(m-1):
+        for j in range(n):
+            s = P[j, i+1]
+            for l in range(n):
+                s += a1[j, l]*q[l, i] + a2[j, l]*qp[l, i] + a3[j, l]*qpp[l, i]
+            q[j, i+1] = s/kp[j]
+        for j in range(n):
+            dq = q[j, i+1] - q[j, i]
+            qp[j, i+1] = c1*dq + c2*qp[j, i] + c3*qpp[j, i]
+            qpp[j, i+1] = dq*c4 - qp[j, i]*c5 - c6*qpp[j, i]
+    return q, qp, qpp
+
+def _newmarkVectorial(P, a1, a2, a3, kp, dt, beta, gamma):
+    n, m = P.shape
+    # Se trabaja con el tiempo en el primer eje para que cada paso lea filas contiguas
+    Pt = np.ascontiguousarray(P.T)
+    q = np.zeros((m, n))
+    qp = np.zeros((m, n))
+    qpp = np.zeros((m, n))
+    c1 = gamma/(beta*dt)
+    c2 = 1 - gamma/beta
+    c3 = dt*(1 - gamma/(2*beta))
+    c4 = 1/(beta*dt**2)
+    c5 = 1/(beta*dt)
+    c6 = 1/(2*beta) - 1
+    qpp[0] = Pt[0]
+    for i in range(m-1):
+        q[i+1] = (Pt[i+1] + a1@q[i] + a2@qp[i] + a3@qpp[i])/kp
+        dq = q[i+1] - q[i]
+        qp[i+1] = c1*dq + c2*qp[i] + c3*qpp[i]
+        qpp[i+1] = dq*c4 - qp[i]*c5 - c6*qpp[i]
+    return q.T, qp.T, qpp.T
+
+def newmarkModal(P, a1, a2, a3, kp, dt, beta=1/4, gamma=1/2):
+    """
+    Integra M*qpp + C*qp + K*q = P con M = I (modos normalizados a la masa).
+
+    PARÁMETROS:
+    P          : fuerzas modales Φ.T@p, array (modos, N)
+    a1, a2, a3 : matrices de Newmark (modos, modos), ver VGL.Newmark
+    kp         : diagonal de la rigidez efectiva K + a1
+    dt         : paso de tiempo
+    beta, gamma: parámetros de Newmark
+
+    RETORNOS:
+    q, qp, qpp : arrays (modos, N)
+    """
+    args = [np.ascontiguousarray(x, dtype=float) for x in (P, a1, a2, a3, kp)]
+    return _despachar(_newmarkBucle, _newmarkVectorial, *args, float(dt), float(beta), float(gamma))
+
+##################################################################################
+# Rotaciones de Jacobi
+
+@functools.lru_cache(maxsize=None)
+def _rondas(t):
+    """
+    Orden de las rotaciones de un ciclo de Jacobi (orden "round-robin"): t-1
+    rondas (t si t es impar) de pares (i, j), i < j, sin índices repetidos
+    dentro de una ronda. Cada par aparece una sola vez por ciclo.
+
+    RETORNOS:
+    pares : array (rondas, t//2, 2) de enteros
+    """
+    m = t + t % 2 # con t impar se agrega un índice ficticio que descansa en cada ronda
+    jugadores = list(range(m))
+    pares = []
+    for r in range(m - 1):
+        ronda = []
+        for k in range(m//2):
+            i, j = sorted((jugadores[k], jugadores[m - 1 - k]))
+            if j < t:
+                ronda.append((i, j))
+        pares.append(sorted(ronda))
+        jugadores.insert(1, jugadores.pop()) # rotación manteniendo fijo el primero
+    return np.array(pares, dtype=np.int64).reshape(m - 1, t//2, 2)
+
+def _jacobiBucle(A, V, pares, ciclos):
+    t = A.shape[0]
+    for ciclo in range(ciclos):
+        for r in range(pares.shape[0]):
+            for p in range(pares.shape[1]):
+                i = pares[r, p, 0]
+                j = pares[r, p, 1]
+                if A[i, i] != A[j, j]:
+                    teta = 0.5*atan(2*A[i, j]/(A[i, i] - A[j, j]))
+                else:
+                    teta = pi/4
+                c = cos(teta)
+                s = sin(teta)
+                # A <- P.T@A@P y V <- V@P, P rotación en el plano (i, j)
+                for l in range(t):
+                    ai = A[l, i]
+                    aj = A[l, j]
+                    A[l, i] = c*ai + s*aj
+                    A[l, j] = -s*ai + c*aj
+                    vi = V[l, i]
+                    vj = V[l, j]
+                    V[l, i] = c*vi + s*vj
+                    V[l, j] = -s*vi + c*vj
+                for l in range(t):
+                    ai = A[i, l]
+                    aj = A[j, l]
+                    A[i, l] = c*ai + s*aj
+                    A[j, l] = -s*ai + c*aj
+    return A, V
+
+BLOQUE_JACOBI = 128 # hasta este tamaño cada ronda se aplica como una matriz de rotación completa
+
+@functools.lru_cache(maxsize=None)
+def _indicesRondas(t):
+    # Por ronda: índices planos de A[i, i], A[j, j], A[i, j] (3, k), posiciones
+    # planas de c, c, -s, s y de los 1 de los índices que descansan en la
+    # ronda (t impar) en la matriz de rotación, y esos 1
+    indices = []
+    for ronda in _rondas(t):
+        I = ronda[:, 0]
+        J = ronda[:, 1]
+        libres = np.setdiff1d(np.arange(t), ronda.ravel())
+        indices.append((np.stack((I*t + I, J*t + J, I*t + J)),
+                        np.concatenate((I*t + I, J*t + J, I*t + J, J*t + I, libres*t + libres)),
+                        np.ones(len(libres))))
+    return indices
+
+def _angulos(aii, ajj, aij):
+    # atan(2*aij/(aii - ajj))/2, pi/4 si aii == ajj (atan(inf)/2)
+    d = aii - ajj
+    teta = 0.5*np.arctan(np.divide(2*aij, d, out=np.full(d.shape, np.inf), where=d != 0))
+    return np.cos(teta), np.sin(teta)
+
+def _jacobiVectorial(A, V, pares, ciclos):
+    # Las rotaciones de una ronda actúan sobre filas y columnas distintas, por
+    # lo que conmutan y se aplican todas a la vez:
+    #   t <= BLOQUE_JACOBI: una matriz de rotación por bloques P y A = P.T@A@P,
+    #                       V = V@P (unas 20 operaciones de numpy por ronda)
+    #   t >  BLOQUE_JACOBI: actualización de las columnas I, J y filas I, J
+    #                       (O(t²) por ronda en lugar de los O(t³) de P.T@A@P)
+    t = A.shape[0]
+    if t <= BLOQUE_JACOBI:
+        for ciclo in range(ciclos):
+            for plano, posiciones, unos in _indicesRondas(t):
+                a = A.take(plano)
+                c, s = _angulos(a[0], a[1], a[2])
+                P = np.zeros((t, t))
+                P.put(posiciones, np.concatenate((c, c, -s, s, unos)))
+                A = P.T@A@P
+                V = V@P
+        return A, V
+
+    for ciclo in range(ciclos):
+        for ronda in pares:
+            I = ronda[:, 0]
+            J = ronda[:, 1]
+            c, s = _angulos(A[I, I], A[J, J], A[I, J])
+            AI = A[:, I]
+            AJ = A[:, J]
+            A[:, I] = c*AI + s*AJ
+            A[:, J] = c*AJ - s*AI
+            VI = V[:, I]
+            VJ = V[:, J]
+            V[:, I] = c*VI + s*VJ
+            V[:, J] = c*VJ - s*VI
+            c = c[:, None]
+            s = s[:, None]
+            AI = A[I]
+            AJ = A[J]
+            A[I] = c*AI + s*AJ
+            A[J] = c*AJ - s*AI
+    return A, V
+
+def _jacobiDenso(A, V, pares, ciclos):
+    # Formulación original (Jacobi.P): A = P.T@A@P y V = V@P con la matriz de
+    # rotación completa, en el mismo orden de pares. Referencia de verificar().
+    t = A.shape[0]
+    for ciclo in range(ciclos):
+        for i, j in pares.reshape(-1, 2):
+            teta = 0.5*atan(2*A[i, j]/(A[i, i] - A[j, j])) if A[i, i] != A[j, j] else pi/4
+            P = np.eye(t)
+            P[i, i] = P[j, j] = cos(teta)
+            P[i, j] = -sin(teta)
+            P[j, i] = sin(teta)
+            A = P.T@A@P
+            V = V@P
+    return A, V
+
+def jacobiCiclos(A, V, ciclos):
+    """
+    Aplica 'ciclos' barridos de rotaciones de Jacobi a la matriz simétrica A,
+    acumulando las rotaciones en V. Cada rotación solo modifica las filas y
+    columnas i, j (O(n)) en lugar de multiplicar matrices completas. Los
+    pares se recorren en el orden de '_rondas', que permite aplicar juntas las
+    rotaciones de una ronda en el backend numpy.
+
+    RETORNOS:
+    A : matriz casi diagonal (valores propios en la diagonal)
+    V : producto de las rotaciones (vectores propios en las columnas)
+    """
+    A = np.array(A, dtype=float)
+    V = np.array(V, dtype=float)
+    return _despachar(_jacobiBucle, _jacobiVectorial, A, V, _rondas(A.shape[0]), int(ciclos))
+
+##################################################################################
+# Espectro de respuesta
+
+def _espectroBucle(at, dt, T, zeta, beta, gamma):
+    nT = T.shape[0]
+    m = at.shape[0]
+    Sd = np.zeros(nT)
+    Sa = np.zeros(nT)
+    for p in range(nT):
+        w = 2*pi/T[p]
+        k = w**2
+        c = 2*zeta*w
+        a1 = 1/(beta*dt**2) + gamma*c/(beta*dt)
+        a2 = 1/(beta*dt) + (gamma/beta - 1)*c
+        a3 = 1/(2*beta) - 1 + dt*(gamma/(2*beta) - 1)*c
+        kp = k + a1
+        u = 0.0
+        v = 0.0
+        a = -at[0]
+        umax = 0.0
+        amax = abs(a + at[0])
+        for i in range(m-1):
+            un = (-at[i+1] + a1*u + a2*v + a3*a)/kp
+            vn = gamma/(beta*dt)*(un - u) + (1 - gamma/beta)*v + dt*(1 - gamma/(2*beta))*a
+            an = (un - u)/(beta*dt**2) - v/(beta*dt) - (1/(2*beta) - 1)*a
+            u = un
+            v = vn
+            a = an
+            if abs(u) > umax:
+                umax = abs(u)
+            if abs(a + at[i+1]) > amax:
+                amax = abs(a + at[i+1])
+        Sd[p] = umax
+        Sa[p] = amax
+    return Sd, Sa
+
+def _espectroVectorial(at, dt, T, zeta, beta, gamma):
+    # Todos los periodos a la vez: un paso de tiempo es una operación sobre arrays (nT,)
+    w = 2*pi/T
+    k = w**2
+    c = 2*zeta*w
+    a1 = 1/(beta*dt**2) + gamma*c/(beta*dt)
+    a2 = 1/(beta*dt) + (gamma/beta - 1)*c
+    a3 = 1/(2*beta) - 1 + dt*(gamma/(2*beta) - 1)*c
+    kp = k + a1
+    u = np.zeros_like(T)
+    v = np.zeros_like(T)
+    a = np.full_like(T, -at[0])
+    umax = np.zeros_like(T)
+    amax = np.abs(a + at[0])
+    for i in range(at.shape[0]-1):
+        un = (-at[i+1] + a1*u + a2*v + a3*a)/kp
+        vn = gamma/(beta*dt)*(un - u) + (1 - gamma/beta)*v + dt*(1 - gamma/(2*beta))*a
+        an = (un - u)/(beta*dt**2) - v/(beta*dt) - (1/(2*beta) - 1)*a
+        u, v, a = un, vn, an
+        np.maximum(umax, np.abs(u), out=umax)
+        np.maximum(amax, np.abs(a + at[i+1]), out=amax)
+    return umax, amax
+
+def espectroRespuesta(at, dt, T, ζ=0.05, β=1/4, γ=1/2):
+    """
+    Espectro de respuesta elástico de osciladores de 1 GDL (Newmark).
+
+    PARÁMETROS:
+    at : aceleración del terreno (N,)
+    dt : paso de tiempo (s)
+    T  : periodos (s), todos > 0
+    ζ  : fracción de amortiguamiento
+
+    RETORNOS:
+    Sd  : desplazamiento máximo relativo
+    PSa : pseudo aceleración, (2π/T)²·Sd
+    Sa  : aceleración absoluta máxima
+    """
+    at = np.ascontiguousarray(at, dtype=float)
+    T = np.ascontiguousarray(np.atleast_1d(T), dtype=float)
+    Sd, Sa = _despachar(_espectroBucle, _espectroVectorial, at, float(dt), T, float(ζ), float(β), float(γ))
+    return Sd, (2*pi/T)**2*Sd, Sa
+
+##################################################################################
+
+def _error(salida, referencia):
+    # Error relativo máximo entre dos tuplas de arrays
+    return max(np.max(np.abs(x - y))/max(np.max(np.abs(y)), 1e-300) for x, y in zip(salida, referencia))
+
+def verificar(n=6, N=2000, tolerancia=1e-8, seed=0):
+    """
+    Verifica los kernels sobre datos aleatorios:
+
+        referencia : backend numpy contra la formulación directa (bucles
+                     explícitos en Python; para Jacobi, las rotaciones con la
+                     matriz P completa de la versión original)
+        numba      : backend numba contra el backend numpy (si numba está instalado)
+
+    Retorna un dict kernel -> {'referencia': error, 'numba': (error, tiempo
+    numpy, tiempo numba) o None}. Lanza AssertionError si algún error supera
+    la tolerancia.
+    """
+    rng = np.random.default_rng(seed)
+    at = rng.standard_normal(N)*100
+    B = rng.standard_normal((n, n))
+    A = B@B.T + n*np.eye(n)
+    # Sistema modal de n modos con M = I, K = Ω², C = 2ζΩ (como en VGL.Newmark)
+    Ω = np.diag(2*pi/np.linspace(0.1, 1.0, n))
+    dt, β, γ = 0.01, 1/4, 1/2
+    a1 = np.eye(n)/(β*dt**2) + γ*2*0.05*Ω/(β*dt)
+    a2 = np.eye(n)/(β*dt) + (γ/β - 1)*2*0.05*Ω
+    a3 = (1/(2*β) - 1)*np.eye(n) + dt*(γ/(2*β) - 1)*2*0.05*Ω
+    P = np.outer(rng.uniform(-1, 1, n), at)
+    T = np.linspace(0.05, 3, 20)
+    casos = {
+        'newmarkModal': (lambda: newmarkModal(P, a1, a2, a3, np.diag(Ω**2 + a1), dt),
+                         lambda: _newmarkBucle(P, a1, a2, a3, np.diag(Ω**2 + a1), dt, β, γ)),
+        'jacobiCiclos': (lambda: jacobiCiclos(A, np.eye(n), 3),
+                         lambda: _jacobiDenso(A.copy(), np.eye(n), _rondas(n), 3)),
+        'espectroRespuesta': (lambda: espectroRespuesta(at, 0.01, T),
+                              lambda: _espectroBucle(at, 0.01, T, 0.05, β, γ)),
+    }
+    try:
+        import numba
+        backends = ('numpy', 'numba')
+    except ImportError:
+        backends = ('numpy',)
+
+    anterior = backend()
+    resultados = {}
+    try:
+        for nombre, (funcion, referencia) in casos.items():
+            usar('numpy')
+            salida = funcion()
+            if nombre == 'espectroRespuesta':
+                salida = salida[0], salida[2] # la referencia retorna (Sd, Sa)
+            error = _error(salida, referencia())
+            assert error <= tolerancia, "%s: numpy difiere de la referencia en %.3e" % (nombre, error)
+            resultados[nombre] = {'referencia': error, 'numba': None}
+
+            if 'numba' in backends:
+                salidas, tiempos = [], []
+                for b in backends:
+                    usar(b)
+                    funcion() # compilación / calentamiento
+                    t0 = time.perf_counter()
+                    salidas.append(funcion())
+                    tiempos.append(time.perf_counter() - t0)
+                error = _error(*salidas)
+                assert error <= tolerancia, "%s: los backends difieren en %.3e" % (nombre, error)
+                resultados[nombre]['numba'] = (error, tiempos[0], tiempos[1])
+    finally:
+        usar(anterior)
+
+    # Los valores propios de Jacobi convergidos deben coincidir con numpy.linalg.eigvalsh
+    Ak = jacobiCiclos(A, np.eye(n), 20)[0]
+    error = np.max(np.abs(np.sort(np.diag(Ak)) - np.linalg.eigvalsh(A)))/np.max(np.abs(A))
+    assert error <= tolerancia, "jacobiCiclos: valores propios difieren en %.3e" % error
+    return resultados
+
+if __name__ == '__main__':
+    resultados = verificar()
+    print("backend: %s" % backend())
+    print("%-20s %14s %14s %12s %12s %8s" % ('kernel', 'err. referencia', 'err. numba', 'numpy (s)', 'numba (s)', 'x'))
+    for nombre, r in resultados.items():
+        if r['numba'] is None:
+            print("%-20s %14.3e %14s %12s %12s %8s" % (nombre, r['referencia'], '-', '-', '-', '-'))
+        else:
+            error, tnp, tnb = r['numba']
+            print("%-20s %14.3e %14.3e %12.6f %12.6f %8.1f" % (nombre, r['referencia'], error, tnp, tnb, tnp/tnb))
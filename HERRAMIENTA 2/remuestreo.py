@@ -0,0 +1,144 @@
+"""
+Remuestreo de registros antes del procesamiento.
+
+Los registros pueden venir con pasos de tiempo distintos (100 Hz, 200 Hz,
+1 kHz) o con marcas de tiempo irregulares. Todo el procesamiento posterior
+(filtros, integración, Newmark) es proporcional al número de muestras, por lo
+que un registro de 1 kHz cuesta 10 veces más que uno de 100 Hz aunque el
+contenido útil esté por debajo de 25 Hz. Esta etapa:
+
+    1. detecta marcas de tiempo irregulares y las lleva a una grilla uniforme,
+    2. elige una frecuencia de muestreo objetivo a partir de la mayor
+       frecuencia de interés (fh del pasa banda, frecuencia estructural),
+    3. diezma con resample_poly (filtro anti-alias polifásico).
+
+Si no se conoce ninguna frecuencia de interés el registro no se remuestrea.
+"""
+from fractions import Fraction
+import numpy as np
+
+def pasoTiempo(t, tolerancia=1e-3):
+    """
+    Paso de tiempo de un vector de tiempos.
+
+    PARÁMETROS:
+    t          : array de tiempos
+    tolerancia : variación relativa máxima de los pasos para considerarlos uniformes
+
+    RETORNOS:
+    dt       : mediana de los pasos entre tiempos distintos (ordenados)
+    uniforme : True si todos los pasos están dentro de la tolerancia (False si
+               hay tiempos repetidos o desordenados)
+    """
+    t = np.asarray(t, dtype=float)
+    # Los tiempos repetidos (p.e. un registro de 1 kHz escrito con 2 decimales)
+    # no cuentan para el paso: se usan los tiempos distintos, como en regularizar
+    unicos = np.unique(t)
+    if unicos.size < 2:
+        raise ValueError("Se necesitan al menos 2 tiempos distintos para calcular el paso de tiempo (hay %d)" % unicos.size)
+    dt = float(np.median(np.diff(unicos)))
+    if not np.isfinite(dt) or dt <= 0:
+        raise ValueError("Paso de tiempo no válido (dt = %g); revise la columna de tiempos" % dt)
+    pasos = np.diff(t)
+    return dt, bool(np.all(np.abs(pasos - dt) <= tolerancia*dt))
+
+def regularizar(t, acc, dt=None):
+    """
+    Interpola linealmente un registro con marcas de tiempo irregulares a una
+    grilla uniforme de paso dt (por defecto la mediana de los pasos).
+
+    PARÁMETROS:
+    t   : array de tiempos (N,) (se ordena si no es creciente)
+    acc : array (canales, N)
+
+    RETORNOS:
+    t, acc en la grilla uniforme
+    """
+    t = np.asarray(t, dtype=float)
+    acc = np.atleast_2d(np.asarray(acc, dtype=float))
+    if np.any(np.diff(t) <= 0):
+        t, unicos = np.unique(t, return_index=True)
+        acc = acc[:, unicos]
+    dt = dt or pasoTiempo(t)[0]
+    nuevo = t[0] + np.arange(int(np.floor((t[-1] - t[0])/dt + 1e-9)) + 1)*dt
+    return nuevo, np.array([np.interp(nuevo, t, a) for a in acc])
+
+def frecuenciaMaxima(fh=None, Ω=None):
+    """
+    Mayor frecuencia de interés para el remuestreo.
+
+    PARÁMETROS:
+    fh : frecuencia de corte superior del pasa banda (Hz), None si no se aplicó
+    Ω  : frecuencias naturales del modelo estructural (rad/s, vector o matriz diagonal), None si no hay modelo
+
+    RETORNOS:
+    fmax : max(fh, max(Ω)/2π) en Hz, o None si no se conoce ninguna (no se remuestrea)
+    """
+    candidatas = []
+    if fh:
+        candidatas.append(float(fh))
+    if Ω is not None and np.size(Ω):
+        candidatas.append(float(np.max(Ω))/(2*np.pi))
+    return max(candidatas) if candidatas else None
+
+def frecuenciaObjetivo(fs, fmax, factor=2.5):
+    """
+    Frecuencia de muestreo objetivo: la menor fs/q (q entero) que sea mayor o
+    igual a factor*fmax. Nunca es mayor que la frecuencia original.
+
+    PARÁMETROS:
+    fs     : frecuencia de muestreo del registro (Hz)
+    fmax   : mayor frecuencia de interés (Hz), p.e. max(fh, frecuencia estructural)
+    factor : relación entre la frecuencia de muestreo y fmax (> 2 para dejar margen al filtro)
+    """
+    q = max(int(np.floor(fs/(factor*fmax))), 1)
+    return fs/q
+
+def remuestrear(acc, dt, fs):
+    """
+    Remuestrea un registro uniforme a la frecuencia fs con resample_poly.
+
+    PARÁMETROS:
+    acc : array (N,) o (canales, N)
+    dt  : paso de tiempo original (s)
+    fs  : frecuencia de muestreo objetivo (Hz)
+
+    RETORNOS:
+    acc : array remuestreado (mismo número de dimensiones)
+    dt  : nuevo paso de tiempo
+    """
+    razon = Fraction(fs*dt).limit_denominator(1000)
+    if razon == 1:
+        return np.asarray(acc), dt
+    from scipy.signal import resample_poly
+    acc = resample_poly(acc, razon.numerator, razon.denominator, axis=-1)
+    return acc, dt/float(razon)
+
+def prepararRegistro(t, acc, fmax=None, factor=2.5, tolerancia=1e-3):
+    """
+    Etapa completa: regulariza las marcas de tiempo y, si se indica fmax,
+    diezma a la frecuencia objetivo.
+
+    PARÁMETROS:
+    t    : array de tiempos (N,)
+    acc  : array (canales, N)
+    fmax : mayor frecuencia de interés (Hz); None para no remuestrear
+
+    RETORNOS:
+    t, acc, dt : registro listo para procesar
+    info       : dict con fs original, fs final, si se regularizó y factor de reducción
+    """
+    dt, uniforme = pasoTiempo(t, tolerancia)
+    if uniforme:
+        t = np.asarray(t, dtype=float)
+        acc = np.atleast_2d(np.asarray(acc, dtype=float))
+    else:
+        t, acc = regularizar(t, acc, dt)
+    n = acc.shape[-1]
+
+    fs = 1/dt
+    if fmax:
+        acc, dt = remuestrear(acc, dt, frecuenciaObjetivo(fs, fmax, factor))
+        t = t[0] + np.arange(acc.shape[-1])*dt
+    info = {'fs': fs, 'fsFinal': 1/dt, 'regularizado': not uniforme, 'reduccion': n/acc.shape[-1]}
+    return t, acc, dt, info
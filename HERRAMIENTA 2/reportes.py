@@ -0,0 +1,262 @@
+"""
+Generación de reportes (PNG/PDF) de muchos registros sin interfaz gráfica.
+
+Las hojas usan las mismas disposiciones de paneles que las vistas de la
+aplicación:
+
+    'registro'   : aceleraciones X, Y, Z (viewLoad)
+    'correccion' : aceleración, velocidad y desplazamiento por dirección (viewBaseLine)
+    'simulacion' : respuesta de cada piso y del terreno (viewSimula)
+
+Cada proceso arma una sola vez la figura de cada plantilla (backend Agg, sin
+pyplot) y para cada registro solo actualiza los datos de las líneas, los
+límites de los ejes y los textos; los registros se reparten entre un grupo de
+procesos.
+
+Uso (desde la carpeta HERRAMIENTA 2):
+
+    python reportes.py registros/*.csv -o reportes --plantilla correccion --formato pdf
+    python reportes.py registros/ -o reportes --linea-base Polinomial 2 --pasa-banda 0.1 20 5
+    python reportes.py registros/ -o reportes --plantilla simulacion --pisos 4 -j 8
+"""
+import os, sys, glob, time, argparse
+import numpy as np
+
+from funciones import BaseLineCorrection, Butterworth_Bandpass
+from intensidad import acumulada
+from remuestreo import prepararRegistro
+import hilos
+
+COLORES = ['b', 'g', 'k']
+DIRECCIONES = ['X', 'Y', 'Z']
+A4 = (11.69, 8.27) # pulgadas, horizontal
+
+class Plantilla:
+
+    def __init__(self, filas, columnas, ylabels=None, titulos=None, colores=None, alpha=1.0, tamano=A4):
+        """
+        Figura con una grilla de filas x columnas paneles, cada uno con una
+        línea y un texto (pico) ya creados.
+
+        PARÁMETROS:
+        ylabels : lista (filas x columnas) de etiquetas del eje y, o None
+        titulos : títulos de las columnas, o None
+        colores : color de la línea de cada fila, o None para COLORES por columna
+        """
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+        self.fig = Figure(figsize=tamano)
+        FigureCanvasAgg(self.fig)
+        self.axs = np.array(self.fig.subplots(filas, columnas, sharex=True, squeeze=False))
+        self.lineas = np.empty((filas, columnas), dtype=object)
+        self.textos = np.empty((filas, columnas), dtype=object)
+        for i in range(filas):
+            for j in range(columnas):
+                ax = self.axs[i, j]
+                color = colores[i] if colores else COLORES[j % 3]
+                self.lineas[i, j], = ax.plot([], [], color, lw=0.5, alpha=alpha)
+                self.textos[i, j] = ax.text(0.99, 0.95, '', transform=ax.transAxes, ha='right', va='top', fontsize='xx-small',
+                                            bbox=dict(boxstyle='round', facecolor='w', edgecolor='0.8'))
+                ax.xaxis.set_tick_params(labelsize=6)
+                ax.yaxis.set_tick_params(labelsize=6)
+                ax.grid(True, color='k', linestyle='-', linewidth=0.4, which='both', alpha = 0.2)
+                if ylabels:
+                    ax.set_ylabel(ylabel=ylabels[i][j], fontsize='xx-small')
+                if titulos and i == 0:
+                    ax.set_title(titulos[j], fontsize='xx-small')
+        for j in range(columnas):
+            self.axs[-1, j].set_xlabel(xlabel='$Tiempo (s)$', fontsize='xx-small')
+        self.titulo = self.fig.suptitle('', fontsize='small')
+        self.fig.subplots_adjust(left=0.07, bottom=0.07, right=0.98, top=0.93, wspace=0.25, hspace=0.12)
+
+    def actualizar(self, t, series, textos, titulo=''):
+        """
+        PARÁMETROS:
+        t      : array de tiempos
+        series : array (filas, columnas, N)
+        textos : lista (filas x columnas) de textos de cada panel
+        titulo : título de la hoja
+        """
+        limites = np.max(np.abs(series), axis=(0, 2))*1.05
+        limites[limites == 0] = 1.0
+        for i in range(series.shape[0]):
+            for j in range(series.shape[1]):
+                self.lineas[i, j].set_data(t, series[i, j])
+                self.textos[i, j].set_text(textos[i][j])
+                self.axs[i, j].set_ylim(-limites[j], limites[j])
+        self.axs[0, 0].set_xlim(t[0], t[-1])
+        self.titulo.set_text(titulo)
+
+    def guardar(self, path, dpi=150):
+        self.fig.savefig(path, dpi=dpi)
+
+def plantillaRegistro():
+    return Plantilla(3, 1, ylabels=[['Aceleración en %s ($cm/s^2$)' % d] for d in DIRECCIONES], colores=COLORES)
+
+def plantillaCorreccion():
+    ylabels = [['Aceleración en %s ($cm/s^2$)' % d, 'Velocidad en %s ($cm/s$)' % d, 'Desplazamiento en %s ($cm$)' % d] for d in DIRECCIONES]
+    return Plantilla(3, 3, ylabels=ylabels, colores=COLORES)
+
+def plantillaSimulacion(pisos):
+    return Plantilla(pisos + 1, 3, titulos=['Aceleracion (cm/s2)', 'Velocidad (cm/s)', 'Desplazamiento (cm)'], alpha=0.6)
+
+def leerRegistro(path):
+    """
+    Lee un archivo con el formato de la aplicación (Time;X;Y;Z sin cabecera).
+    """
+    import pandas as pd
+    df = pd.read_csv(path, sep=';', names=["Time", "X", "Y", "Z"])
+    return df['Time'].to_numpy(), df[['X', 'Y', 'Z']].to_numpy().T
+
+def procesar(path, lineaBase=None, pasaBanda=None, fmax=None):
+    """
+    Lee y corrige un registro.
+
+    PARÁMETROS:
+    lineaBase : (tipo, orden, dspline) para BaseLineCorrection, o None
+    pasaBanda : (fl, fh, n) para Butterworth_Bandpass, o None
+    fmax      : frecuencia máxima de interés para remuestrear (ver remuestreo), o None
+
+    RETORNOS:
+    t, acc (3, N), dt
+    """
+    t, acc = leerRegistro(path)
+    t, acc, dt, info = prepararRegistro(t, acc, fmax)
+    if lineaBase:
+        tipo, orden, dspline = lineaBase
+        acc = BaseLineCorrection(acc, dt=dt, type=tipo, order=orden, dspline=dspline)
+    if pasaBanda:
+        fl, fh, n = pasaBanda
+        acc = Butterworth_Bandpass(acc, dt, fl, fh, n)
+    return t, acc, dt
+
+def simular(at, dt, pisos, m=10000, k=2000000):
+    """
+    Misma simulación que viewSimula: VGL de 'pisos' pisos iguales sometido a 'at'.
+    """
+    from vgl import VGL
+    mdof = VGL()
+    mm = mdof.MatrizMasa([m for i in range(pisos)])
+    mdof.MatrizRigidez([k for i in range(pisos)])
+    mdof.Modos(500)
+    p = -mm@np.ones((pisos, 1))*at
+    mdof.Newmark(pisos, p, dt)
+    return mdof
+
+def _pico(x, unidad):
+    return 'pico: %.2f %s' % (np.max(np.abs(x)), unidad)
+
+_plantillas = {} # por proceso: se arman una vez y se reutilizan para todos los registros
+
+def _plantilla(nombre, pisos):
+    clave = (nombre, pisos if nombre == 'simulacion' else None)
+    if clave not in _plantillas:
+        if nombre == 'registro':
+            _plantillas[clave] = plantillaRegistro()
+        elif nombre == 'correccion':
+            _plantillas[clave] = plantillaCorreccion()
+        elif nombre == 'simulacion':
+            _plantillas[clave] = plantillaSimulacion(pisos)
+        else:
+            raise ValueError("Plantilla no soportada: %s" % nombre)
+    return _plantillas[clave]
+
+def hoja(path, salida, plantilla='correccion', formato='png', dpi=150, pisos=4, direccion='X', m=10000, k=2000000, **opciones):
+    """
+    Genera la hoja de un registro y retorna (archivo generado, segundos).
+    """
+    t0 = time.perf_counter()
+    t, acc, dt = procesar(path, **opciones)
+    nombre = os.path.splitext(os.path.basename(path))[0]
+    p = _plantilla(plantilla, pisos)
+
+    if plantilla == 'registro':
+        series = acc[:, None, :]
+        textos = [[_pico(a, 'cm/s^2')] for a in acc]
+    elif plantilla == 'correccion':
+        vel = acumulada(acc, dt)
+        dsp = acumulada(vel, dt)
+        series = np.stack((acc, vel, dsp), axis=1)
+        textos = [[_pico(acc[i], 'cm/s^2'), _pico(vel[i], 'cm/s'), _pico(dsp[i], 'cm')] for i in range(3)]
+    else:
+        at = acc[DIRECCIONES.index(direccion)]
+        mdof = simular(at, dt, pisos, m, k)
+        upt = acumulada(at, dt)
+        ut = acumulada(upt, dt)
+        # Pisos de arriba hacia abajo y el terreno al final, como en viewSimula
+        series = np.stack((np.vstack((mdof.upp[::-1], at)), np.vstack((mdof.up[::-1], upt)), np.vstack((mdof.u[::-1], ut))), axis=1)
+        etiquetas = ['Piso %d' % (j+1) for j in range(pisos)][::-1] + ['Terreno']
+        textos = [['%s - %s' % (e, _pico(series[i, j], '')) for j in range(3)] for i, e in enumerate(etiquetas)]
+        nombre += ' - %d pisos, dirección %s' % (pisos, direccion)
+
+    p.actualizar(t, series, textos, titulo=nombre)
+    archivo = os.path.join(salida, '%s_%s.%s' % (os.path.splitext(os.path.basename(path))[0], plantilla, formato))
+    p.guardar(archivo, dpi)
+    return archivo, time.perf_counter() - t0
+
+def _hoja(argumentos):
+    path, salida, opciones = argumentos
+    try:
+        return hoja(path, salida, **opciones)
+    except Exception as e: # un registro defectuoso no detiene el reporte
+        return None, '%s: %s' % (path, e)
+
+def generarReporte(archivos, salida, procesos=None, **opciones):
+    """
+    Genera las hojas de todos los registros repartiéndolos entre 'procesos'
+    procesos (por defecto los CPU disponibles; 1 para hacerlo en este proceso).
+
+    RETORNOS:
+    lista de archivos generados y lista de errores
+    """
+    os.makedirs(salida, exist_ok=True)
+    tareas = [(path, salida, opciones) for path in archivos]
+    procesos = procesos or hilos.cpus()
+    if procesos == 1 or len(tareas) < 2:
+        resultados = list(map(_hoja, tareas))
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        procesos = min(procesos, len(tareas))
+        # Cada proceso usa su parte de los CPU en FFT y BLAS para no sobresuscribir
+        with ProcessPoolExecutor(procesos, initializer=hilos.iniciarProceso, initargs=(hilos.repartir(procesos),)) as ejecutor:
+            resultados = list(ejecutor.map(_hoja, tareas, chunksize=max(len(tareas)//(4*procesos), 1)))
+
+    generados = [archivo for archivo, info in resultados if archivo is not None]
+    errores = [info for archivo, info in resultados if archivo is None]
+    return generados, errores
+
+def _archivos(rutas):
+    archivos = []
+    for ruta in rutas:
+        if os.path.isdir(ruta):
+            archivos += sorted(glob.glob(os.path.join(ruta, '*.csv')) + glob.glob(os.path.join(ruta, '*.txt')))
+        else:
+            archivos += sorted(glob.glob(ruta))
+    return archivos
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Reportes PNG/PDF de registros sin interfaz gráfica')
+    parser.add_argument('rutas', nargs='+', help='archivos o carpetas con registros (Time;X;Y;Z)')
+    parser.add_argument('-o', '--salida', default='reportes')
+    parser.add_argument('--plantilla', default='correccion', choices=['registro', 'correccion', 'simulacion'])
+    parser.add_argument('--formato', default='png', choices=['png', 'pdf', 'svg'])
+    parser.add_argument('--dpi', type=int, default=150)
+    parser.add_argument('-j', '--procesos', type=int, default=None)
+    parser.add_argument('--linea-base', nargs=2, metavar=('TIPO', 'ORDEN'), default=None, help='Polinomial 2, Spline 3, ...')
+    parser.add_argument('--dspline', type=int, default=1000)
+    parser.add_argument('--pasa-banda', nargs=3, type=float, metavar=('FL', 'FH', 'N'), default=None)
+    parser.add_argument('--fmax', type=float, default=None, help='frecuencia máxima de interés para remuestrear')
+    parser.add_argument('--pisos', type=int, default=4)
+    parser.add_argument('--direccion', default='X', choices=['X', 'Y'])
+    args = parser.parse_args()
+
+    lineaBase = (args.linea_base[0], int(args.linea_base[1]), args.dspline) if args.linea_base else None
+    archivos = _archivos(args.rutas)
+    inicio = time.perf_counter()
+    generados, errores = generarReporte(archivos, args.salida, args.procesos, plantilla=args.plantilla, formato=args.formato,
+                                        dpi=args.dpi, pisos=args.pisos, direccion=args.direccion,
+                                        lineaBase=lineaBase, pasaBanda=args.pasa_banda, fmax=args.fmax)
+    print("%d hojas en %.1f s (%s)" % (len(generados), time.perf_counter() - inicio, args.salida))
+    for error in errores:
+        print("Error: %s" % error, file=sys.stderr)
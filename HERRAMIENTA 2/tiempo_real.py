@@ -0,0 +1,338 @@
+"""
+Modo de adquisición en tiempo real.
+
+    productor -> FiltroCausal -> BufferCircular (X, Y, Z) -> DetectorSTALTA / PGA
+
+Los productores entregan bloques de muestras 'Time;X;Y;Z' sin bloquear:
+
+    ProductorArchivo : sigue un archivo de texto que otro proceso va escribiendo (como tail -f)
+    ProductorSocket  : servidor en un socket UNIX que recibe líneas Time;X;Y;Z
+
+Todo el estado (buffers, filtro, promedios STA/LTA) tiene tamaño fijo, por
+lo que la memoria y el tiempo por actualización no dependen de cuánto tiempo
+lleve corriendo.
+
+Para probar sin estación, simular() escribe un registro sintético (o un CSV)
+en un archivo o socket al ritmo real:
+
+    python tiempo_real.py simular /tmp/estacion.csv
+    python tiempo_real.py simular unix:/tmp/estacion.sock
+"""
+import os, sys, time, socket, stat
+import numpy as np
+
+class BufferCircular:
+    """
+    Buffer circular de tamaño fijo para varios canales.
+    """
+
+    def __init__(self, canales, capacidad, dtype=float):
+        self.datos = np.zeros((canales, capacidad), dtype=dtype)
+        self.capacidad = capacidad
+        self.pos = 0      # siguiente posición a escribir
+        self.total = 0    # muestras recibidas desde el inicio
+
+    def agregar(self, bloque):
+        """
+        Agrega un bloque (canales, k). Si k supera la capacidad se guardan solo las últimas muestras.
+        """
+        bloque = np.asarray(bloque)
+        k = bloque.shape[1]
+        self.total += k
+        if k >= self.capacidad:
+            self.datos[:] = bloque[:, -self.capacidad:]
+            self.pos = 0
+            return
+        fin = self.pos + k
+        if fin <= self.capacidad:
+            self.datos[:, self.pos:fin] = bloque
+        else:
+            corte = self.capacidad - self.pos
+            self.datos[:, self.pos:] = bloque[:, :corte]
+            self.datos[:, :k - corte] = bloque[:, corte:]
+        self.pos = fin % self.capacidad
+
+    def __len__(self):
+        return min(self.total, self.capacidad)
+
+    def ultimos(self, n=None):
+        """
+        Retorna las últimas n muestras (canales, n) en orden cronológico.
+        """
+        n = len(self) if n is None else min(n, len(self))
+        ini = self.pos - n
+        if ini >= 0:
+            return self.datos[:, ini:self.pos]
+        return np.concatenate((self.datos[:, ini:], self.datos[:, :self.pos]), axis=1)
+
+class FiltroCausal:
+    """
+    Versión causal y por bloques del filtro pasa banda: Butterworth IIR en
+    secciones de segundo orden (scipy.signal.sosfilt) que conserva su estado
+    entre bloques. A diferencia de Butterworth_Bandpass (filtro de fase cero
+    en el dominio de la frecuencia, que necesita el registro completo),
+    introduce un desfase, pero cada muestra se procesa apenas llega.
+    """
+
+    def __init__(self, dt, fl, fh, n=4, canales=3):
+        from scipy.signal import butter
+        fs = 1.0/dt
+        fh = min(fh, 0.45*fs)
+        self.sos = butter(int(n), [fl, fh], btype='bandpass', fs=fs, output='sos')
+        self.zi = np.zeros((self.sos.shape[0], canales, 2))
+
+    def procesar(self, bloque):
+        from scipy.signal import sosfilt
+        y, self.zi = sosfilt(self.sos, bloque, axis=-1, zi=self.zi)
+        return y
+
+class DetectorSTALTA:
+    """
+    Detector STA/LTA recursivo. Los promedios de corto (STA) y largo (LTA)
+    plazo de x² se calculan con lfilter conservando el estado, y se activa un
+    evento cuando STA/LTA supera 'encendido' en cualquier canal (se apaga
+    al bajar de 'apagado').
+    """
+
+    def __init__(self, dt, sta=1.0, lta=30.0, encendido=3.0, apagado=1.5, canales=3):
+        self.a_sta = dt/sta
+        self.a_lta = dt/lta
+        self.encendido = encendido
+        self.apagado = apagado
+        self.zi_sta = np.zeros((canales, 1))
+        self.zi_lta = np.zeros((canales, 1))
+        self.activo = False
+        self.muestras = 0
+        self.calentamiento = int(lta/dt) # no se dispara hasta llenar el LTA
+
+    def procesar(self, bloque):
+        """
+        Procesa un bloque (canales, k). Retorna (razón STA/LTA máxima entre
+        canales por muestra, lista de eventos [(índice, 'on'|'off')]).
+        """
+        from scipy.signal import lfilter
+        x2 = bloque**2
+        sta, self.zi_sta = lfilter([self.a_sta], [1, self.a_sta - 1], x2, axis=-1, zi=self.zi_sta)
+        lta, self.zi_lta = lfilter([self.a_lta], [1, self.a_lta - 1], x2, axis=-1, zi=self.zi_lta)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            razon = np.nan_to_num(np.max(sta/lta, axis=0))
+        inicio = self.muestras
+        self.muestras += bloque.shape[1]
+        if self.muestras <= self.calentamiento:
+            return razon, []
+        razon_valida = razon.copy()
+        razon_valida[:max(0, self.calentamiento - inicio)] = 0.0
+
+        eventos = []
+        i = 0
+        while True:
+            if not self.activo:
+                idx = np.flatnonzero(razon_valida[i:] > self.encendido)
+            else:
+                idx = np.flatnonzero(razon_valida[i:] < self.apagado)
+            if not len(idx):
+                break
+            i += idx[0]
+            self.activo = not self.activo
+            eventos.append((inicio + i, 'on' if self.activo else 'off'))
+        return razon, eventos
+
+def _parsear(lineas):
+    """
+    Convierte líneas 'Time;X;Y;Z' en un array (k, 4). Las líneas mal formadas se descartan.
+    """
+    filas = []
+    for linea in lineas:
+        partes = linea.strip().split(';')
+        if len(partes) != 4:
+            continue
+        try:
+            filas.append([float(v) for v in partes])
+        except ValueError:
+            continue
+    return np.array(filas, dtype=float).reshape(-1, 4)
+
+class ProductorArchivo:
+    """
+    Lee las líneas nuevas de un archivo que otro proceso va escribiendo.
+    """
+
+    def __init__(self, path, desdeInicio=False):
+        self.file = open(path, 'r', encoding='utf-8')
+        if not desdeInicio:
+            self.file.seek(0, os.SEEK_END)
+        self.resto = ''
+
+    def leer(self):
+        texto = self.resto + self.file.read()
+        if not texto:
+            return np.zeros((0, 4))
+        lineas = texto.split('\n')
+        self.resto = lineas.pop() # la última línea puede estar incompleta
+        return _parsear(lineas)
+
+    def cerrar(self):
+        self.file.close()
+
+class ProductorSocket:
+    """
+    Servidor en un socket UNIX (SOCK_STREAM) que acepta una conexión y
+    recibe líneas 'Time;X;Y;Z'. No bloquea: leer() retorna lo que haya llegado.
+    """
+
+    def __init__(self, path):
+        # Solo se reemplaza un socket anterior (p.e. de una sesión que no se cerró)
+        if os.path.lexists(path):
+            if not stat.S_ISSOCK(os.lstat(path).st_mode):
+                raise FileExistsError("%s ya existe y no es un socket" % path)
+            os.remove(path)
+        self.path = path
+        self.servidor = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.servidor.bind(path)
+        self.servidor.listen(1)
+        self.servidor.setblocking(False)
+        self.conexion = None
+        self.resto = b''
+
+    def leer(self):
+        if self.conexion is None:
+            try:
+                self.conexion, _ = self.servidor.accept()
+                self.conexion.setblocking(False)
+            except BlockingIOError:
+                return np.zeros((0, 4))
+        datos = []
+        while True:
+            try:
+                parte = self.conexion.recv(1 << 16)
+            except BlockingIOError:
+                break
+            if not parte: # el productor cerró la conexión
+                self.conexion.close()
+                self.conexion = None
+                break
+            datos.append(parte)
+        texto = self.resto + b''.join(datos)
+        lineas = texto.split(b'\n')
+        self.resto = lineas.pop()
+        return _parsear(l.decode('utf-8', 'replace') for l in lineas)
+
+    def cerrar(self):
+        if self.conexion is not None:
+            self.conexion.close()
+        self.servidor.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+def abrirProductor(fuente):
+    """
+    'unix:/ruta/socket' abre un ProductorSocket; cualquier otra ruta un ProductorArchivo.
+    """
+    if fuente.startswith('unix:'):
+        return ProductorSocket(fuente[5:])
+    return ProductorArchivo(fuente)
+
+class Estacion:
+    """
+    Une productor, filtro causal, buffers y detector. Cada llamada a
+    actualizar() procesa solo las muestras nuevas.
+
+    PARÁMETROS:
+    productor : objeto con método leer() -> array (k, 4)
+    dt        : paso de tiempo de la estación (s)
+    ventana   : segundos que se guardan en los buffers (para graficar y para el PGA móvil)
+    fl, fh, n : parámetros del filtro pasa banda causal (None para no filtrar)
+    sta, lta  : ventanas del detector (s)
+    """
+
+    def __init__(self, productor, dt, ventana=60.0, fl=0.1, fh=20.0, n=4, sta=1.0, lta=30.0,
+                 encendido=3.0, apagado=1.5):
+        self.productor = productor
+        self.dt = dt
+        capacidad = int(round(ventana/dt))
+        self.tiempo = BufferCircular(1, capacidad)
+        self.acc = BufferCircular(3, capacidad)
+        self.razon = BufferCircular(1, capacidad)
+        self.filtro = FiltroCausal(dt, fl, fh, n) if fl is not None else None
+        self.detector = DetectorSTALTA(dt, sta, lta, encendido, apagado)
+        self.eventos = [] # (tiempo, 'on'|'off'), se guardan solo los últimos 100
+        self.pga = 0.0
+
+    def actualizar(self):
+        """
+        Lee y procesa las muestras nuevas. Retorna el número de muestras procesadas.
+        """
+        datos = self.productor.leer()
+        k = len(datos)
+        if k == 0:
+            return 0
+        t = datos[:, 0]
+        bloque = datos[:, 1:].T
+        if self.filtro is not None:
+            bloque = self.filtro.procesar(bloque)
+        razon, eventos = self.detector.procesar(bloque)
+        inicio = self.detector.muestras - k
+        for i, tipo in eventos:
+            self.eventos.append((t[i - inicio], tipo))
+        del self.eventos[:-100]
+
+        self.tiempo.agregar(t[None, :])
+        self.acc.agregar(bloque)
+        self.razon.agregar(razon[None, :])
+        self.pga = max(self.pga, float(np.max(np.abs(bloque))))
+        return k
+
+    def pgaMovil(self, segundos=None):
+        """
+        PGA de cada canal en los últimos 'segundos' (por defecto toda la ventana).
+        """
+        n = None if segundos is None else int(segundos/self.dt)
+        acc = self.acc.ultimos(n)
+        return np.max(np.abs(acc), axis=1) if acc.shape[1] else np.zeros(3)
+
+def simular(destino, path=None, dt=0.01, duracion=60.0, reposo=40.0, velocidad=1.0, bloque=10):
+    """
+    Envía un registro al 'destino' (archivo o 'unix:/ruta') al ritmo real,
+    'bloque' muestras a la vez. Si no se da 'path' (CSV Time;X;Y;Z) se usa
+    un registro sintético de 'duracion' segundos precedido de 'reposo'
+    segundos de ruido de fondo, para que el detector tenga con qué dispararse.
+    """
+    if path:
+        datos = np.loadtxt(path, delimiter=';')
+        dt = datos[1, 0] - datos[0, 0]
+    else:
+        sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks'))
+        from sinteticos import registroSintetico
+        t, acc = registroSintetico(int(duracion/dt), dt=dt)
+        n0 = int(reposo/dt)
+        fondo = np.random.default_rng(1).standard_normal((3, n0))*0.5
+        acc = np.concatenate((fondo, acc), axis=1)
+        datos = np.column_stack((np.arange(acc.shape[1])*dt, acc.T))
+
+    if destino.startswith('unix:'):
+        s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        s.connect(destino[5:])
+        escribir = lambda texto: s.sendall(texto.encode('utf-8'))
+        cerrar = s.close
+    else:
+        f = open(destino, 'a', encoding='utf-8')
+        def escribir(texto):
+            f.write(texto)
+            f.flush()
+        cerrar = f.close
+
+    inicio = time.time()
+    try:
+        for i in range(0, len(datos), bloque):
+            espera = inicio + i*dt/velocidad - time.time()
+            if espera > 0:
+                time.sleep(espera)
+            escribir(''.join('%.4f;%.6f;%.6f;%.6f\n' % tuple(fila) for fila in datos[i:i + bloque]))
+    finally:
+        cerrar()
+
+if __name__ == '__main__':
+    if len(sys.argv) >= 3 and sys.argv[1] == 'simular':
+        simular(sys.argv[2], sys.argv[3] if len(sys.argv) > 3 else None)
+    else:
+        print(__doc__)
@@ -0,0 +1,445 @@
+import os, hashlib
+from collections import OrderedDict
+import numpy as np
+from copy import copy
+from math import atan, sin, cos
+from instrumentacion import medir
+from kernels import newmarkModal, jacobiCiclos
+import hilos
+
+def claveModal(m, k, iteraciones):
+	"""
+	Clave del análisis modal: hash SHA-1 de las matrices de masa y rigidez y
+	del número de iteraciones de Jacobi.
+	"""
+	h = hashlib.sha1()
+	for x in (m, k):
+		x = np.ascontiguousarray(x, dtype=float)
+		h.update(str(x.shape).encode())
+		h.update(x.tobytes())
+	h.update(str(int(iteraciones)).encode())
+	return h.hexdigest()
+
+class CacheModal:
+
+	def __init__(self, maximo=32, carpeta=None):
+		"""
+		Caché de propiedades modales (T, Ω, Φ, Γ) indexado por claveModal.
+
+		PARÁMETROS:
+		maximo  : número de análisis que se guardan en memoria (LRU)
+		carpeta : carpeta para guardar también en disco (un .npz por clave), o None
+		"""
+		self.maximo = maximo
+		self.carpeta = carpeta
+		self._memoria = OrderedDict()
+
+	def _archivo(self, clave):
+		return os.path.join(self.carpeta, 'modos_%s.npz' % clave)
+
+	def obtener(self, clave):
+		if clave in self._memoria:
+			self._memoria.move_to_end(clave)
+			return self._memoria[clave]
+		if self.carpeta and os.path.exists(self._archivo(clave)):
+			with np.load(self._archivo(clave)) as f:
+				modos = {c: f[c] for c in ('T', 'Ω', 'Φ', 'Γ')}
+			self._guardarMemoria(clave, modos)
+			return modos
+		return None
+
+	def guardar(self, clave, modos):
+		modos = {c: np.array(v) for c, v in modos.items()}
+		self._guardarMemoria(clave, modos)
+		if self.carpeta:
+			os.makedirs(self.carpeta, exist_ok=True)
+			temporal = self._archivo(clave) + '.tmp.npz'
+			np.savez(temporal, **modos)
+			os.replace(temporal, self._archivo(clave))
+
+	def _guardarMemoria(self, clave, modos):
+		self._memoria[clave] = modos
+		while len(self._memoria) > self.maximo:
+			self._memoria.popitem(last=False)
+
+	def limpiar(self):
+		self._memoria.clear()
+
+# Capa en disco opcional: DHIP_CACHE_MODAL=<carpeta>
+cacheModal = CacheModal(carpeta=os.environ.get('DHIP_CACHE_MODAL') or None)
+
+class VGL:
+
+	def __init__(self):
+		"""
+		"""
+		self.c = None # matriz de amortiguamiento (MatrizAmortiguamiento / MatrizRayleigh)
+		self._claveModos = None # (iteraciones, claveModal) de las matrices analizadas por Modos
+
+	def _modosVigentes(self):
+		# True si Modos se calculó con las matrices m y k actuales
+		if self._claveModos is None:
+			return False
+		iteraciones, clave = self._claveModos
+		return clave == claveModal(self.m, self.k, iteraciones)
+
+	def MatrizRigidez(self, args):
+		"""
+                Construye la matriz de rigideces pasando por parámetro una tupla con
+		los valores de las rigideces.
+		"""
+		n = len(args)
+		self.n = n
+		self.k = np.zeros((n,n))
+
+		self.k[0][0] = args[0] + args[1]
+		self.k[0][1] = -args[1]
+
+		for i in range(1,n-1):
+			self.k[i][i-1] = -args[i]
+			self.k[i][i] = args[i] + args[i+1]
+			self.k[i][i+1] = -args[i+1]
+
+		self.k[n-1][n-2] = -args[n-1]
+		self.k[n-1][n-1] = args[n-1]
+
+		return self.k
+
+	def MatrizMasa(self, args):
+		"""
+		Construye la matriz de masas pasando por parámetro una tupla con
+		los valores de las masas.
+		"""
+		n = len(args)
+		self.n = n
+		self.m = np.zeros((n,n))
+
+		for i in range(n):
+			self.m[i][i] = args[i]
+
+		return self.m
+
+	def MatrizAmortiguamiento(self, args):
+		"""
+		Construye la matriz de amortiguamiento de amortiguadores entre pisos
+		(mismo ensamblaje que la matriz de rigideces) pasando por parámetro una
+		tupla con los coeficientes de cada entrepiso.
+		"""
+		n = len(args)
+		self.c = np.zeros((n,n))
+
+		self.c[0][0] = args[0]
+		for i in range(1,n):
+			self.c[i-1][i-1] += args[i]
+			self.c[i][i] += args[i]
+			self.c[i-1][i] -= args[i]
+			self.c[i][i-1] -= args[i]
+
+		return self.c
+
+	def MatrizRayleigh(self, ζ = 0.05, modos = (0, 1), adicional = None):
+		"""
+		Amortiguamiento de Rayleigh c = a0*m + a1*k con fracción ζ en los dos
+		modos indicados (por defecto el 1° y el 2°):
+				a0 = 2ζωiωj/(ωi + ωj),  a1 = 2ζ/(ωi + ωj)
+		Si no se llamó a Modos, o m y k cambiaron después, las frecuencias se
+		calculan con scipy.linalg.eigh (solo las necesarias). 'adicional' es una matriz que se suma, p.e. la de
+		MatrizAmortiguamiento para amortiguadores entre pisos.
+		"""
+		i, j = modos
+		if self._modosVigentes():
+			ω = self.Ω.diagonal()
+		else:
+			from scipy.linalg import eigh
+			ω = np.sqrt(eigh(self.k, self.m, eigvals_only=True, subset_by_index=[0, max(i, j)]))
+		a0 = 2*ζ*ω[i]*ω[j]/(ω[i] + ω[j])
+		a1 = 2*ζ/(ω[i] + ω[j])
+
+		self.c = a0*self.m + a1*self.k
+		if adicional is not None:
+			self.c = self.c + adicional
+		return self.c
+
+	@medir('VGL.Modos')
+	def Modos(self, iteraciones, cache=cacheModal):
+		"""
+		Periodos, frecuencias, modos normalizados y factores de participación.
+		Si las matrices m y k ya se analizaron, se toman de 'cache' (None para
+		calcular siempre).
+		"""
+		clave = claveModal(self.m, self.k, iteraciones)
+		self._claveModos = (iteraciones, clave)
+		if cache is not None:
+			modos = cache.obtener(clave)
+			if modos is not None:
+				self.T, self.Ω, self.Φ, self.Γ = [modos[c].copy() for c in ('T', 'Ω', 'Φ', 'Γ')]
+				return
+
+		# Comvirtiendo a la forma clásica
+		r = np.zeros((self.n, self.n))
+
+		for i in range(self.n):
+			r[i][i] = self.m[i][i]**(-0.5)
+
+		A = r@self.k@r
+
+		jacobi = Jacobi(A, iteraciones)
+		self.T = 2*np.pi*jacobi.Ω.diagonal()**(-1)
+		self.Ω = jacobi.Ω
+		self.Φ = jacobi.Φ
+
+		# Normalizando los modos
+		for i in range(self.n):
+			self.Φ[:,i:i+1] = self.Φ[:,i:i+1]/(self.Φ[:,i:i+1].T@self.m@self.Φ[:,i:i+1])**0.5
+		
+		
+		# Ordenando de mayor a menor periodo del modo (Burbuja)
+		G = copy(self.Φ.T)
+		for i in range(self.n-1):
+			for j in range(i+1,self.n):
+				if self.T[i] < self.T[j]:
+					temp1, temp2, temp3  = self.T[i], self.Ω[i][i], copy(G[i])
+					self.T[i], self.Ω[i][i], G[i] = self.T[j], self.Ω[j][j], copy(G[j])
+					self.T[j], self.Ω[j][j], G[j] = temp1, temp2, temp3
+		self.Φ = G.T
+
+		# Factores de participación estática
+		self.Γ = np.zeros(self.n)
+		I = np.ones((self.n,1))
+		for i in range(self.n):
+			x = self.Φ[:,i:i+1].T@self.m@I/(self.Φ[:,i:i+1].T@self.m@self.Φ[:,i:i+1])
+			self.Γ[i] = x[0][0]
+
+		if cache is not None:
+			cache.guardar(clave, {'T': self.T, 'Ω': self.Ω, 'Φ': self.Φ, 'Γ': self.Γ})
+
+	@medir('VGL.Newmark')
+	def Newmark(self , J , p , Δt , ζ = 0.05 , β = 1/4 , γ = 1/2):
+		"""
+		Resuelve el sistema de ecuaciones diferenciales de un sistema VGL de forma matricial a traves del método de Newmark
+		El sistema de ecuaciones tiene ma forma:
+				m*upp + c*up + k*u = p(t)  Para exitaciones sísmicas p(t) = -m*I*at(t)
+		Dónde:
+		m : matriz de masas
+		k : matriz de rigideces
+		c : matriz de coeficientes de fricción
+		u : respuesta de desplazamientos de cada nivel relativo a la base.
+		at(t): acelelacion del terreno 
+
+		El sistema se transforma a coordenadas nodales según Chopra de la siguiente manera:
+				M*qpp + C*qp + K*q = P(t)
+		Dónde:
+		M = ΦT*m*Φ
+		C = ΦT*c*Φ
+		K = ΦT*k*Φ
+		P(t) = ΦT*p(t)
+		Φ : Matriz modal
+
+		Luego las respuestas del sistema original es:
+				u(t) = Φ*q(t)
+				upp(t) = Φ*qpp(t)
+
+		Parámetros:
+		J : Cantidad de modos a participar
+		p : Para exitaciones sísmicas -m*I*at(t)
+		Δt : Paso de tiempo de la aceleracion del terreno at(t) o de p(t)
+		ζ : Fracción de amortiguamiendo modal, se considera que es igual para todos los modos
+		γ : parametro de presición, generalmente 1/2
+        β : razón de la variacion de la aceleración, generalmente entre 1/4 y 1/6
+            Para β=1/6 se le llama el método de la aceleración lineal y para
+            β=1/4, método de la aceleración de promedio constante.
+        	El método es convergente si Δt/Tn < (1/π√2)[1/√(γ −2β)] donde Tn es el perido del modo n.
+		"""
+
+		# print(J, p, Δt)
+		# print(type(J), type(p),type(Δt))
+		m = self.m
+		k = self.k
+		Φ = self.Φ[:,0:J]
+		Ω = self.Ω[0:J,0:J]
+
+		M = Φ.T@m@Φ
+		K = Φ.T@k@Φ
+		C = 2*ζ*M@Ω
+		
+		# 1.1) Se considera que el sistema parte del reposo (q[0] = qp[0] = 0)
+		# 1.2) P = Φ.T@p para todos los pasos de tiempo en una sola multiplicación
+		P = Φ.T@p
+		# 1.3) Se Resuelve M@qpp[0] = P[0] - C@qp[0]- K@q[0], M = I --->qpp0 = P[0]
+		# 1.4) Δt = dt
+		# 1.5)
+		a1 = M/(β*Δt**2) + γ*C/(β*Δt)
+		a2 = M/(β*Δt) + (γ/β - 1)*C
+		a3 = (1/(2*β) - 1)*M + Δt*(γ/(2*β) - 1)*C
+		# 1.6)
+		Kp = K + a1
+		# 2.0) Pasos 2.1 a 2.4 en kernels.newmarkModal (numba o numpy):
+		#   P[i+1] = Φ.T@p[i+1] + a1*q[i] + a2*qp[i] + a3*qpp[i]
+		#   q[i+1] = P[i+1]/diag(Kp)
+		#   qp[i+1] = (γ/(β*Δt))*(q[i+1] - q[i]) + (1 - γ/β)*qp[i] + Δt*(1 - γ/(2*β))*qpp[i]
+		#   qpp[i+1] = (q[i+1] - q[i])/(β*Δt**2) - qp[i]/(β*Δt) - ( 1/(2*β) - 1 )*qpp[i]
+		q, qp, qpp = newmarkModal(P, a1, a2, a3, np.diag(Kp), Δt, β, γ)
+
+		self.u = Φ@q
+		self.up = Φ@qp
+		self.upp = Φ@qpp
+
+	@medir('VGL.Frecuencia')
+	def Frecuencia(self , J , p , Δt , ζ = 0.05 , tolerancia = 1e-6):
+		"""
+		Resuelve el mismo sistema que Newmark en el dominio de la frecuencia. Cada
+		modo (M = I) es un oscilador de 1 GDL:
+				qpp + 2ζω*qp + ω²*q = P(t),   P(t) = ΦT*p(t)
+		con función de transferencia
+				H(w) = 1/(ω² - w² + 2iζωw)
+		por lo que
+				q = IFFT(H*FFT(P)),  qp = IFFT(iw*H*FFT(P)),  qpp = IFFT(-w²*H*FFT(P))
+		para todos los modos a la vez, en O(N log N).
+
+		La FFT supone una señal periódica: se agregan ceros al final hasta que la
+		respuesta libre del modo de mayor periodo decae a 'tolerancia' veces su
+		amplitud (exp(-ζω*t) = tolerancia), para que no se superponga al inicio.
+
+		A diferencia de Newmark (β = 1/4) no hay alargamiento del periodo, por lo
+		que ambas respuestas coinciden cuando Δt es pequeño respecto a los
+		periodos de los modos considerados.
+
+		Parámetros:
+		J : Cantidad de modos a participar
+		p : Para exitaciones sísmicas -m*I*at(t)
+		Δt : Paso de tiempo de p(t)
+		ζ : Fracción de amortiguamiendo modal, igual para todos los modos (> 0)
+		tolerancia : amplitud residual admitida de la respuesta libre al final del relleno
+		"""
+		from scipy.fft import next_fast_len
+
+		if ζ <= 0:
+			# Sin amortiguamiento H(w) tiene polos en w = ω y la respuesta libre no decae
+			raise ValueError("Frecuencia requiere ζ > 0 (ζ = %g); use Newmark para sistemas sin amortiguamiento" % ζ)
+
+		Φ = self.Φ[:,0:J]
+		ω = self.Ω.diagonal()[0:J]
+
+		P = Φ.T@p
+		m = len(P[0])
+		relleno = int(np.ceil(np.log(1/tolerancia)/(ζ*np.min(ω))/Δt))
+		N = next_fast_len(m + relleno, real=True)
+
+		w = 2*np.pi*np.fft.rfftfreq(N, d=Δt)
+		H = 1/(ω[:,None]**2 - w**2 + 2j*ζ*ω[:,None]*w)
+		HP = H*hilos.rfft(P, n=N)
+
+		iw = 1j*w
+		if N % 2 == 0:
+			iw[-1] = 0 # la derivada de la componente de Nyquist no es real
+		q = hilos.irfft(HP, n=N)[:,:m]
+		qp = hilos.irfft(iw*HP, n=N)[:,:m]
+		qpp = hilos.irfft(-w**2*HP, n=N)[:,:m]
+
+		self.u = Φ@q
+		self.up = Φ@qp
+		self.upp = Φ@qpp
+
+	@medir('VGL.NewmarkFisico')
+	def NewmarkFisico(self , p , Δt , c = None , β = 1/4 , γ = 1/2):
+		"""
+		Método de Newmark en coordenadas físicas:
+				m*upp + c*up + k*u = p(t)
+		para cualquier matriz de amortiguamiento c (Rayleigh, amortiguadores entre
+		pisos, no clásico), que en coordenadas modales no sería diagonal.
+
+		La rigidez efectiva Kp = k + m/(β*Δt²) + γ*c/(β*Δt) es simétrica, definida
+		positiva y de banda (tridiagonal para un edificio de corte), por lo que se
+		factoriza una sola vez con Cholesky de banda (scipy.linalg.cholesky_banded)
+		y en cada paso solo se resuelven los dos sistemas triangulares de banda.
+		Los productos a1@u, a2@up, a3@upp se hacen con matrices dispersas.
+
+		Parámetros:
+		p : fuerzas en cada nivel (n, N), para exitaciones sísmicas -m*I*at(t)
+		Δt : Paso de tiempo de p(t)
+		c : matriz de amortiguamiento (por defecto self.c, ver MatrizRayleigh)
+		β, γ : parámetros de Newmark (ver Newmark)
+		"""
+		from scipy.linalg import cholesky_banded, cho_solve_banded
+		from scipy import sparse
+
+		m = self.m
+		k = self.k
+		c = self.c if c is None else c
+		if c is None:
+			raise ValueError("NewmarkFisico necesita una matriz de amortiguamiento: pase 'c' o llame antes a MatrizRayleigh o MatrizAmortiguamiento")
+		p = np.asarray(p, dtype=float)
+		n, N = p.shape
+
+		a1 = m/(β*Δt**2) + γ*c/(β*Δt)
+		a2 = m/(β*Δt) + (γ/β - 1)*c
+		a3 = (1/(2*β) - 1)*m + Δt*(γ/(2*β) - 1)*c
+		Kp = k + a1
+
+		# Forma de banda superior de Kp: ab[b + i - j, j] = Kp[i, j], i <= j
+		filas, columnas = np.nonzero(Kp)
+		b = int(np.max(np.abs(filas - columnas)))
+		ab = np.zeros((b+1, n))
+		for d in range(b+1):
+			ab[b-d, d:] = Kp.diagonal(d)
+		cb = cholesky_banded(ab)
+
+		A1, A2, A3 = [sparse.csr_matrix(a) for a in (a1, a2, a3)]
+
+		u = np.zeros((n, N))
+		up = np.zeros((n, N))
+		upp = np.zeros((n, N))
+		# Desde el reposo: m@upp[0] = p[0]
+		upp[:,0] = np.linalg.solve(m, p[:,0])
+
+		for i in range(N-1):
+			u[:,i+1] = cho_solve_banded((cb, False), p[:,i+1] + A1@u[:,i] + A2@up[:,i] + A3@upp[:,i], check_finite=False)
+			du = u[:,i+1] - u[:,i]
+			up[:,i+1] = (γ/(β*Δt))*du + (1 - γ/β)*up[:,i] + Δt*(1 - γ/(2*β))*upp[:,i]
+			upp[:,i+1] = du/(β*Δt**2) - up[:,i]/(β*Δt) - ( 1/(2*β) - 1 )*upp[:,i]
+
+		self.u = u
+		self.up = up
+		self.upp = upp
+
+class Jacobi:
+
+	def __init__(self, A, n):
+		# número de ciclos
+		self.t = len(A[0])
+		self.Ak = copy(A)
+		self.s = 0
+		self.Pk = np.eye(self.t)
+		self.produc_Pk = self.Pk
+
+		# Los n ciclos en una sola llamada al kernel
+		self.Ak, self.produc_Pk = jacobiCiclos(self.Ak, self.produc_Pk, n)
+		self.s = n*self.t*(self.t - 1)//2
+
+		self.Ω = np.eye(self.t)
+
+		for i in range(self.t):
+			self.Ω[i][i] =  self.Ak[i][i]**0.5
+		self.Φ = self.produc_Pk
+
+	def P(self, Ak, i, j):
+		P = np.eye(self.t)
+		self.teta = self.θ(Ak[i][i], Ak[j][j], Ak[i][j])
+		P[i][i] = cos(self.teta)
+		P[j][j] = cos(self.teta)
+		P[i][j] = -sin(self.teta)
+		P[j][i] = sin(self.teta)
+
+		return P
+
+	def θ(self, aii, ajj, aij):
+		if aii != ajj :
+			return 0.5*atan( 2*aij/(aii - ajj) )
+		else:
+			return np.pi/4
+
+	def un_ciclo(self):
+
+		# Rotaciones P(Ak, i, j) para todos los pares i < j: Ak = P.T@Ak@P, produc_Pk = produc_Pk@P
+		self.Ak, self.produc_Pk = jacobiCiclos(self.Ak, self.produc_Pk, 1)
+		self.s += self.t*(self.t - 1)//2